@@ -0,0 +1,5 @@
+# benchmarks/__init__.py
+
+# Load-test and benchmark harness: a fake LLM API (fake_llm), sample resumes
+# (samples), scripted user journeys (scenarios) and the runner (run).
+# See the "Benchmarks" section of the README.
@@ -0,0 +1,181 @@
+# benchmarks/fake_llm.py
+
+# A local stand-in for the Groq (OpenAI-compatible) chat completions API, so
+# the app can be load-tested without network access or API quota. Latency,
+# output token rate and error rate are adjustable; errors are 429 responses
+# with a Retry-After header, like the real API under load.
+#
+#   python -m benchmarks.fake_llm --port 8765 --latency 0.3 --tokens-per-second 300 --error-rate 0.05
+#
+# then run the app with GROQ_BASE_URL=http://127.0.0.1:8765 and any GROQ_API_KEY.
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY_WORDS = (
+    "Results-driven engineer with a record of shipping reliable services. Led the migration of core APIs "
+    "to Python and Django, cut response times by 40%, and mentored a team of five. Skilled in SQL, AWS, "
+    "Docker and Kubernetes, with a focus on clean, well-tested code and clear communication."
+).split()
+
+
+@dataclass
+class FakeLLMConfig:
+    latency: float = 0.3             # seconds before the first token
+    tokens_per_second: float = 300.0
+    reply_tokens: int = 80
+    error_rate: float = 0.0          # share of requests answered with 429
+    retry_after: float = 1.0         # seconds, sent in the Retry-After header
+    seed: int = None
+
+
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.prompt_chars = 0
+
+    def snapshot(self):
+        with self.lock:
+            return {'requests': self.requests, 'errors': self.errors, 'prompt_chars': self.prompt_chars}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeLLM/1.0'
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': 'fake', 'object': 'model', 'owned_by': 'benchmarks'}]})
+        else:
+            self._send_json(404, {'error': {'message': 'Not found'}})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found'}})
+            return
+
+        server = self.server
+        config = server.config
+        prompt = "".join(str(message.get('content', '')) for message in body.get('messages', []))
+        with server.stats.lock:
+            server.stats.requests += 1
+            server.stats.prompt_chars += len(prompt)
+            failed = server.random.random() < config.error_rate
+            if failed:
+                server.stats.errors += 1
+
+        if failed:
+            self._send_json(
+                429,
+                {'error': {'message': 'Rate limit reached (fake)', 'type': 'requests', 'code': 'rate_limit_exceeded'}},
+                {'Retry-After': f"{config.retry_after:g}"},
+            )
+            return
+
+        time.sleep(config.latency)
+        words = [REPLY_WORDS[i % len(REPLY_WORDS)] for i in range(config.reply_tokens)]
+        delay = 1.0 / config.tokens_per_second if config.tokens_per_second else 0.0
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = body.get('model', 'fake')
+        usage = {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(words), 'total_tokens': len(prompt) // 4 + len(words)}
+
+        if body.get('stream'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            for position, word in enumerate(words):
+                chunk = {
+                    'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+                    'choices': [{'index': 0, 'delta': {'content': word if position == 0 else " " + word}, 'finish_reason': None}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(delay)
+            final = {
+                'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+                'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}], 'usage': usage,
+            }
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        time.sleep(delay * len(words))
+        self._send_json(200, {
+            'id': completion_id, 'object': 'chat.completion', 'created': int(time.time()), 'model': model,
+            'system_fingerprint': 'fake', 'service_tier': 'on_demand',
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': " ".join(words)}, 'finish_reason': 'stop'}],
+            'usage': usage,
+        })
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """The fake API server. Use start() to serve from a background thread, or serve_forever()."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, host='127.0.0.1', port=0, config=None):
+        super().__init__((host, port), _Handler)
+        self.config = config or FakeLLMConfig()
+        self.random = random.Random(self.config.seed)
+        self.stats = _Stats()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='fake-llm', daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible LLM API for load tests.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=FakeLLMConfig.latency, help="Seconds before the first token.")
+    parser.add_argument('--tokens-per-second', type=float, default=FakeLLMConfig.tokens_per_second)
+    parser.add_argument('--reply-tokens', type=int, default=FakeLLMConfig.reply_tokens)
+    parser.add_argument('--error-rate', type=float, default=FakeLLMConfig.error_rate, help="Share of requests answered with 429.")
+    parser.add_argument('--retry-after', type=float, default=FakeLLMConfig.retry_after)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(args.latency, args.tokens_per_second, args.reply_tokens, args.error_rate, args.retry_after, args.seed)
+    server = FakeLLMServer(args.host, args.port, config)
+    print(f"Fake LLM API on {server.url} (latency {config.latency}s, {config.tokens_per_second:g} tokens/s, "
+          f"error rate {config.error_rate:g})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
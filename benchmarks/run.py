@@ -0,0 +1,241 @@
+# benchmarks/run.py
+
+# Load-test runner. Starts the fake LLM server and the app (uvicorn with
+# benchmarks.settings, on its own SQLite database), then runs
+# each scenario at increasing concurrency and reports p50/p95/p99 latency,
+# throughput and errors. Results are written as JSON, tagged with the git
+# commit, so runs can be compared between commits:
+#
+#   python -m benchmarks.run --concurrency 1,4,16 --requests 32
+#   python -m benchmarks.run --compare benchmarks/results/<earlier>.json
+#
+# Use --base-url to load-test a server that is already running instead (it
+# must use a fake or real LLM API itself, and --username/--password must exist).
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from .fake_llm import FakeLLMConfig, FakeLLMServer
+from .samples import resume_pdf
+from .scenarios import SCENARIOS, AppClient
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+SETTINGS_MODULE = 'benchmarks.settings'
+USERNAME = 'benchmark'
+PASSWORD = 'benchmark-password'
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _manage(env, *args):
+    subprocess.run(
+        [sys.executable, 'manage.py', *args, '--settings', SETTINGS_MODULE], cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL
+    )
+
+
+def prepare_database(env):
+    """Migrates the benchmark database and creates the benchmark user."""
+    _manage(env, 'migrate', '--verbosity', '0')
+    _manage(env, 'createcachetable')
+    _manage(env, 'shell', '--command', (
+        "from django.contrib.auth.models import User\n"
+        f"user, _ = User.objects.get_or_create(username={USERNAME!r})\n"
+        f"user.set_password({PASSWORD!r})\n"
+        "user.save()"
+    ))
+
+
+def start_app(env, port):
+    """Starts the app under uvicorn (ASGI, as in production) and waits until it answers; returns the process."""
+    # uvicorn logs every request; a file (unlike a pipe nobody reads) can't fill up and stall it.
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'hello.asgi:application', '--host', '127.0.0.1', '--port', str(port)],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            log.seek(0)
+            raise RuntimeError("The app server exited:\n" + log.read().decode(errors='replace'))
+        try:
+            httpx.get(f'http://127.0.0.1:{port}/', timeout=2)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("The app server did not start within 60s")
+
+
+def summarize(latencies, errors, elapsed):
+    """Returns the latency percentiles (ms), throughput (requests/s) and error count for one level."""
+    summary = {'requests': len(latencies) + errors, 'errors': errors, 'throughput': len(latencies) / elapsed if elapsed else 0.0}
+    if latencies:
+        values = np.array(latencies) * 1000
+        summary.update({
+            'mean_ms': float(values.mean()),
+            'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'p99_ms': float(np.percentile(values, 99)),
+            'max_ms': float(values.max()),
+        })
+    return summary
+
+
+async def run_level(base_url, scenario_class, concurrency, requests, samples, credentials, use_cache):
+    """Runs requests iterations of a scenario spread over concurrency simulated users."""
+    scenario = scenario_class()
+    clients = [AppClient(base_url, samples, use_cache=use_cache) for _ in range(concurrency)]
+    latencies = []
+    errors = []
+    remaining = iter(range(requests))
+
+    async def user(client):
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                await scenario.run(client)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    try:
+        await asyncio.gather(*(scenario.setup(client, credentials) for client in clients))
+        started = time.perf_counter()
+        await asyncio.gather(*(user(client) for client in clients))
+        elapsed = time.perf_counter() - started
+    finally:
+        await asyncio.gather(*(client.close() for client in clients))
+
+    summary = summarize(latencies, len(errors), elapsed)
+    if errors:
+        summary['sample_errors'] = sorted(set(errors))[:3]
+    return summary
+
+
+def compare(current, previous_path):
+    """Prints the change in p95 latency and throughput against an earlier results file."""
+    with open(previous_path, encoding='utf-8') as f:
+        previous = json.load(f)
+    before = {(row['scenario'], row['concurrency']): row for row in previous['results']}
+    print(f"\nCompared with {previous.get('commit', '?')} ({previous_path}):")
+    for row in current['results']:
+        old = before.get((row['scenario'], row['concurrency']))
+        if not old or 'p95_ms' not in old or 'p95_ms' not in row:
+            continue
+        p95_change = (row['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0.0
+        throughput_change = (row['throughput'] - old['throughput']) / old['throughput'] * 100 if old['throughput'] else 0.0
+        print(f"  {row['scenario']:<16} c={row['concurrency']:<3} p95 {p95_change:+6.1f}%   throughput {throughput_change:+6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the app against a fake LLM API.")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help=f"Comma-separated, from: {', '.join(SCENARIOS)}.")
+    parser.add_argument('--concurrency', default='1,4,16', help="Comma-separated concurrency levels.")
+    parser.add_argument('--requests', type=int, default=32, help="Requests per scenario and level (at least the concurrency).")
+    parser.add_argument('--cached', action='store_true', help="Allow cached LLM responses (by default every request skips the cache).")
+    parser.add_argument('--latency', type=float, default=FakeLLMConfig.latency, help="Fake LLM seconds to first token.")
+    parser.add_argument('--tokens-per-second', type=float, default=FakeLLMConfig.tokens_per_second)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of fake LLM requests answered with 429.")
+    parser.add_argument('--rate-limits', action='store_true', help="Keep LLM_SCHEDULER's rate limits (off by default).")
+    parser.add_argument('--base-url', help="Benchmark an already running server instead of starting one.")
+    parser.add_argument('--username', default=USERNAME)
+    parser.add_argument('--password', default=PASSWORD)
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/<time>-<commit>.json).")
+    parser.add_argument('--compare', help="Earlier results file to compare against.")
+    args = parser.parse_args()
+
+    scenario_names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenario_names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    levels = [int(level) for level in args.concurrency.split(',')]
+    fake_config = FakeLLMConfig(latency=args.latency, tokens_per_second=args.tokens_per_second, error_rate=args.error_rate, seed=0)
+
+    fake_llm = app = None
+    base_url = args.base_url
+    try:
+        if base_url is None:
+            fake_llm = FakeLLMServer(config=fake_config).start()
+            env = {
+                **os.environ, 'GROQ_API_KEY': 'benchmark', 'GROQ_BASE_URL': fake_llm.url, 'DJANGO_SETTINGS_MODULE': SETTINGS_MODULE,
+                # LiteLLM (used by crewAI) otherwise downloads its model price list, and retries it in a thread, on import.
+                'LITELLM_LOCAL_MODEL_COST_MAP': 'True',
+            }
+            if args.rate_limits:
+                env['BENCHMARK_RATE_LIMITS'] = '1'
+            prepare_database(env)
+            port = _free_port()
+            app = start_app(env, port)
+            base_url = f'http://127.0.0.1:{port}'
+
+        samples = {'resume': resume_pdf(1), 'resume_long': resume_pdf(8)}
+        credentials = (args.username, args.password)
+        results = []
+        for name in scenario_names:
+            for concurrency in levels:
+                summary = asyncio.run(run_level(
+                    base_url, SCENARIOS[name], concurrency, max(args.requests, concurrency), samples, credentials, args.cached
+                ))
+                results.append({'scenario': name, 'concurrency': concurrency, **summary})
+                print(
+                    f"{name:<16} c={concurrency:<3} n={summary['requests']:<4} errors={summary['errors']:<3} "
+                    f"p50={summary.get('p50_ms', 0):8.1f}ms p95={summary.get('p95_ms', 0):8.1f}ms "
+                    f"p99={summary.get('p99_ms', 0):8.1f}ms {summary['throughput']:7.2f} req/s"
+                )
+    finally:
+        if app is not None:
+            app.terminate()
+            try:
+                app.wait(10)
+            except subprocess.TimeoutExpired:
+                app.kill()
+        if fake_llm is not None:
+            fake_llm.shutdown()
+
+    commit = _git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'base_url': args.base_url,
+        'fake_llm': None if args.base_url else {**vars(fake_config), 'requests': fake_llm.stats.snapshot()},
+        'options': {'cached': args.cached, 'rate_limits': args.rate_limits, 'requests': args.requests},
+        'results': results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
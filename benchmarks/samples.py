@@ -0,0 +1,85 @@
+# benchmarks/samples.py
+
+# Sample resumes and a job description for the benchmark scenarios. The PDFs
+# are generated with PyMuPDF (headings in larger bold type, like a real
+# resume) instead of being checked in, so they are always the same.
+
+import os
+
+import fitz
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+
+We are looking for a senior backend engineer to build and scale our hiring platform.
+
+Requirements:
+- 5+ years of experience with Python and Django
+- Strong SQL and PostgreSQL skills
+- Experience with AWS, Docker and Kubernetes
+- REST APIs, CI/CD and unit testing
+- Nice to have: machine learning, Kafka, Redis
+
+You will design services, mentor engineers and work closely with product and data science.
+"""
+
+SECTIONS = {
+    "Professional Summary": [
+        "Backend engineer with 8 years of experience building APIs and data pipelines in Python.",
+    ],
+    "Work Experience": [
+        "Senior Software Engineer, Acme Corp (2019 - present)",
+        "- Built REST APIs in Django serving 2M requests per day.",
+        "- Moved services to Docker and Kubernetes on AWS, cutting deploy time by 60%.",
+        "- Mentored four engineers and introduced code review and CI/CD.",
+        "Software Engineer, Globex (2015 - 2019)",
+        "- Wrote ETL jobs in Python and SQL on PostgreSQL.",
+        "- Added unit testing with pytest, raising coverage from 30% to 85%.",
+    ],
+    "Education": [
+        "B.Sc. Computer Science, State University (2015)",
+    ],
+    "Technical Skills": [
+        "Python, Django, Flask, SQL, PostgreSQL, Redis, AWS, Docker, Kubernetes, Git, Linux",
+    ],
+}
+
+# Heading of a section the section-enhance scenario asks for.
+SECTION_HEADING = "Work Experience"
+
+
+def resume_pdf(pages=1, name="Jordan Smith"):
+    """
+    Returns the bytes of a sample resume PDF. Pages after the first repeat
+    the work experience section, for longer documents.
+    """
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        y = 60
+        if number == 0:
+            page.insert_text((50, y), name, fontsize=20, fontname="hebo")
+            y += 22
+            page.insert_text((50, y), "jordan.smith@example.com | +1 555 0100 | Springfield", fontsize=10, fontname="helv")
+            y += 30
+        sections = SECTIONS.items() if number == 0 else [("Work Experience", SECTIONS["Work Experience"] * 3)]
+        for heading, lines in sections:
+            page.insert_text((50, y), heading, fontsize=14, fontname="hebo")
+            y += 20
+            for line in lines:
+                page.insert_text((50, y), line, fontsize=10, fontname="helv")
+                y += 15
+            y += 12
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def write_samples(directory):
+    """Writes resume.pdf (one page) and resume_long.pdf (eight pages) to directory; returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for key, pages in (('resume', 1), ('resume_long', 8)):
+        paths[key] = os.path.join(directory, f"{key}.pdf")
+        with open(paths[key], 'wb') as f:
+            f.write(resume_pdf(pages))
+    return paths
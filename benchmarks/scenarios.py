@@ -0,0 +1,168 @@
+# benchmarks/scenarios.py
+
+# Scripted user journeys for the benchmark runner. Each scenario has a
+# setup() run once per simulated user (usually logging in) and a run() whose
+# duration is what gets measured. They drive the app over HTTP, the way a
+# browser would, so they work against the runner's own server or any
+# deployment (--base-url).
+
+import asyncio
+
+import httpx
+
+from .samples import JOB_DESCRIPTION, SECTION_HEADING, SECTIONS
+
+CREW_TIMEOUT = 300.0
+CREW_POLL_INTERVAL = 0.25
+
+
+class ScenarioError(Exception):
+    """A response that a real user would have seen as a failure."""
+
+
+class AppClient:
+    """One simulated user: an httpx session with the app's cookies and CSRF token."""
+
+    def __init__(self, base_url, samples, use_cache=False, timeout=CREW_TIMEOUT):
+        self.http = httpx.AsyncClient(base_url=base_url, timeout=timeout, follow_redirects=False)
+        self.samples = samples
+        self.use_cache = use_cache
+
+    async def close(self):
+        await self.http.aclose()
+
+    def _form(self, data):
+        data = dict(data)
+        data['csrfmiddlewaretoken'] = self.http.cookies.get('csrftoken', '')
+        if not self.use_cache:
+            data['refresh'] = '1'
+        return data
+
+    async def login(self, username, password):
+        await self.http.get('/')
+        response = await self.http.post(
+            '/', data={'username': username, 'password': password, 'csrfmiddlewaretoken': self.http.cookies.get('csrftoken', '')}
+        )
+        if response.status_code != 302:
+            raise ScenarioError(f"login failed ({response.status_code})")
+
+    async def post(self, path, data, files=None, headers=None):
+        response = await self.http.post(path, data=self._form(data), files=files, headers=headers)
+        if response.status_code >= 400:
+            raise ScenarioError(f"POST {path} returned {response.status_code}")
+        return response
+
+    async def post_stream(self, path, data, files=None):
+        """POSTs to a Server-Sent Events endpoint and reads the whole stream; returns the event names."""
+        events = []
+        async with self.http.stream('POST', path, data=self._form(data), files=files) as response:
+            if response.status_code >= 400:
+                raise ScenarioError(f"POST {path} returned {response.status_code}")
+            async for line in response.aiter_lines():
+                if line.startswith('event: '):
+                    events.append(line[7:])
+        if 'error' in events or 'done' not in events:
+            raise ScenarioError(f"{path} stream ended without a result: {events[-3:]}")
+        return events
+
+    def resume_file(self, key='resume'):
+        return {'resume_file': (f"{key}.pdf", self.samples[key], 'application/pdf')}
+
+
+class Scenario:
+    name = ''
+    needs_login = True
+
+    async def setup(self, client, credentials):
+        if self.needs_login:
+            await client.login(*credentials)
+
+    async def run(self, client):
+        raise NotImplementedError
+
+
+class Login(Scenario):
+    """Opens the login page and signs in with a fresh session."""
+
+    name = 'login'
+    needs_login = False
+
+    def __init__(self):
+        self.credentials = None
+
+    async def setup(self, client, credentials):
+        self.credentials = credentials
+
+    async def run(self, client):
+        client.http.cookies.clear()
+        await client.login(*self.credentials)
+
+
+class ATSScan(Scenario):
+    """Uploads a resume and streams the ATS match with AI final thoughts."""
+
+    name = 'ats_scan'
+
+    async def run(self, client):
+        await client.post_stream(
+            '/ats-scanner/stream/',
+            {'job_description': JOB_DESCRIPTION, 'ats_match': '1', 'final_thoughts': '1'},
+            files=client.resume_file(),
+        )
+
+
+class SectionEnhance(Scenario):
+    """Uploads a resume to the section enhancer and streams one rewritten section."""
+
+    name = 'section_enhance'
+
+    async def run(self, client):
+        response = await client.post('/section/', {}, files=client.resume_file())
+        if SECTION_HEADING not in response.text:
+            raise ScenarioError(f"heading {SECTION_HEADING!r} was not detected")
+        await client.post_stream('/section/stream/', {'selected_heading': SECTION_HEADING})
+
+
+class CrewRun(Scenario):
+    """Queues a resume enhancement crew run and polls until it finishes."""
+
+    name = 'crew'
+    mode = 'full'
+
+    async def run(self, client):
+        resume_text = "\n".join(f"{heading}\n" + "\n".join(lines) for heading, lines in SECTIONS.items())
+        response = await client.post(
+            '/resume-enhancer/',
+            {'resume': resume_text, 'job_description': JOB_DESCRIPTION, 'mode': self.mode},
+            headers={'Accept': 'application/json'},
+        )
+        status_url = response.json()['status_url']
+        deadline = asyncio.get_running_loop().time() + CREW_TIMEOUT
+        while asyncio.get_running_loop().time() < deadline:
+            job = (await client.http.get(status_url)).json()
+            if job['status'] == 'succeeded':
+                return
+            if job['status'] == 'failed':
+                raise ScenarioError("crew run failed")
+            await asyncio.sleep(CREW_POLL_INTERVAL)
+        raise ScenarioError("crew run timed out")
+
+
+class CrewParallelRun(CrewRun):
+    """CrewRun in the parallel-analysis mode."""
+
+    name = 'crew_parallel'
+    mode = 'parallel'
+
+
+class CrewFastRun(CrewRun):
+    """CrewRun in the single-pass mode."""
+
+    name = 'crew_fast'
+    mode = 'fast'
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (Login, ATSScan, SectionEnhance, CrewRun, CrewParallelRun, CrewFastRun)
+}
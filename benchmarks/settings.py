@@ -0,0 +1,34 @@
+# benchmarks/settings.py
+
+# Settings for the app while it is being benchmarked: the project settings,
+# with a separate SQLite database, the fake LLM server instead of Groq, and
+# (unless BENCHMARK_RATE_LIMITS is set) no rate limiting, so the numbers
+# measure the app rather than the Groq plan.
+
+import os
+
+from hello.settings import *  # noqa: F401,F403
+from hello.settings import BASE_DIR, CREW_JOBS, LLM_CLIENT, LLM_SCHEDULER
+
+DEBUG = False
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('BENCHMARK_DB', str(BASE_DIR / 'benchmarks' / 'benchmark.sqlite3')),
+        'OPTIONS': {'timeout': 30},
+    }
+}
+
+LLM_CLIENT = {
+    **LLM_CLIENT,
+    'BASE_URL': os.environ.get('GROQ_BASE_URL', 'http://127.0.0.1:8765'),
+    'WARM_UP': False,
+}
+
+if not os.environ.get('BENCHMARK_RATE_LIMITS'):
+    LLM_SCHEDULER = {**LLM_SCHEDULER, 'DEFAULT_RPM': 1_000_000, 'DEFAULT_TPM': 1_000_000_000, 'MODEL_LIMITS': {}}
+
+# A failed crew run should show up as an error, not be retried for minutes.
+CREW_JOBS = {**CREW_JOBS, 'MAX_ATTEMPTS': 1}
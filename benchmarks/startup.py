@@ -0,0 +1,82 @@
+# benchmarks/startup.py
+
+# Startup benchmark: how long a fresh process takes to load Django and the
+# URLconf (what every web worker, management command and test run pays), and
+# its peak memory, with the AI libraries loaded lazily (the default) and
+# preloaded (PRELOAD['ENABLED'], see login_app/preload.py). Each measurement
+# runs in a new interpreter, so nothing is shared between runs:
+#
+#   python -m benchmarks.startup --repeat 5
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in the child process; prints {"seconds": ..., "rss_mb": ...}.
+_PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+if {preload}:
+    from login_app.preload import preload
+    preload()
+seconds = time.perf_counter() - started
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": seconds, "rss_mb": rss / (1024 * 1024 if sys.platform == "darwin" else 1024)}}))
+"""
+
+MODES = {'lazy': False, 'preloaded': True}
+
+
+def measure(preload):
+    """Starts one interpreter and returns its startup time (s) and peak RSS (MB)."""
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+        'GROQ_API_KEY': os.environ.get('GROQ_API_KEY', 'benchmark'),
+        # LiteLLM otherwise downloads its model price list while crewAI is imported.
+        'LITELLM_LOCAL_MODEL_COST_MAP': 'True',
+    }
+    env.pop('PRELOAD_AI', None)
+    output = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(preload=preload)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure process startup time and memory with lazy and preloaded AI libraries.")
+    parser.add_argument('--repeat', type=int, default=3, help="Processes started per mode; the median is reported.")
+    parser.add_argument('--output', help="Also write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    results = {}
+    for mode, preload in MODES.items():
+        runs = [measure(preload) for _ in range(args.repeat)]
+        results[mode] = {
+            'seconds': statistics.median(run['seconds'] for run in runs),
+            'rss_mb': statistics.median(run['rss_mb'] for run in runs),
+        }
+        print(f"{mode:<10} startup {results[mode]['seconds']:6.2f}s   peak RSS {results[mode]['rss_mb']:7.1f} MB")
+
+    lazy, preloaded = results['lazy'], results['preloaded']
+    print(
+        f"\nLazy loading saves {preloaded['seconds'] - lazy['seconds']:.2f}s and "
+        f"{preloaded['rss_mb'] - lazy['rss_mb']:.0f} MB per process that doesn't use the AI features."
+    )
+    if args.output:
+        Path(args.output).write_text(json.dumps({'repeat': args.repeat, 'results': results}, indent=2), encoding='utf-8')
+
+
+if __name__ == '__main__':
+    main()
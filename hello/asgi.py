@@ -2,6 +2,9 @@
 ASGI config for hello project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+This is how the app is served (``uvicorn hello.asgi:application``): the
+streaming views are async generators, which a WSGI server such as runserver
+collects in full before sending anything.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -14,3 +17,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hello.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.DEBUG:
+    # Serve static files in development, as runserver does.
+    from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+
+    application = ASGIStaticFilesHandler(application)
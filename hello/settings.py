@@ -42,8 +42,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its Server-Timing header covers everything below (login_app/instrumentation.py)
+    'login_app.instrumentation.ServerTimingMiddleware',
+    # Per-request deadline for LLM work, cancelled when the client disconnects (login_app/deadlines.py)
+    'login_app.deadlines.DeadlineMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # SessionMiddleware that times the session save
+    'login_app.instrumentation.TimedSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -69,6 +74,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'hello.wsgi.application'
+# The app is served over ASGI (uvicorn hello.asgi:application) so that event streams aren't buffered.
+ASGI_APPLICATION = 'hello.asgi.application'
 
 
 # Database
@@ -82,6 +89,263 @@ DATABASES = {
 }
 
 
+# Caches
+# The 'llm' alias is the persistent tier of the LLM response cache (login_app/llm_cache.py).
+# Create its table once with: python manage.py createcachetable
+# The 'sessions' alias holds sessions as files, shared by all processes on the host and kept across restarts.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'llm': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'llm_response_cache',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'sessions',
+        'OPTIONS': {
+            # Culling past this drops sessions (logs users out), so keep it well above the active user count.
+            'MAX_ENTRIES': 20000,
+        },
+    },
+}
+
+# Sessions only hold small references (the resume itself is in login_app/resume_store.py),
+# so they are kept in the cache instead of being read and rewritten in the database on every request.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+SESSION_CACHE_ALIAS = 'sessions'
+
+LLM_CACHE = {
+    'ENABLED': True,
+    'TTL': 60 * 60 * 24,
+    'LOCAL_MAX_ENTRIES': 256,
+    'LOCAL_MAX_BYTES': 16 * 1024 * 1024,
+    'PERSISTENT_ALIAS': 'llm',
+    'SINGLE_FLIGHT': True,
+}
+
+
+# Shared Groq client settings (login_app/llm_client.py).
+# One keep-alive connection pool per process is used by every LLM call.
+
+LLM_CLIENT = {
+    'BASE_URL': os.environ.get('GROQ_BASE_URL'),
+    'TIMEOUT': 60.0,
+    'CONNECT_TIMEOUT': 5.0,
+    'MAX_CONNECTIONS': 50,
+    'MAX_KEEPALIVE_CONNECTIONS': 20,
+    'KEEPALIVE_EXPIRY': 60.0,
+    'MAX_RETRIES': 2,               # only used when LLM_SCHEDULER is disabled
+    'WARM_UP': not DEBUG,
+}
+
+
+# AI library preloading (login_app/preload.py). crewAI, LangChain, the Groq SDK and PyMuPDF are
+# otherwise imported on first use. Set PRELOAD_AI=1 for web workers so the first request doesn't wait.
+
+PRELOAD = {
+    'ENABLED': os.environ.get('PRELOAD_AI') == '1',
+    'BACKGROUND': False,
+}
+
+
+# Rate-limit-aware scheduling of LLM calls (login_app/llm_scheduler.py).
+# Set MODEL_LIMITS to your Groq plan's requests and tokens per minute; calls over
+# the limit wait in a priority queue, and 429s are retried after Retry-After.
+
+LLM_SCHEDULER = {
+    'ENABLED': True,
+    'DEFAULT_RPM': 30,
+    'DEFAULT_TPM': 30000,
+    'MODEL_LIMITS': {
+        'llama3-8b-8192': {'RPM': 30, 'TPM': 30000},
+        'meta-llama/llama-4-maverick-17b-128e-instruct': {'RPM': 30, 'TPM': 6000},
+        'llama-3.3-70b-versatile': {'RPM': 30, 'TPM': 12000},
+        'llama-3.1-8b-instant': {'RPM': 30, 'TPM': 6000},
+    },
+    'MAX_RETRIES': 4,
+    'MAX_QUEUE_WAIT': 120.0,
+}
+
+
+# Model routing (login_app/llm_router.py). Each task lists its models smallest first; a prompt
+# goes to the first whose PROMPT_BUDGETS input limit it fits. With a DEADLINE (seconds), the
+# FALLBACK model is also asked once it has passed, and the first answer wins. HEDGE sends a
+# duplicate request to the same model after its recent HEDGE_PERCENTILE latency (or HEDGE_AFTER).
+# Both cost extra requests, so they are only enabled where a user is waiting.
+
+LLM_ROUTER = {
+    'TASKS': {
+        'ats_evaluation': {'MODELS': ['llama3-8b-8192', 'llama-3.1-8b-instant']},
+        'job_brief': {'MODELS': ['llama3-8b-8192', 'llama-3.1-8b-instant']},
+        'section_headings': {'MODELS': ['meta-llama/llama-4-maverick-17b-128e-instruct']},
+        'section_enhance': {
+            'MODELS': ['meta-llama/llama-4-maverick-17b-128e-instruct'],
+            'FALLBACK': 'llama-3.1-8b-instant',
+            'DEADLINE': 20.0,
+        },
+        'crew_step': {'MODELS': ['llama-3.3-70b-versatile']},
+    },
+    'HEDGE_PERCENTILE': 95,
+    'HEDGE_MIN_SAMPLES': 20,
+}
+
+
+# Worker pool for LLM calls made from async views (login_app/llm_executor.py).
+# ENDPOINT_LIMITS caps concurrent calls per view so one feature can't take every worker.
+
+LLM_EXECUTOR = {
+    'WORKERS': 8,
+    'ENDPOINT_LIMITS': {
+        'resume_enhancer': 4,
+        'section_headings': 4,
+        'section_enhancer': 6,
+        'section_enhance_all': 4,   # sections enhanced at once by "Enhance all sections"
+        'bulk_screening': 2,
+    },
+    'DEFAULT_ENDPOINT_LIMIT': 4,
+}
+
+
+# Background queue for resume enhancement crew runs (login_app/jobs.py).
+# With IN_PROCESS_WORKERS the web process runs WORKERS threads itself; set it to
+# False and run `python manage.py run_crew_workers` to use dedicated worker processes.
+
+CREW_JOBS = {
+    'WORKERS': 2,
+    'IN_PROCESS_WORKERS': True,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 15,
+    'LEASE_SECONDS': 15 * 60,
+    'POLL_INTERVAL': 1.0,
+    'DEADLINE': 10 * 60,
+    'ABANDON_AFTER': 60,
+}
+
+
+# Deadlines for LLM work (login_app/deadlines.py). REQUEST covers everything one request asks
+# the models for (VIEWS overrides it per URL name); STAGES limits each llm_router task's calls and
+# each crewAI agent task ('crew_agent'). Work whose client disconnected is cancelled right away.
+
+DEADLINES = {
+    'ENABLED': True,
+    'REQUEST': 120.0,
+    'VIEWS': {
+        'bulk_screening': 600.0,
+    },
+    'STAGES': {
+        'ats_evaluation': 45.0,
+        'job_brief': 30.0,
+        'section_headings': 30.0,
+        'section_enhance': 45.0,
+        'crew_step': 180.0,
+        'crew_agent': 300,
+    },
+}
+
+
+# Idempotent submissions of the enhancer, section and ATS forms (login_app/idempotency.py).
+# A repeated submission (double click, refresh) within TTL seconds gets the first one's result.
+
+IDEMPOTENCY = {
+    'ENABLED': True,
+    'TTL': 10 * 60,
+}
+
+
+# PDF text extraction shared by the ATS scanner and section enhancer (login_app/pdf_extract.py).
+# Parsed text is cached in-process by a hash of the file contents.
+
+PDF_EXTRACT = {
+    'MAX_BYTES': 10 * 1024 * 1024,
+    'MAX_PAGES': 30,
+    'CACHE_MAX_ENTRIES': 64,
+    'CACHE_TTL': 60 * 60,
+}
+
+
+# Parsed resumes of the section enhancer, stored once per distinct PDF (login_app/resume_store.py).
+# Run `manage.py prune_resume_documents` periodically to delete those unused for MAX_AGE_DAYS.
+
+RESUME_STORE = {
+    'CACHE_MAX_ENTRIES': 128,
+    'CACHE_TTL': 60 * 60,
+    'MAX_AGE_DAYS': 30,
+}
+
+
+# Incremental re-enhancement (login_app/incremental.py): a crew run on an edited resume
+# with the same job description rewrites only the changed sections, unless more than
+# MAX_CHANGED_SHARE of them changed.
+
+INCREMENTAL = {
+    'ENABLED': True,
+    'MAX_CHANGED_SHARE': 0.5,
+}
+
+
+# Section heading detection from PDF layout (login_app/headings.py).
+# The headings LLM call is only made when the detector's confidence is below MIN_CONFIDENCE.
+
+HEADINGS = {
+    'MIN_CONFIDENCE': 0.6,
+}
+
+
+# Bulk ATS screening (login_app/bulk_screening.py and `manage.py screen_resumes`).
+# PDFs are extracted on PROCESSES worker processes; only the TOP_N candidates get an LLM HR review.
+
+BULK_SCREENING = {
+    'PROCESSES': None,
+    'MAX_FILES': 1000,
+    'MAX_TOTAL_BYTES': 200 * 1024 * 1024,
+    'TOP_N': 10,
+    'REVIEW_CONCURRENCY': 4,
+    'RESULT_TTL': 60 * 60,
+}
+
+# Bulk screening accepts hundreds of PDFs in one upload (Django's default is 100 files).
+DATA_UPLOAD_MAX_NUMBER_FILES = 1000
+
+
+# Prompt preparation for every LLM call (login_app/prompt_prep.py).
+# Resume and job description text is cleaned of PDF artifacts, then cut to the model's input budget.
+
+PROMPT_BUDGETS = {
+    'DEFAULT_INPUT_TOKENS': 6000,
+    'MODEL_INPUT_TOKENS': {
+        'llama3-8b-8192': 6000,                                     # 8k context
+        'llama-3.1-8b-instant': 24000,                              # 128k context; used for long inputs
+        'meta-llama/llama-4-maverick-17b-128e-instruct': 16000,
+        'llama-3.3-70b-versatile': 16000,                           # crew (also as 'groq/...' via LiteLLM)
+    },
+    'TAIL_SHARE': 0.25,
+}
+
+
+# Admin user management page (login_app/user_admin.py): users per page and rows fetched
+# per database round trip by the CSV export.
+
+USER_ADMIN = {
+    'PAGE_SIZE': 50,
+    'EXPORT_CHUNK_SIZE': 2000,
+}
+
+
+# Prometheus metrics at /metrics (login_app/instrumentation.py): superusers can open it in
+# the browser; a scraper sends "Authorization: Bearer <TOKEN>" when TOKEN is set.
+
+METRICS = {
+    'TOKEN': os.environ.get('METRICS_TOKEN'),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
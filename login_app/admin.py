@@ -1,3 +1,27 @@
 from django.contrib import admin
 
+from login_app.models import CrewJob, JobDescription, ResumeDocument
+
 # Register your models here.
+
+
+@admin.register(CrewJob)
+class CrewJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'mode', 'stage', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'mode')
+    search_fields = ('user__username', 'id')
+    readonly_fields = ('idempotency_key', 'created_at', 'started_at', 'finished_at')
+
+
+@admin.register(JobDescription)
+class JobDescriptionAdmin(admin.ModelAdmin):
+    list_display = ('title', 'user', 'created_at', 'updated_at')
+    search_fields = ('title', 'user__username')
+    readonly_fields = ('content_hash', 'keywords', 'required_skills', 'created_at', 'updated_at')
+
+
+@admin.register(ResumeDocument)
+class ResumeDocumentAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'created_at', 'last_used_at')
+    search_fields = ('content_hash',)
+    readonly_fields = ('content_hash', 'headings', 'sections', 'created_at', 'last_used_at')
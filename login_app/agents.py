@@ -1,25 +1,121 @@
 # login_app/agents.py
 
+# crewAI takes seconds to import, so it is imported inside the functions that
+# build agents, tasks and crews rather than at module level: loading this
+# module (for CREW_STAGES, or via the job queue) stays cheap, and the cost is
+# paid on the first crew run or by the preload step (login_app/preload.py).
+
+import contextvars
 import os
+import queue
+import threading
+import time
 import warnings
-from crewai import Agent, Task, Crew, Process, LLM
-from langchain_groq import ChatGroq
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from . import deadlines, llm_router
+from .instrumentation import record, stage
+from .llm_client import crew_llm
+from .llm_cache import cached_llm_call, get_cache, make_key
+from .llm_registry import get_or_build
+from .prompt_prep import prepare_text
+from .tokens import estimate_tokens, record_usage
+
 warnings.filterwarnings('ignore')
 load_dotenv()
 
+CREW_MODEL = "groq/llama-3.3-70b-versatile"
+# llm_router task for the steps sent to the model directly (streamed editor, fast and parallel modes)
+CREW_STEP_TASK = "crew_step"
+
+# Input tokens kept free for the agents' role, goal and task text around the resume and job description.
+CREW_PROMPT_RESERVE = 1500
+
+# Progress stages reported by stream_crew, in order.
+CREW_STAGES = ("analyst", "writer", "editor")
+
+# Pipelines stream_crew can run, slowest and most thorough first:
+# - full: the three agents as a sequential crew, each reading the previous one's output;
+# - parallel: JD keyword extraction and the resume gap analysis run concurrently,
+#   then a single step rewrites and formats the resume;
+# - fast: one combined prompt does everything.
+CREW_MODES = ("full", "parallel", "fast")
+
+# Output cap for each of the parallel mode's two analysis calls
+ANALYSIS_MAX_TOKENS = 600
+
+# How often a full-mode run waiting for the crew checks whether it was cancelled (seconds)
+CANCEL_POLL_INTERVAL = 0.5
+
+JD_KEYWORDS_PROMPT = """List the 10 most important skills, qualifications and keywords in this job description, one per line, most important first. No explanations.
+
+Job description:
+{job_description}"""
+
+GAP_ANALYSIS_PROMPT = """You are a senior talent acquisition analyst. Compare the resume with the job description and write a short brief in markdown:
+- strengths the resume should highlight,
+- requirements the resume does not show,
+- concrete recommendations for the rewrite.
+At most 200 words.
+
+Resume:
+{resume}
+
+Job description:
+{job_description}"""
+
+REWRITE_PROMPT = """You are a master resume writer and editor. Rewrite the resume below for the target job:
+1. Rewrite the professional summary as a concise pitch built on the analyst's findings.
+2. Make every experience bullet achievement-oriented, with strong action verbs, working in the keywords and any metrics.
+3. Reorder and trim the skills section to match the job.
+4. Format the result as a clean, ATS-friendly resume in plain text and proofread it.
+Do not invent facts. Return only the final resume, no commentary.
+
+Keywords from the job description:
+{keywords}
+
+Analyst's brief:
+{gaps}
+
+Resume:
+{resume}"""
+
+FAST_PROMPT = """You are an expert resume writer. In one pass, tailor the resume below to the job description:
+identify the job's most important skills and keywords, rewrite the summary and experience bullets to be
+achievement-oriented and use those keywords where the candidate's experience supports them, align the skills
+section with the job, and format everything as a clean, ATS-friendly plain-text resume.
+Do not invent facts. Return only the final resume, no commentary.
+
+Job description:
+{job_description}
+
+Resume:
+{resume}"""
+
 def get_resume_crew():
+    """
+    Returns the three resume enhancement agents. They are built once per
+    process and shared, so callers must not run them directly: run a copy
+    of a crew template from get_crew_template() instead.
+    """
+    return get_or_build(("resume_agents", CREW_MODEL), _build_resume_agents)
+
+
+def _build_resume_agents():
     """
     This function configures and returns the CrewAI crew for resume enhancement.
     """
+    from crewai import Agent
+
     groq_api_key = os.getenv("GROQ_API_KEY")
 
     if not groq_api_key:
         raise ValueError("GROQ_API_KEY environment variable not set. Please create a .env file and add it.")
-    llm = LLM(model="groq/llama-3.3-70b-versatile",api_key= groq_api_key)
+    llm = crew_llm(CREW_MODEL)
+    # Each agent's task is stopped after this long (DEADLINES['STAGES']['crew_agent'])
+    max_execution_time = deadlines.get_config()['STAGES'].get('crew_agent')
 
-    
 
     # Agent 1: Resume Analyst
     resume_analyst = Agent(
@@ -32,6 +128,7 @@ def get_resume_crew():
         ),
         llm=llm,
         allow_delegation=False,
+        max_execution_time=max_execution_time,
         verbose=True
     )
 
@@ -47,6 +144,7 @@ def get_resume_crew():
         ),
         llm=llm,
         allow_delegation=False,
+        max_execution_time=max_execution_time,
         verbose=True
     )
 
@@ -62,17 +160,64 @@ def get_resume_crew():
         ),
         llm=llm,
         allow_delegation=False,
+        max_execution_time=max_execution_time,
         verbose=True
     )
     
     return resume_analyst, content_specialist, editor
 
 
-def run_crew(resume_text, job_description_text):
+def run_crew(resume_text, job_description_text, use_cache=True, mode="full"):
+    """
+    Runs the resume enhancement crew, or returns the cached result of an
+    earlier run on the same resume and job description. mode is one of
+    CREW_MODES; the "fast" and "parallel" pipelines run through stream_crew.
+    """
+    if mode != "full":
+        return "".join(
+            data for event, data in stream_crew(resume_text, job_description_text, use_cache=use_cache, mode=mode)
+            if event == 'token'
+        )
+    resume_text, job_description_text = prepare_crew_inputs(resume_text, job_description_text)
+    return cached_llm_call(
+        CREW_MODEL,
+        _cache_prompt_type(mode, streamed=False),
+        _crew_cache_text(resume_text, job_description_text),
+        lambda: _kickoff_crew(resume_text, job_description_text),
+        use_cache=use_cache,
+    )
+
+
+def prepare_crew_inputs(resume_text, job_description_text):
+    """
+    Compacts the resume and job description and fits both into the crew
+    model's input budget (see prompt_prep). Returns the two texts.
+    """
+    job_description_text = prepare_text(job_description_text, CREW_MODEL, 'crew_job_description').text
+    reserve = estimate_tokens(job_description_text) + CREW_PROMPT_RESERVE
+    resume_text = prepare_text(resume_text, CREW_MODEL, 'crew_resume', reserve_tokens=reserve).text
+    return resume_text, job_description_text
+
+
+def _crew_cache_text(resume_text, job_description_text):
+    return f"{resume_text}\n--- JOB DESCRIPTION ---\n{job_description_text}"
+
+
+def _cache_prompt_type(mode, streamed=True):
+    # "full" has two pipelines: run_crew's three-agent crew (which keeps the cache
+    # entries written before there were modes) and stream_crew's crew plus streamed editor.
+    if mode == "full":
+        return "resume_crew_streamed" if streamed else "resume_crew"
+    return f"resume_crew_{mode}"
+
+
+def build_resume_tasks(resume_analyst, content_specialist, editor):
     """
-    Initializes and runs the resume enhancement crew with the provided texts.
+    Builds the analyst, writer and editor tasks. The resume and job description
+    are left as {resume_text} and {job_description_text} placeholders that
+    crewAI fills in from the kickoff inputs.
     """
-    resume_analyst, content_specialist, editor = get_resume_crew()
+    from crewai import Task
 
     # Task for Agent 1: The Resume Analyst
     task_analyze_resume = Task(
@@ -84,11 +229,11 @@ def run_crew(resume_text, job_description_text):
             "5. Create a detailed 'Strategic Brief' in markdown format that lists the extracted keywords, outlines the gaps, and provides clear, actionable recommendations for content improvement.\n\n"
             "Here is the resume you need to analyze:\n"
             "--- START RESUME ---\n"
-            f"{resume_text}\n"
+            "{resume_text}\n"
             "--- END RESUME ---\n\n"
             "And here is the job description you need to compare it against:\n"
             "--- START JOB DESCRIPTION ---\n"
-            f"{job_description_text}\n"
+            "{job_description_text}\n"
             "--- END JOB DESCRIPTION ---"
         ),
         expected_output=(
@@ -135,12 +280,317 @@ def run_crew(resume_text, job_description_text):
         context=[task_rewrite_content],
     )
 
-    resume_crew = Crew(
-        agents=[resume_analyst, content_specialist, editor],
-        tasks=[task_analyze_resume, task_rewrite_content, task_format_resume],
-        process=Process.sequential,
-        verbose=True
-    )
+    return task_analyze_resume, task_rewrite_content, task_format_resume
+
+
+def get_crew_template(kind="full"):
+    """
+    Returns a shared crew template, built once per process.
+
+    "full" runs all three tasks; "analysis" runs only the analyst and writer
+    (stream_crew runs the editor step itself). Templates are never kicked off
+    directly: each run uses template.copy(), which reuses the built LLM.
+    """
+    def build():
+        from crewai import Crew, Process
+
+        resume_analyst, content_specialist, editor = get_resume_crew()
+        task_analyze_resume, task_rewrite_content, task_format_resume = build_resume_tasks(
+            resume_analyst, content_specialist, editor
+        )
+        if kind == "analysis":
+            return Crew(
+                agents=[resume_analyst, content_specialist],
+                tasks=[task_analyze_resume, task_rewrite_content],
+                process=Process.sequential,
+                verbose=True
+            )
+        return Crew(
+            agents=[resume_analyst, content_specialist, editor],
+            tasks=[task_analyze_resume, task_rewrite_content, task_format_resume],
+            process=Process.sequential,
+            verbose=True
+        )
+
+    return get_or_build(("resume_crew", kind, CREW_MODEL), build)
+
 
-    final_result = resume_crew.kickoff()
+def get_editor_task():
+    """Returns the shared (un-run) editor task, for building the streamed editor prompt."""
+    return get_or_build(("resume_editor_task", CREW_MODEL), lambda: build_resume_tasks(*get_resume_crew())[2])
+
+
+def _kickoff_crew(resume_text, job_description_text):
+    """
+    Runs the resume enhancement crew with the provided texts.
+    """
+    resume_crew = get_crew_template("full").copy()
+    resume_crew.task_callback = _task_timer()
+    final_result = resume_crew.kickoff(
+        inputs={"resume_text": resume_text, "job_description_text": job_description_text}
+    )
     return str(final_result)
+
+
+def _task_timer():
+    """
+    Returns a crewAI task_callback that records how long each task took, as
+    the crew_analyst, crew_writer and crew_editor stages.
+    """
+    stages = iter(CREW_STAGES)
+    last = [time.perf_counter()]
+
+    def on_task_done(output):
+        now = time.perf_counter()
+        record(f"crew_{next(stages, 'task')}", now - last[0])
+        last[0] = now
+
+    return on_task_done
+
+
+def _editor_prompt(editor, task_format_resume, rewritten_content):
+    return (
+        f"You are a {editor.role}. {editor.backstory}\n"
+        f"Your goal: {editor.goal}\n\n"
+        f"{task_format_resume.description}\n\n"
+        "Here is the rewritten resume content from the Content Specialist:\n"
+        "--- START CONTENT ---\n"
+        f"{rewritten_content}\n"
+        "--- END CONTENT ---\n\n"
+        f"Expected output: {task_format_resume.expected_output}"
+    )
+
+
+def _complete(prompt, usage, **kwargs):
+    # One direct call to the model llm_router picks for crew steps; usage gets its (estimated) token counts.
+    text = llm_router.complete(CREW_STEP_TASK, prompt, **kwargs)
+    usage['prompt_tokens'] += estimate_tokens(prompt)
+    usage['completion_tokens'] += estimate_tokens(text)
+    return text
+
+
+def _stream(prompt, usage):
+    # Streaming version of _complete(): yields the reply piece by piece.
+    pieces = []
+    for piece in llm_router.stream(CREW_STEP_TASK, prompt):
+        pieces.append(piece)
+        yield piece
+    usage['prompt_tokens'] += estimate_tokens(prompt)
+    usage['completion_tokens'] += estimate_tokens("".join(pieces))
+
+
+def _report(mode, started, usage, cached=False):
+    # The final 'usage' event of a run; also recorded in the crew_<mode> stage histogram and token counters.
+    seconds = time.perf_counter() - started
+    if not cached:
+        record(f"crew_{mode}", seconds)
+        record_usage(f"crew_{mode}", usage['prompt_tokens'], usage['completion_tokens'])
+    return {'mode': mode, 'seconds': round(seconds, 3), 'cached': cached, **usage}
+
+
+def _stream_full(resume_text, job_description_text, usage):
+    # Analyst and writer as a sequential crew, then the editor's step streamed.
+    events = queue.Queue()
+    finished_stages = iter(CREW_STAGES)
+    time_task = _task_timer()
+
+    def on_task_done(output):
+        time_task(output)
+        events.put(next(finished_stages))
+        # Don't start the next agent for a cancelled run.
+        deadlines.check()
+
+    resume_crew = get_crew_template("analysis").copy()
+    resume_crew.task_callback = on_task_done
+    outcome = {}
+
+    def kickoff():
+        try:
+            outcome['result'] = resume_crew.kickoff(
+                inputs={"resume_text": resume_text, "job_description_text": job_description_text}
+            )
+        except Exception as e:
+            outcome['error'] = e
+        finally:
+            events.put(None)
+
+    yield 'stage', {'stage': 'analyst', 'status': 'running'}
+    # The crew runs in the caller's deadline scope, so it stops between agents once that ends.
+    threading.Thread(target=contextvars.copy_context().run, args=(kickoff,), name='resume-crew', daemon=True).start()
+    while True:
+        try:
+            crew_stage = events.get(timeout=CANCEL_POLL_INTERVAL)
+        except queue.Empty:
+            deadlines.check()
+            continue
+        if crew_stage is None:
+            break
+        yield 'stage', {'stage': crew_stage, 'status': 'done'}
+        if crew_stage == 'analyst':
+            yield 'stage', {'stage': 'writer', 'status': 'running'}
+    if 'error' in outcome:
+        raise outcome['error']
+    # crewAI counts the tokens LiteLLM reported for the analyst and writer.
+    crew_usage = getattr(outcome['result'], 'token_usage', None)
+    usage['prompt_tokens'] += getattr(crew_usage, 'prompt_tokens', 0)
+    usage['completion_tokens'] += getattr(crew_usage, 'completion_tokens', 0)
+
+    yield 'stage', {'stage': 'editor', 'status': 'running'}
+    editor = get_resume_crew()[2]
+    prompt = _editor_prompt(editor, get_editor_task(), str(outcome['result']))
+    with stage('crew_editor'):
+        for piece in _stream(prompt, usage):
+            yield 'token', piece
+    yield 'stage', {'stage': 'editor', 'status': 'done'}
+
+
+def _stream_parallel(resume_text, job_description_text, usage):
+    # JD keywords and the gap analysis at the same time, then one rewrite that also formats.
+    yield 'stage', {'stage': 'analyst', 'status': 'running'}
+    # Each call counts its own tokens; they are added up once both have finished.
+    keywords_usage = {'prompt_tokens': 0, 'completion_tokens': 0}
+    gaps_usage = {'prompt_tokens': 0, 'completion_tokens': 0}
+    with stage('crew_analyst'), ThreadPoolExecutor(max_workers=2, thread_name_prefix='crew-analysis') as pool:
+        # Copies of this context, so the calls run in the caller's deadline scope
+        keywords = pool.submit(
+            contextvars.copy_context().run, _complete, JD_KEYWORDS_PROMPT.format(job_description=job_description_text),
+            keywords_usage, max_tokens=ANALYSIS_MAX_TOKENS,
+        )
+        gaps = pool.submit(
+            contextvars.copy_context().run, _complete, GAP_ANALYSIS_PROMPT.format(resume=resume_text, job_description=job_description_text),
+            gaps_usage, max_tokens=ANALYSIS_MAX_TOKENS,
+        )
+        keywords, gaps = keywords.result(), gaps.result()
+    for counts in (keywords_usage, gaps_usage):
+        usage['prompt_tokens'] += counts['prompt_tokens']
+        usage['completion_tokens'] += counts['completion_tokens']
+    yield 'stage', {'stage': 'analyst', 'status': 'done'}
+
+    yield 'stage', {'stage': 'writer', 'status': 'running'}
+    prompt = REWRITE_PROMPT.format(keywords=keywords, gaps=gaps, resume=resume_text)
+    with stage('crew_writer'):
+        for piece in _stream(prompt, usage):
+            yield 'token', piece
+    yield 'stage', {'stage': 'writer', 'status': 'done'}
+    yield 'stage', {'stage': 'editor', 'status': 'done', 'skipped': True}
+
+
+def _stream_fast(resume_text, job_description_text, usage):
+    # Analysis, rewrite and formatting in a single prompt.
+    yield 'stage', {'stage': 'analyst', 'status': 'done', 'skipped': True}
+    yield 'stage', {'stage': 'writer', 'status': 'running'}
+    prompt = FAST_PROMPT.format(resume=resume_text, job_description=job_description_text)
+    with stage('crew_writer'):
+        for piece in _stream(prompt, usage):
+            yield 'token', piece
+    yield 'stage', {'stage': 'writer', 'status': 'done'}
+    yield 'stage', {'stage': 'editor', 'status': 'done', 'skipped': True}
+
+
+_PIPELINES = {
+    'full': _stream_full,
+    'parallel': _stream_parallel,
+    'fast': _stream_fast,
+}
+
+
+def stream_crew(resume_text, job_description_text, use_cache=True, mode="full"):
+    """
+    Runs the resume enhancement pipeline for mode (see CREW_MODES) and
+    reports progress while it runs.
+
+    Yields ('stage', {'stage': ..., 'status': 'running' | 'done'}) events for
+    the analyst, writer and editor (steps a mode leaves out are reported done
+    with 'skipped'), ('token', text) pieces of the final resume as the model
+    produces them, and last a ('usage', {'mode', 'seconds', 'cached',
+    'prompt_tokens', 'completion_tokens'}) report. In "full" mode the analyst
+    and writer run as a crew and the editor's step is sent straight to the
+    model so it can be streamed; its result is cached apart from run_crew's,
+    which comes from a different pipeline.
+    """
+    if mode not in _PIPELINES:
+        raise ValueError(f"Unknown crew mode {mode!r}; expected one of {', '.join(CREW_MODES)}.")
+    started = time.perf_counter()
+    usage = {'prompt_tokens': 0, 'completion_tokens': 0}
+    resume_text, job_description_text = prepare_crew_inputs(resume_text, job_description_text)
+    cache = get_cache()
+    key = make_key(CREW_MODEL, _cache_prompt_type(mode), _crew_cache_text(resume_text, job_description_text))
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            for crew_stage in CREW_STAGES:
+                yield 'stage', {'stage': crew_stage, 'status': 'done', 'cached': True}
+            yield 'token', cached
+            yield 'usage', _report(mode, started, usage, cached=True)
+            return
+
+    pieces = []
+    for event, data in _PIPELINES[mode](resume_text, job_description_text, usage):
+        if event == 'token':
+            pieces.append(data)
+        yield event, data
+
+    final_result = "".join(pieces)
+    if final_result:
+        cache.set(key, final_result)
+    yield 'usage', _report(mode, started, usage)
+
+SECTION_UPDATE_PROMPT = """You are an expert resume writer updating one section of a resume you already tailored to a job description.
+The candidate edited this section; rewrite the new version in the same style as your earlier rewrite, tailored to the job description.
+Do not invent facts. Return only the rewritten content of the section, without its heading.
+
+Job description:
+{job_description}
+
+Your earlier rewrite of this section:
+{previous}
+
+The candidate's new version of the section:
+{content}"""
+
+
+def stream_crew_update(plan, job_description_text, use_cache=True):
+    """
+    Applies an incremental plan (see login_app/incremental.py): sections that
+    haven't changed since the previous run keep their enhanced text, and each
+    changed section is rewritten with one LLM call instead of a crew run.
+    Yields the same events as stream_crew, tokens in resume order.
+    """
+    started = time.perf_counter()
+    usage = {'prompt_tokens': 0, 'completion_tokens': 0}
+    job_description_text = prepare_text(job_description_text, CREW_MODEL, 'crew_job_description').text
+    cache = get_cache()
+    yield 'stage', {'stage': 'analyst', 'status': 'done', 'cached': True}
+    yield 'stage', {'stage': 'writer', 'status': 'running'}
+    for section in plan.sections:
+        if section.reuse:
+            yield 'token', section.previous_output
+            continue
+        prompt = SECTION_UPDATE_PROMPT.format(
+            job_description=job_description_text,
+            previous=section.previous_output.strip() or "(this is a new section)",
+            content=prepare_text(section.content, CREW_MODEL, 'crew_section_update').text,
+        )
+        # The heading is written here, formatted as in the previous result, so the
+        # next run can find this section again whatever the model returns.
+        previous_heading = section.previous_output.lstrip().split("\n", 1)[0]
+        yield 'token', f"{previous_heading if section.heading.lower() in previous_heading.lower() else section.heading}\n"
+        key = make_key(CREW_MODEL, "resume_crew_section", prompt)
+        text = cache.get(key) if use_cache else None
+        if text is not None:
+            yield 'token', text
+            continue
+        pieces = []
+        with stage('crew_section_update'):
+            for piece in _stream(prompt, usage):
+                pieces.append(piece)
+                yield 'token', piece
+        text = "".join(pieces)
+        if not text.endswith("\n"):
+            # The next section has to start on its own line to be found again next time.
+            yield 'token', "\n\n"
+            text += "\n\n"
+        cache.set(key, text)
+    yield 'stage', {'stage': 'writer', 'status': 'done'}
+    yield 'stage', {'stage': 'editor', 'status': 'done', 'cached': True}
+    yield 'usage', _report('update', started, usage)
@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class LoginAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'login_app'
+
+    def ready(self):
+        from . import jobs, llm_client, preload
+
+        preload_config = preload.get_config()
+        if preload_config['ENABLED']:
+            if preload_config['BACKGROUND']:
+                preload.preload_in_background()
+            else:
+                preload.preload()
+
+        if llm_client.get_config()['WARM_UP']:
+            llm_client.warm_up_in_background()
+
+        jobs.start_workers_with_server()
@@ -0,0 +1,269 @@
+# login_app/ats_scoring.py
+
+# Local ATS match scoring: no LLM needed for the percentage.
+# Job description and resume text are tokenized and normalized (skill
+# synonyms folded together, e.g. "k8s" -> Kubernetes), each job description
+# term gets a BM25-style weight, and the score is the weighted share of those
+# terms the resume contains. The result is deterministic and takes
+# milliseconds; score_many() scores any number of resumes against one job
+# description with a single NumPy matrix product.
+
+import re
+from collections import Counter, namedtuple
+
+import numpy as np
+
+# Canonical skill name -> other ways it is written. Matching is case-insensitive.
+SKILL_SYNONYMS = {
+    'Python': ['python3'],
+    'Java': [],
+    'JavaScript': ['js', 'ecmascript'],
+    'TypeScript': [],
+    'Node.js': ['node', 'nodejs'],
+    'React': ['reactjs', 'react.js'],
+    'Angular': ['angularjs'],
+    'Vue': ['vuejs', 'vue.js'],
+    'C++': ['cpp'],
+    'C#': ['csharp', 'c sharp'],
+    '.NET': ['dotnet', 'asp.net'],
+    'Golang': ['go lang'],
+    'Rust': [],
+    'Ruby': [],
+    'PHP': [],
+    'Kotlin': [],
+    'Swift': [],
+    'Scala': [],
+    'SQL': ['t-sql', 'pl/sql'],
+    'PostgreSQL': ['postgres', 'psql'],
+    'MySQL': [],
+    'MongoDB': ['mongo'],
+    'Redis': [],
+    'Elasticsearch': ['elastic search', 'opensearch'],
+    'Django': [],
+    'Flask': [],
+    'FastAPI': [],
+    'Spring': ['spring boot', 'springboot'],
+    'REST APIs': ['restful', 'rest api', 'restful api', 'restful apis'],
+    'GraphQL': [],
+    'AWS': ['amazon web services'],
+    'Azure': ['microsoft azure'],
+    'GCP': ['google cloud', 'google cloud platform'],
+    'Docker': ['containerization'],
+    'Kubernetes': ['k8s'],
+    'Terraform': [],
+    'CI/CD': ['continuous integration', 'continuous delivery', 'continuous deployment', 'cicd'],
+    'Git': ['github', 'gitlab'],
+    'Linux': ['unix'],
+    'Machine Learning': ['ml'],
+    'Deep Learning': [],
+    'Artificial Intelligence': ['ai'],
+    'Natural Language Processing': ['nlp'],
+    'Computer Vision': [],
+    'Large Language Models': ['llm', 'llms'],
+    'Data Science': [],
+    'Data Analysis': ['data analytics', 'analytics'],
+    'Data Engineering': [],
+    'Statistics': ['statistical analysis', 'statistical'],
+    'pandas': [],
+    'NumPy': [],
+    'scikit-learn': ['sklearn', 'scikit learn'],
+    'TensorFlow': [],
+    'PyTorch': ['torch'],
+    'Spark': ['pyspark', 'apache spark'],
+    'Hadoop': [],
+    'Kafka': ['apache kafka'],
+    'Airflow': ['apache airflow'],
+    'Tableau': [],
+    'Power BI': ['powerbi'],
+    'Excel': ['microsoft excel', 'ms excel'],
+    'ETL': ['elt'],
+    'Microservices': ['microservice', 'micro services'],
+    'Agile': ['scrum', 'kanban'],
+    'Project Management': ['pmp'],
+    'Unit Testing': ['unit tests', 'pytest', 'junit'],
+    'HTML': ['html5'],
+    'CSS': ['css3'],
+    'Communication': ['communication skills'],
+    'Leadership': ['team lead', 'led teams'],
+}
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her here
+hers herself him himself his how i if in into is it its itself just me more most my myself no nor not now of off
+on once only or other our ours ourselves out over own same she should so some such than that the their theirs
+them themselves then there these they this those through to too under until up very was we were what when where
+which while who whom why will with would you your yours yourself yourselves per via etc e.g i.e within across
+ll re ve don doesn isn aren won
+""".split())
+
+# Common job-ad words that say little about fit; they count for a quarter of a normal term
+# and are never listed as matched or missing keywords.
+_GENERIC_WORDS = """
+experience experienced team teams work working ability able strong skill skills knowledge year years
+responsibility responsibilities requirement requirements required including include role candidate job
+position company excellent good great new using use used must preferred plus looking join opportunity
+environment understanding ensure develop developing support well highly based level related relevant
+minimum degree bachelor master equivalent field proven demonstrated solid familiarity familiar hands
+nice ideal ideally senior junior mid successful seeking want wanted day days
+need needs needed require requires desired desire seek seeks look looks searching hire hiring hired
+apply applying applicant applicants offer offers offering benefits salary compensation description
+qualification qualifications duties duty passionate passion motivated driven dynamic exciting fast paced
+help helping grow growing growth sure someone person individual ready eager love like
+""".split()
+
+SKILL_WEIGHT = 2.0
+GENERIC_WEIGHT = 0.25
+BM25_K1 = 1.2
+MAX_MISSING_KEYWORDS = 15
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+_SKILL_IDS = {}       # token or phrase -> skill id
+_SKILL_NAMES = {}     # skill id -> display name
+
+
+def _skill_id(name):
+    return "skill:" + name.lower()
+
+
+for _name, _variants in SKILL_SYNONYMS.items():
+    for _variant in [_name, *_variants]:
+        _SKILL_IDS[_variant.lower()] = _skill_id(_name)
+    _SKILL_NAMES[_skill_id(_name)] = _name
+
+# Multi-word (or punctuated) skill spellings are matched before plain tokens, longest first.
+_PHRASES = sorted((variant for variant in _SKILL_IDS if not re.fullmatch(r"[a-z0-9]+", variant)), key=len, reverse=True)
+_TERM_RE = re.compile(
+    r"(?<![\w+#])(" + "|".join(re.escape(phrase) for phrase in _PHRASES) + r")(?![\w+#])|" + _TOKEN_RE.pattern
+)
+
+ATSScore = namedtuple('ATSScore', ['score', 'matched', 'missing'])
+
+
+def _stem(token):
+    if len(token) > 4 and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+# Stemmed like the terms they are compared with
+GENERIC_TERMS = frozenset(_stem(word) for word in _GENERIC_WORDS)
+
+
+def normalize_terms(text):
+    """
+    Turns text into normalized terms: lowercased, stopwords and numbers
+    dropped, plurals folded, and every spelling of a known skill mapped to
+    one id (see SKILL_SYNONYMS).
+
+    Returns:
+        list[str]: The terms in order of appearance.
+    """
+    terms = []
+    for match in _TERM_RE.finditer(text.lower()):
+        if match.group(1):
+            terms.append(_SKILL_IDS[match.group(1)])
+            continue
+        token = match.group(0).rstrip('.')
+        if token in _SKILL_IDS:
+            terms.append(_SKILL_IDS[token])
+        elif token not in STOPWORDS and len(token) > 1 and token[0].isalpha():
+            terms.append(_stem(token))
+    return terms
+
+
+def display_term(term):
+    """Returns the human-readable form of a normalized term."""
+    return _SKILL_NAMES.get(term, term)
+
+
+def term_weights(job_description_text):
+    """
+    Weights each job description term: BM25 term-frequency saturation,
+    doubled for known skills and quartered for generic job-ad words.
+
+    Returns:
+        tuple: (list of terms, NumPy array of weights), heaviest first.
+    """
+    counts = Counter(normalize_terms(job_description_text))
+    if not counts:
+        return [], np.zeros(0)
+    terms = list(counts)
+    tf = np.array([counts[term] for term in terms], dtype=float)
+    weights = tf * (BM25_K1 + 1) / (tf + BM25_K1)
+    weights *= np.array([
+        SKILL_WEIGHT if term in _SKILL_NAMES else GENERIC_WEIGHT if term in GENERIC_TERMS else 1.0
+        for term in terms
+    ])
+    order = np.argsort(-weights, kind='stable')
+    return [terms[i] for i in order], weights[order]
+
+
+def profile_keywords(job_description_text):
+    """
+    Returns the job description's weighted terms as JSON-friendly
+    [[term, weight], ...] pairs, for storing on a JobDescription.
+    """
+    terms, weights = term_weights(job_description_text)
+    return [[term, round(float(weight), 4)] for term, weight in zip(terms, weights)]
+
+
+def required_skills(keywords):
+    """Returns the display names of the known skills among [[term, weight], ...] keywords."""
+    return [display_term(term) for term, _ in keywords if term in _SKILL_NAMES]
+
+
+def score_many(resume_texts, job_description_text, keywords=None):
+    """
+    Scores several resumes against one job description in one vectorized pass.
+
+    Args:
+        resume_texts (list[str]): The resumes' text.
+        job_description_text (str): The job description text.
+        keywords (list): Precomputed profile_keywords() for the job description;
+            when given, the job description text isn't analyzed again.
+
+    Returns:
+        list[ATSScore]: One per resume, in input order. score is a percentage
+        (0-100); matched and missing are display names, heaviest first.
+    """
+    if keywords is not None:
+        terms = [term for term, _ in keywords]
+        weights = np.array([weight for _, weight in keywords], dtype=float)
+    else:
+        terms, weights = term_weights(job_description_text)
+    if not terms:
+        return [ATSScore(0.0, [], []) for _ in resume_texts]
+
+    index = {term: column for column, term in enumerate(terms)}
+    present = np.zeros((len(resume_texts), len(terms)), dtype=bool)
+    for row, text in enumerate(resume_texts):
+        columns = [index[term] for term in set(normalize_terms(text)) if term in index]
+        present[row, columns] = True
+
+    scores = present @ weights / weights.sum() * 100
+    results = []
+    for row in range(len(resume_texts)):
+        matched = [display_term(terms[c]) for c in np.flatnonzero(present[row]) if terms[c] not in GENERIC_TERMS]
+        missing = [display_term(terms[c]) for c in np.flatnonzero(~present[row]) if terms[c] not in GENERIC_TERMS]
+        results.append(ATSScore(round(float(scores[row]), 1), matched, missing[:MAX_MISSING_KEYWORDS]))
+    return results
+
+
+def score_resume(resume_text, job_description_text, keywords=None):
+    """
+    Scores one resume against a job description (or its precomputed keywords).
+
+    Returns:
+        ATSScore: The percentage match and the matched and missing keywords.
+    """
+    return score_many([resume_text], job_description_text, keywords=keywords)[0]
+
+
+def format_report(ats_score):
+    """Renders an ATSScore as the plain-text report shown to the user."""
+    lines = [f"Percentage match: {ats_score.score:g}%", ""]
+    lines.append("Missing keywords: " + (", ".join(ats_score.missing) if ats_score.missing else "none"))
+    if ats_score.matched:
+        lines.append("Matched keywords: " + ", ".join(ats_score.matched[:MAX_MISSING_KEYWORDS]))
+    return "\n".join(lines)
@@ -2,12 +2,21 @@
 
 # This file contains the core logic for the ATS functionality,
 # extracted from the original Streamlit application.
-# It uses PyMuPDF for PDF text extraction and an LLM for generating responses.
+# It uses PyMuPDF (via pdf_extract) for PDF text extraction and an LLM for generating responses.
 
-import fitz  # PyMuPDF for PDF handling
+import logging
 import os
 from dotenv import load_dotenv
-from groq import Groq  # Import the Groq client
+
+from . import deadlines, llm_router  # Picks the model per task and prompt size
+from .ats_scoring import format_report, score_resume
+from .instrumentation import timed
+from .llm_cache import cached_llm_call, get_cache
+from .pdf_extract import extract_text, read_upload
+from .prompt_prep import prepare_text
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables from a .env file.
 # Note: For production, you should manage your API keys more securely,
@@ -19,33 +28,82 @@ load_dotenv()
 # You will also need to install the library: pip install groq
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 
-def get_llm_response(prompt: str) -> str:
+# The model is chosen by llm_router: LLM_ROUTER['TASKS']['ats_evaluation'] in settings.
+ATS_TASK = 'ats_evaluation'
+
+MISSING_KEY_MESSAGE = "Error: GROQ_API_KEY not found in environment variables."
+LLM_ERROR_MESSAGE = "Sorry, I am unable to process this request at the moment. Please check your API key and network connection."
+TIMEOUT_MESSAGE = "Sorry, the model took too long to answer. Please try again."
+
+def is_error_response(response: str) -> bool:
+    """
+    Whether an evaluation ended in one of the error messages above instead of
+    the model's answer (after the local score report, for 'ats_match').
+    """
+    return response.endswith((MISSING_KEY_MESSAGE, LLM_ERROR_MESSAGE, TIMEOUT_MESSAGE))
+
+def get_llm_response(prompt: str, prompt_type: str = "raw", use_cache: bool = True, task: str = ATS_TASK) -> str:
     """
     Calls the Groq API to get a response from an LLM.
+    Responses are served from the LLM cache when the same prompt was answered before.
     
     Args:
         prompt (str): The full prompt to send to the LLM.
+        prompt_type (str): Label for the kind of prompt, part of the cache key.
+        use_cache (bool): Set to False to skip the cache lookup and force a fresh call.
+        task (str): The llm_router task that picks the model.
         
     Returns:
-        str: The response from the LLM.
+        str: The response from the LLM, or one of the error messages above.
+
+    Raises:
+        deadlines.Cancelled: If the request was cancelled while waiting.
     """
     if not GROQ_API_KEY:
-        return "Error: GROQ_API_KEY not found in environment variables."
+        return MISSING_KEY_MESSAGE
         
+    route = llm_router.choose_route(task, estimate_tokens(prompt))
     try:
-        client = Groq(api_key=GROQ_API_KEY)
-        response = client.chat.completions.create(
-            model="llama3-8b-8192",  # You can choose a different model if needed.
-            messages=[{"role": "user", "content": prompt}]
+        return cached_llm_call(
+            route.model, prompt_type, prompt, lambda: llm_router.complete(task, prompt, route=route), use_cache=use_cache
         )
-        return response.choices[0].message.content
-    except Exception as e:
-        print(f"Error calling LLM API: {e}")
-        return "Sorry, I am unable to process this request at the moment. Please check your API key and network connection."
+    except deadlines.Cancelled:
+        # Nobody is waiting for the answer any more
+        raise
+    except deadlines.DeadlineExceeded:
+        logger.warning("LLM %s call ran past its deadline", task)
+        return TIMEOUT_MESSAGE
+    except Exception:
+        logger.exception("Error calling LLM API")
+        return LLM_ERROR_MESSAGE
+
+async def aget_llm_response(prompt: str, prompt_type: str = "raw", use_cache: bool = True, task: str = ATS_TASK) -> str:
+    """
+    Async version of get_llm_response, using the shared AsyncGroq client.
+    """
+    if not GROQ_API_KEY:
+        return MISSING_KEY_MESSAGE
 
+    route = llm_router.choose_route(task, estimate_tokens(prompt))
+    try:
+        return await get_cache().aget_or_compute(
+            route.model, prompt_type, prompt, lambda: llm_router.acomplete(task, prompt, route=route), use_cache=use_cache
+        )
+    except deadlines.Cancelled:
+        # Nobody is waiting for the answer any more
+        raise
+    except deadlines.DeadlineExceeded:
+        logger.warning("LLM %s call ran past its deadline", task)
+        return TIMEOUT_MESSAGE
+    except Exception:
+        logger.exception("Error calling LLM API")
+        return LLM_ERROR_MESSAGE
+
+@timed('pdf_extract')
 def extract_text_from_pdf(pdf_file) -> str:
     """
     Extracts text from a PDF file uploaded via Django's request.FILES.
+    Parsed text is cached by file contents, see pdf_extract.
     
     Args:
         pdf_file: The InMemoryUploadedFile object from Django's request.FILES.
@@ -55,28 +113,23 @@ def extract_text_from_pdf(pdf_file) -> str:
         
     Raises:
         FileNotFoundError: If no file is provided.
+        PDFExtractionError: If the file is too large or not a readable PDF.
     """
-    if pdf_file:
-        doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        return text.strip()
-    else:
-        raise FileNotFoundError("No file uploaded")
+    return extract_text(read_upload(pdf_file))
 
-def generate_ats_evaluation(resume_text: str, job_description: str, prompt_type: str) -> str:
+def build_ats_prompt(resume_text: str, job_description: str, prompt_type: str, ats_score=None) -> str:
     """
-    Generates a response from the LLM based on the prompt type.
+    Builds the full prompt for an ATS evaluation.
 
     Args:
         resume_text (str): The extracted text from the resume.
         job_description (str): The job description text.
         prompt_type (str): The type of prompt to use ('hr_review' or 'ats_match').
+        ats_score (ATSScore): For 'ats_match', the local score; the model is then
+            only asked for final thoughts on it.
 
     Returns:
-        str: The LLM's response.
+        str: The prompt to send to the LLM.
     """
     hr_prompt = """
     You are an experienced Technical Human Resource Manager. Your task is to review the provided resume against the job description.
@@ -89,13 +142,115 @@ def generate_ats_evaluation(resume_text: str, job_description: str, prompt_type:
     Your task is to evaluate the resume against the provided job description.
     Give the percentage match, list keywords that are missing, and provide final thoughts.
     """
+
+    final_thoughts_prompt = """
+    You are a skilled ATS (Applicant Tracking System) scanner with a deep understanding of data science and ATS functionality.
+    The resume has already been scored against the job description: {score}% match, missing keywords: {missing}.
+    Do not calculate another percentage. Give only your final thoughts in 3-5 sentences: how well the candidate fits
+    and what they should change in the resume to improve the match.
+    """
     
     final_prompt = ""
     if prompt_type == 'hr_review':
         final_prompt = hr_prompt
+    elif prompt_type == 'ats_match' and ats_score is not None:
+        final_prompt = final_thoughts_prompt.format(score=f"{ats_score.score:g}", missing=", ".join(ats_score.missing) or "none")
     elif prompt_type == 'ats_match':
         final_prompt = ats_prompt
 
-    full_input = f"Job Description:\n{job_description}\n\nResume Text:\n{resume_text}\n\n{final_prompt}"
-    
-    return get_llm_response(full_input)
+    # PDF artifacts are removed and both texts are fitted into the input budget of
+    # the model the router picks for their size (a larger one for long resumes)
+    model = llm_router.choose_route(
+        ATS_TASK, estimate_tokens(job_description) + estimate_tokens(resume_text) + estimate_tokens(final_prompt)
+    ).model
+    job_description = prepare_text(job_description, model, 'ats_job_description').text
+    reserve = estimate_tokens(job_description) + estimate_tokens(final_prompt)
+    resume_text = prepare_text(resume_text, model, f'ats_{prompt_type}', reserve_tokens=reserve).text
+
+    return f"Job Description:\n{job_description}\n\nResume Text:\n{resume_text}\n\n{final_prompt}"
+
+def _final_thoughts_heading(report: str) -> str:
+    return f"{report}\n\nFinal thoughts:\n"
+
+@timed('ats_evaluation')
+def generate_ats_evaluation(resume_text: str, job_description: str, prompt_type: str, use_cache: bool = True, final_thoughts: bool = True, keywords=None) -> str:
+    """
+    Generates a response from the LLM based on the prompt type.
+    For 'ats_match' the percentage and missing keywords are computed locally
+    (ats_scoring); the LLM only adds final thoughts, and only if final_thoughts is True.
+
+    Args:
+        resume_text (str): The extracted text from the resume.
+        job_description (str): The job description text.
+        prompt_type (str): The type of prompt to use ('hr_review' or 'ats_match').
+        use_cache (bool): Set to False to bypass cached responses for this request.
+        final_thoughts (bool): Whether to ask the LLM for final thoughts on an 'ats_match' score.
+        keywords (list): A saved JobDescription's precomputed keywords, used for the 'ats_match' score.
+
+    Returns:
+        str: The LLM's response.
+    """
+    if prompt_type == 'ats_match':
+        ats_score = score_resume(resume_text, job_description, keywords=keywords)
+        report = format_report(ats_score)
+        if not final_thoughts:
+            return report
+        full_input = build_ats_prompt(resume_text, job_description, prompt_type, ats_score)
+        return _final_thoughts_heading(report) + get_llm_response(full_input, 'ats_final_thoughts', use_cache=use_cache)
+
+    full_input = build_ats_prompt(resume_text, job_description, prompt_type)
+    return get_llm_response(full_input, prompt_type, use_cache=use_cache)
+
+@timed('ats_evaluation')
+async def agenerate_ats_evaluation(resume_text: str, job_description: str, prompt_type: str, use_cache: bool = True, final_thoughts: bool = True, keywords=None) -> str:
+    """
+    Async version of generate_ats_evaluation for async views.
+    """
+    if prompt_type == 'ats_match':
+        ats_score = score_resume(resume_text, job_description, keywords=keywords)
+        report = format_report(ats_score)
+        if not final_thoughts:
+            return report
+        full_input = build_ats_prompt(resume_text, job_description, prompt_type, ats_score)
+        return _final_thoughts_heading(report) + await aget_llm_response(full_input, 'ats_final_thoughts', use_cache=use_cache)
+
+    full_input = build_ats_prompt(resume_text, job_description, prompt_type)
+    return await aget_llm_response(full_input, prompt_type, use_cache=use_cache)
+
+@timed('ats_evaluation')
+async def astream_ats_evaluation(resume_text: str, job_description: str, prompt_type: str, use_cache: bool = True, final_thoughts: bool = True, keywords=None):
+    """
+    Streaming version of agenerate_ats_evaluation: yields the response text
+    piece by piece as the model produces it. For 'ats_match' the local
+    score report comes first, straight away.
+    """
+    if prompt_type == 'ats_match':
+        ats_score = score_resume(resume_text, job_description, keywords=keywords)
+        report = format_report(ats_score)
+        if not final_thoughts:
+            yield report
+            return
+        yield _final_thoughts_heading(report)
+        full_input = build_ats_prompt(resume_text, job_description, prompt_type, ats_score)
+        prompt_type = 'ats_final_thoughts'
+    else:
+        full_input = build_ats_prompt(resume_text, job_description, prompt_type)
+
+    if not GROQ_API_KEY:
+        yield MISSING_KEY_MESSAGE
+        return
+
+    route = llm_router.choose_route(ATS_TASK, estimate_tokens(full_input))
+    try:
+        async for piece in get_cache().astream_or_compute(
+            route.model, prompt_type, full_input, lambda: llm_router.astream(ATS_TASK, full_input, route=route), use_cache=use_cache
+        ):
+            yield piece
+    except deadlines.Cancelled:
+        raise
+    except deadlines.DeadlineExceeded:
+        logger.warning("LLM %s stream ran past its deadline", ATS_TASK)
+        yield TIMEOUT_MESSAGE
+    except Exception:
+        logger.exception("Error calling LLM API")
+        yield LLM_ERROR_MESSAGE
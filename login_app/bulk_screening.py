@@ -0,0 +1,247 @@
+# login_app/bulk_screening.py
+
+# Bulk ATS screening: one job description against hundreds of resumes.
+# PDFs (uploaded individually, inside a zip, or read from a directory) are
+# extracted on a process pool, every resume is scored against the job
+# description in one vectorized pass (ats_scoring.score_many), and only the
+# top N candidates are sent to the LLM for an HR review. Used by the bulk
+# screening view and `manage.py screen_resumes`.
+
+import csv
+import io
+import logging
+import multiprocessing
+import os
+import time
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+
+from .ats_scoring import score_many
+from .ats_service import generate_ats_evaluation
+from .llm_scheduler import BATCH, priority
+from .pdf_extract import content_hash, get_config as get_pdf_config, get_extractor, text_or_error
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'PROCESSES': None,                      # extraction processes; None uses the CPU count
+    'PROCESS_MIN_FILES': 50,                # smaller batches are extracted in-process
+    'MAX_FILES': 1000,
+    'MAX_TOTAL_BYTES': 200 * 1024 * 1024,   # across all files, after unzipping
+    'TOP_N': 10,                            # candidates that get an LLM HR review
+    'REVIEW_CONCURRENCY': 4,
+    'RESULT_TTL': 60 * 60,                  # how long a result stays downloadable
+}
+
+CSV_COLUMNS = ['rank', 'file', 'score', 'missing_keywords', 'matched_keywords', 'hr_review', 'error']
+
+
+def get_config():
+    """Returns the BULK_SCREENING settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'BULK_SCREENING', {})}
+
+
+class BulkScreeningError(ValueError):
+    """Raised when an upload is unusable as a whole (too many files, too large, bad zip)."""
+
+
+# One screened resume. score is None (and error set) when the PDF couldn't be read.
+Candidate = namedtuple('Candidate', ['rank', 'name', 'score', 'matched', 'missing', 'hr_review', 'error'])
+
+# candidates are ranked best first; timings are in seconds.
+ScreeningResult = namedtuple('ScreeningResult', ['candidates', 'timings', 'resumes_per_second'])
+
+
+class _PDFCollector:
+    def __init__(self, config):
+        self.max_files = config['MAX_FILES']
+        self.max_total_bytes = config['MAX_TOTAL_BYTES']
+        self.items = []
+        self.total_bytes = 0
+
+    def add(self, name, data):
+        if len(self.items) >= self.max_files:
+            raise BulkScreeningError(f"At most {self.max_files} resumes can be screened at once.")
+        self.total_bytes += len(data)
+        if self.total_bytes > self.max_total_bytes:
+            raise BulkScreeningError(f"The upload is larger than {self.max_total_bytes // (1024 * 1024)} MB.")
+        self.items.append((name, data))
+
+    def add_zip(self, name, fileobj):
+        try:
+            archive = zipfile.ZipFile(fileobj)
+        except zipfile.BadZipFile as e:
+            raise BulkScreeningError(f"{name} is not a valid zip file.") from e
+        with archive:
+            for info in archive.infolist():
+                member = info.filename
+                if info.is_dir() or not member.lower().endswith('.pdf') or '__MACOSX' in member:
+                    continue
+                # Check the declared size before inflating anything.
+                if self.total_bytes + info.file_size > self.max_total_bytes:
+                    raise BulkScreeningError(f"The upload is larger than {self.max_total_bytes // (1024 * 1024)} MB.")
+                self.add(os.path.basename(member), archive.read(info))
+
+
+def collect_uploaded_pdfs(uploaded_files):
+    """
+    Reads uploaded PDFs and zip files of PDFs.
+
+    Args:
+        uploaded_files (list): UploadedFile objects from request.FILES.getlist().
+
+    Returns:
+        list[tuple]: (file name, PDF bytes) pairs.
+
+    Raises:
+        BulkScreeningError: If there are too many files or they are too large in total.
+    """
+    collector = _PDFCollector(get_config())
+    for uploaded_file in uploaded_files:
+        name = uploaded_file.name
+        if name.lower().endswith('.zip'):
+            collector.add_zip(name, uploaded_file)
+        elif name.lower().endswith('.pdf'):
+            collector.add(name, b"".join(uploaded_file.chunks()))
+    return collector.items
+
+
+def collect_directory_pdfs(path):
+    """Reads every PDF under path (recursively); returns (relative name, bytes) pairs."""
+    collector = _PDFCollector(get_config())
+    for root, _, files in sorted(os.walk(path)):
+        for file_name in sorted(files):
+            full_path = os.path.join(root, file_name)
+            if file_name.lower().endswith('.pdf'):
+                with open(full_path, 'rb') as f:
+                    collector.add(os.path.relpath(full_path, path), f.read())
+            elif file_name.lower().endswith('.zip'):
+                with open(full_path, 'rb') as f:
+                    collector.add_zip(file_name, f)
+    return collector.items
+
+
+def extract_texts(items, processes=None):
+    """
+    Extracts the text of many PDFs, on a process pool for larger batches.
+    Texts already in the PDF extraction cache are reused, and new ones are added to it.
+
+    Args:
+        items (list[tuple]): (name, PDF bytes) pairs.
+        processes (int): Number of worker processes (default: BULK_SCREENING['PROCESSES']).
+
+    Returns:
+        list[tuple]: (text or None, error or None), in input order.
+    """
+    config = get_config()
+    pdf_config = get_pdf_config()
+    extractor = get_extractor()
+    results = [None] * len(items)
+    misses = []
+    for position, (_, data) in enumerate(items):
+        cached = extractor.cache.get(content_hash(data))
+        if cached is not None:
+            results[position] = ("".join(cached).strip(), None)
+        else:
+            misses.append(position)
+
+    args = [(items[position][1], pdf_config['MAX_PAGES'], pdf_config['MAX_BYTES']) for position in misses]
+    if len(misses) < config['PROCESS_MIN_FILES']:
+        outcomes = [text_or_error(*arg) for arg in args]
+    else:
+        # spawn, not fork: the web process has threads (executor, crew workers) that fork would copy mid-flight.
+        with ProcessPoolExecutor(
+            max_workers=processes or config['PROCESSES'] or os.cpu_count(),
+            mp_context=multiprocessing.get_context('spawn'),
+        ) as pool:
+            outcomes = list(pool.map(text_or_error, *zip(*args), chunksize=8))
+
+    for position, (text, error) in zip(misses, outcomes):
+        results[position] = (text, error)
+        if text is not None:
+            extractor.cache.set(content_hash(items[position][1]), (text,))
+    return results
+
+
+def screen_resumes(items, job_description, top_n=None, use_cache=True, hr_review=True, processes=None):
+    """
+    Ranks resumes against a job description.
+
+    Args:
+        items (list[tuple]): (name, PDF bytes) pairs.
+        job_description (str): The job description text.
+        top_n (int): How many of the best candidates get an LLM HR review (default: BULK_SCREENING['TOP_N']).
+        use_cache (bool): Set to False to bypass cached LLM responses.
+        hr_review (bool): Set to False to skip the LLM entirely.
+        processes (int): Extraction processes (default: BULK_SCREENING['PROCESSES']).
+
+    Returns:
+        ScreeningResult
+    """
+    config = get_config()
+    top_n = config['TOP_N'] if top_n is None else top_n
+    timings = {}
+    started = time.perf_counter()
+
+    extracted = extract_texts(items, processes=processes)
+    timings['extract'] = time.perf_counter() - started
+
+    step = time.perf_counter()
+    readable = [position for position, (text, _) in enumerate(extracted) if text]
+    scores = score_many([extracted[position][0] for position in readable], job_description)
+    timings['score'] = time.perf_counter() - step
+
+    ranked = sorted(zip(readable, scores), key=lambda pair: (-pair[1].score, items[pair[0]][0]))
+    reviews = {}
+    step = time.perf_counter()
+    if hr_review and top_n > 0 and ranked:
+        top = [position for position, _ in ranked[:top_n]]
+
+        def review(position):
+            # Queued behind interactive requests when the model's rate limit is reached
+            with priority(BATCH):
+                return generate_ats_evaluation(extracted[position][0], job_description, 'hr_review', use_cache=use_cache)
+
+        with ThreadPoolExecutor(max_workers=config['REVIEW_CONCURRENCY']) as pool:
+            reviews = dict(zip(top, pool.map(review, top)))
+    timings['review'] = time.perf_counter() - step
+
+    candidates = [
+        Candidate(rank, items[position][0], ats_score.score, ats_score.matched, ats_score.missing, reviews.get(position, ''), '')
+        for rank, (position, ats_score) in enumerate(ranked, start=1)
+    ]
+    for position, (text, error) in enumerate(extracted):
+        if not text:
+            candidates.append(Candidate(None, items[position][0], None, [], [], '', error or "No text found in the PDF."))
+
+    timings['total'] = time.perf_counter() - started
+    screening_seconds = timings['extract'] + timings['score']
+    resumes_per_second = len(items) / screening_seconds if screening_seconds else 0.0
+    logger.info("Screened %d resumes in %.2fs (%.1f resumes/s)", len(items), timings['total'], resumes_per_second)
+    return ScreeningResult(candidates, timings, resumes_per_second)
+
+
+def write_csv(result, out):
+    """Writes a ScreeningResult as CSV to the text stream out."""
+    writer = csv.writer(out)
+    writer.writerow(CSV_COLUMNS)
+    for candidate in result.candidates:
+        writer.writerow([
+            candidate.rank or '',
+            candidate.name,
+            '' if candidate.score is None else candidate.score,
+            ", ".join(candidate.missing),
+            ", ".join(candidate.matched),
+            candidate.hr_review,
+            candidate.error,
+        ])
+
+
+def to_csv(result):
+    """Returns a ScreeningResult as a CSV string."""
+    out = io.StringIO()
+    write_csv(result, out)
+    return out.getvalue()
@@ -0,0 +1,212 @@
+# login_app/deadlines.py
+
+# Deadlines and cancellation for LLM work. A request nobody is waiting for
+# any more shouldn't keep a worker thread and rate-limit quota busy:
+#
+# - Work runs inside a Scope: an expiry time and a cancel flag, nested in
+#   the scope it was started from. DeadlineMiddleware gives each request an
+#   overall deadline (REQUEST), every llm_router call runs under its task's
+#   deadline from STAGES, and a crew job attempt under CREW_JOBS['DEADLINE'];
+#   the earliest expiry applies.
+# - When the client disconnects, Django (under ASGI) cancels the view or the
+#   streaming response. The CancelledError reaches DeadlineMiddleware,
+#   sse_response or the LLM executor, which cancel the scope their worker
+#   threads run in. Crew jobs are cancelled from the database (see jobs.py).
+# - The scheduler and the LLM client check the scope before each attempt and
+#   between streamed chunks, cap their waits and HTTP timeouts at the time
+#   left, and close a cancelled stream, so Groq stops generating. Async calls
+#   are cancelled together with their task.
+#
+# Scopes live in a context variable, so they follow the request into
+# sync_to_async threads, the LLM executor and asyncio tasks.
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'REQUEST': 120.0,       # seconds for all the LLM work of one request, None for no limit
+    'VIEWS': {},            # URL name -> seconds, instead of REQUEST for that view
+    # Seconds per llm_router task (per call, including rate-limit queueing and retries),
+    # and 'crew_agent' for each crewAI agent task.
+    'STAGES': {},
+}
+
+# Longest sleep between checks of the cancel flag
+_POLL_INTERVAL = 0.1
+
+
+def get_config():
+    """Returns the DEADLINES settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'DEADLINES', {})}
+
+
+class Cancelled(Exception):
+    """Raised in work whose scope was cancelled: the client went away, or the job was cancelled."""
+
+
+class DeadlineExceeded(Exception):
+    """Raised in work that ran past its scope's deadline."""
+
+
+class Scope:
+    """
+    A deadline and a cancel flag. A scope is cancelled when its parent is,
+    and never expires later than its parent. Thread-safe.
+    """
+
+    def __init__(self, seconds=None, parent=None, name=''):
+        self.parent = parent
+        self.name = name
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        if parent is not None and parent.expires_at is not None and (
+            self.expires_at is None or parent.expires_at < self.expires_at
+        ):
+            self.expires_at, self.name = parent.expires_at, parent.name
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def remaining(self):
+        """Seconds left, or None without a deadline."""
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def check(self):
+        """Raises Cancelled or DeadlineExceeded if the work should stop."""
+        if self.cancelled:
+            raise Cancelled(f"{self.name or 'Request'} cancelled")
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            raise DeadlineExceeded(f"{self.name or 'Request'} deadline exceeded")
+
+    def sleep(self, seconds):
+        """time.sleep() that wakes up and raises as soon as the scope ends."""
+        until = time.monotonic() + seconds
+        while (left := until - time.monotonic()) > 0:
+            self.check()
+            remaining = self.remaining()
+            self._cancelled.wait(min(left, _POLL_INTERVAL, remaining if remaining is not None else left))
+        self.check()
+
+
+_current = contextvars.ContextVar('deadline_scope', default=None)
+
+
+def current():
+    """The scope the calling code runs in, or None."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def bind(scope):
+    """Runs the block (in this thread or task) in scope."""
+    token = _current.set(scope)
+    try:
+        yield scope
+    finally:
+        _current.reset(token)
+
+
+def child(stage=None, seconds=None):
+    """
+    A new scope inside the current one, expiring after seconds (by default
+    stage's entry in DEADLINES['STAGES']; None for only the parent's deadline).
+    """
+    config = get_config()
+    if seconds is None and stage is not None and config['ENABLED']:
+        seconds = config['STAGES'].get(stage)
+    return Scope(seconds, parent=current(), name=stage or '')
+
+
+@contextlib.contextmanager
+def deadline(stage=None, seconds=None):
+    """Shortcut for bind(child(stage, seconds))."""
+    with bind(child(stage, seconds)) as scope:
+        yield scope
+
+
+def check():
+    """Raises Cancelled or DeadlineExceeded if the current scope has ended."""
+    scope = current()
+    if scope is not None:
+        scope.check()
+
+
+def remaining():
+    """Seconds left in the current scope, or None."""
+    scope = current()
+    return scope.remaining() if scope is not None else None
+
+
+def timeout(seconds):
+    """seconds, capped at the time left in the current scope."""
+    left = remaining()
+    return seconds if left is None else min(seconds, left)
+
+
+def sleep(seconds):
+    """Sleeps in the current scope (see Scope.sleep), or plainly outside one."""
+    scope = current()
+    if scope is None:
+        time.sleep(seconds)
+    else:
+        scope.sleep(seconds)
+
+
+class DeadlineMiddleware:
+    """
+    Runs each request in a scope with the REQUEST deadline, and cancels the
+    scope when the view is cancelled because the client disconnected.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _scope(self, request):
+        config = get_config()
+        if not config['ENABLED']:
+            return Scope(name='request')
+        seconds = config['REQUEST']
+        if config['VIEWS']:
+            try:
+                seconds = config['VIEWS'].get(resolve(request.path_info).url_name, seconds)
+            except Resolver404:
+                pass
+        return Scope(seconds, name='request')
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with bind(self._scope(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with bind(self._scope(request)) as scope:
+            try:
+                return await self.get_response(request)
+            except asyncio.CancelledError:
+                logger.info("Client disconnected from %s; cancelling its LLM work", request.path)
+                scope.cancel()
+                raise
@@ -0,0 +1,220 @@
+# login_app/headings.py
+
+# Local section heading detection for resumes.
+# Resume headings are nearly always set apart by layout: a larger font, bold
+# text, capitals, a short line. This module scores every line from the PDF's
+# span metadata (pdf_extract.extract_lines), keeps the group of candidates that
+# share one style, and reports how confident it is. Section boundaries are
+# character offsets into the document text, so a section can be sliced out
+# without asking the model. section.py falls back to the headings LLM call
+# only when the confidence is below HEADINGS['MIN_CONFIDENCE'].
+
+import re
+from collections import Counter, namedtuple
+
+from django.conf import settings
+
+DEFAULTS = {
+    'MIN_CONFIDENCE': 0.6,      # below this the headings LLM call is used instead
+    'MAX_HEADING_CHARS': 40,
+    'MAX_HEADING_WORDS': 5,
+}
+
+# Words that commonly appear in resume section headings.
+SECTION_VOCABULARY = {
+    'summary', 'profile', 'objective', 'about', 'experience', 'employment', 'work', 'history',
+    'professional', 'career', 'education', 'academic', 'qualifications', 'skills', 'technical',
+    'competencies', 'expertise', 'projects', 'certifications', 'certificates', 'licenses', 'awards',
+    'achievements', 'honors', 'publications', 'languages', 'interests', 'hobbies', 'volunteer',
+    'volunteering', 'activities', 'leadership', 'references', 'training', 'courses', 'contact',
+    'research', 'internships', 'tools', 'technologies', 'strengths',
+}
+
+# A detected section: its heading and [start, end) offsets into the document text.
+Section = namedtuple('Section', ['heading', 'start', 'end'])
+
+# headings: list[str]; sections: list[Section]; text: the document text the
+# offsets refer to; confidence: 0..1; source: 'layout' or 'llm'.
+HeadingResult = namedtuple('HeadingResult', ['headings', 'sections', 'text', 'confidence', 'source'])
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def get_config():
+    """Returns the HEADINGS settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'HEADINGS', {})}
+
+
+def clean_heading(text):
+    """Strips decoration (markdown stars, trailing colons, spaces) from a heading."""
+    return text.replace('*', '').strip().rstrip(':').strip()
+
+
+def _vocabulary_match(text):
+    words = _WORD_RE.findall(text.lower())
+    return bool(words) and any(word in SECTION_VOCABULARY for word in words)
+
+
+def _body_style(lines):
+    # The style (size, weight) carrying the most characters is the body text.
+    weights = Counter()
+    for line in lines:
+        weights[(line.size, line.bold)] += len(line.text)
+    return weights.most_common(1)[0][0]
+
+
+def _score(line, body_size, body_bold, config):
+    text = clean_heading(line.text)
+    if not text or len(text) > config['MAX_HEADING_CHARS'] or len(text.split()) > config['MAX_HEADING_WORDS']:
+        return 0.0
+    if not any(c.isalpha() for c in text) or line.text.rstrip().endswith(('.', ',', ';')):
+        return 0.0
+    score = 0.0
+    if line.size >= body_size * 1.15:
+        score += 2.0
+    elif line.size > body_size:
+        score += 1.0
+    if line.bold and not body_bold:
+        score += 1.5
+    if text.isupper() and len(text) > 2:
+        score += 1.0
+    if line.text.rstrip().endswith(':'):
+        score += 0.5
+    if _vocabulary_match(text):
+        score += 1.5
+    return score
+
+
+def detect_headings(lines, config=None):
+    """
+    Finds section headings from line layout.
+
+    Args:
+        lines (Sequence[pdf_extract.Line]): The document's lines in reading order.
+        config (dict): Optional HEADINGS settings override.
+
+    Returns:
+        HeadingResult: With source 'layout'.
+    """
+    config = config or get_config()
+    text = "\n".join(line.text for line in lines)
+    if not lines:
+        return HeadingResult([], [], text, 0.0, 'layout')
+
+    body_size, body_bold = _body_style(lines)
+    candidates = []
+    for index, line in enumerate(lines):
+        score = _score(line, body_size, body_bold, config)
+        if score >= 2.0:
+            candidates.append((index, line, score))
+
+    # The applicant's name is usually the largest text on the first line; it isn't a section.
+    if candidates and candidates[0][0] == 0 and not _vocabulary_match(lines[0].text):
+        if len(candidates) == 1 or lines[0].size > max(c[1].size for c in candidates[1:]):
+            candidates = candidates[1:]
+    if len(candidates) < 2:
+        return HeadingResult([], [], text, 0.0, 'layout')
+
+    # Real headings share one style; keep the style group that looks most like headings.
+    groups = {}
+    for candidate in candidates:
+        line = candidate[1]
+        groups.setdefault((line.size, line.bold, clean_heading(line.text).isupper()), []).append(candidate)
+    chosen = max(
+        groups.values(),
+        key=lambda group: (sum(_vocabulary_match(c[1].text) for c in group), len(group), sum(c[2] for c in group)),
+    )
+
+    vocabulary_share = sum(_vocabulary_match(c[1].text) for c in chosen) / len(chosen)
+    consistency = len(chosen) / len(candidates)
+    coverage = min(len(chosen), 4) / 4
+    confidence = round(0.4 * vocabulary_share + 0.4 * consistency + 0.2 * coverage, 2)
+    if len(chosen) < 2:
+        confidence = min(confidence, 0.3)
+
+    offsets = []
+    position = 0
+    for line in lines:
+        offsets.append(position)
+        position += len(line.text) + 1
+    starts = [(clean_heading(c[1].text), offsets[c[0]]) for c in sorted(chosen, key=lambda c: c[0])]
+    return HeadingResult(
+        headings=[heading for heading, _ in starts],
+        sections=_sections_from_starts(starts, len(text)),
+        text=text,
+        confidence=confidence,
+        source='layout',
+    )
+
+
+_BULLET_CHARS = ('-', '*', '\u2022', '\u25cf', '\u25aa', '\u2013')
+
+
+def detect_text_headings(text, config=None):
+    """
+    Finds section headings in plain text (e.g. a pasted resume), where there
+    is no layout to go by: short, unpunctuated, non-bullet lines that use
+    section vocabulary or are written in capitals.
+
+    Args:
+        text (str): The document text.
+        config (dict): Optional HEADINGS settings override.
+
+    Returns:
+        HeadingResult: With source 'text'; confidence is 1.0 when at least two headings were found.
+    """
+    config = config or get_config()
+    starts = []
+    position = 0
+    for line in text.split("\n"):
+        stripped = line.strip()
+        heading = clean_heading(stripped)
+        if (
+            heading
+            and len(heading) <= config['MAX_HEADING_CHARS']
+            and len(heading.split()) <= config['MAX_HEADING_WORDS']
+            and any(c.isalpha() for c in heading)
+            and not stripped.endswith(('.', ',', ';'))
+            and not stripped.startswith(_BULLET_CHARS)
+            and (_vocabulary_match(heading) or (heading.isupper() and len(heading) > 2))
+        ):
+            starts.append((heading, position))
+        position += len(line) + 1
+    if len(starts) < 2:
+        return HeadingResult([], [], text, 0.0, 'text')
+    return HeadingResult([heading for heading, _ in starts], _sections_from_starts(starts, len(text)), text, 1.0, 'text')
+
+
+def _sections_from_starts(starts, text_length):
+    sections = []
+    for number, (heading, start) in enumerate(starts):
+        end = starts[number + 1][1] if number + 1 < len(starts) else text_length
+        sections.append(Section(heading, start, end))
+    return sections
+
+
+def split_sections(text, headings):
+    """
+    Locates headings (e.g. from the LLM) in text and returns their sections.
+
+    Each heading is matched case-insensitively at the start of a line, in
+    document order; headings that can't be found are skipped.
+
+    Args:
+        text (str): The document text.
+        headings (list[str]): Section headings.
+
+    Returns:
+        list[Section]: The sections that were found, in document order.
+    """
+    starts = []
+    position = 0
+    for heading in headings:
+        pattern = re.compile(r"^[ \t*#]*" + re.escape(clean_heading(heading)) + r"\b", re.IGNORECASE | re.MULTILINE)
+        match = pattern.search(text, position) or pattern.search(text)
+        if match is None:
+            continue
+        starts.append((heading, match.start()))
+        position = match.end()
+    starts.sort(key=lambda item: item[1])
+    return _sections_from_starts(starts, len(text))
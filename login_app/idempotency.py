@@ -0,0 +1,85 @@
+# login_app/idempotency.py
+
+# Idempotent form submissions. The enhancer, section and ATS forms carry a
+# hidden idempotency key, a fresh one each time the page is rendered. A
+# double-clicked button or a refreshed POST sends the same key again and gets
+# the result of the first submission instead of starting more LLM calls:
+#
+# - Resume enhancer: the key is stored on the CrewJob (unique per user), so a
+#   repeat is sent to the job that is already queued (see jobs.submit_crew_job).
+# - Section enhancer and ATS scanner: the result is kept in the default cache
+#   for TTL seconds under the user and key. A repeat that arrives while the
+#   first submission is still running waits for it. Failures (exceptions, or
+#   an error message in place of the answer) aren't kept, so a retry runs again.
+#
+# API clients can send the key in an Idempotency-Key header instead.
+
+import re
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .singleflight import Group
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TTL': 10 * 60,     # seconds a submission's result is kept for repeats
+}
+
+FIELD_NAME = 'idempotency_key'
+HEADER_NAME = 'Idempotency-Key'
+
+_VALID_KEY = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+_MISSING = object()
+
+_flights = Group()
+
+
+def get_config():
+    """Returns the IDEMPOTENCY settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'IDEMPOTENCY', {})}
+
+
+def new_key():
+    """A key for one rendering of a form."""
+    return uuid.uuid4().hex
+
+
+def get_key(request):
+    """The submission's idempotency key, or '' if there is none (or the feature is off)."""
+    if not get_config()['ENABLED']:
+        return ''
+    key = request.POST.get(FIELD_NAME, '') or request.headers.get(HEADER_NAME, '')
+    return key if _VALID_KEY.match(key) else ''
+
+
+async def aremember(request, scope, acompute, keep=None):
+    """
+    Returns acompute()'s result for this submission, or what the first
+    submission with the same key returned. Exceptions are not remembered,
+    nor are results for which keep(result) is false.
+
+    Args:
+        request: The POST request.
+        scope (str): Which action of the form ran, e.g. 'ats:hr_review'; one
+            rendered page can submit several.
+        acompute (callable): Returns an awaitable of the (picklable) result.
+        keep (callable): Returns False for a result that reports a failure,
+            such as an LLM error message; by default every result is kept.
+    """
+    key = get_key(request)
+    if not key:
+        return await acompute()
+    user = await request.auser()
+    cache_key = f"idempotency:{user.pk}:{scope}:{key}"
+
+    async def compute_and_remember():
+        value = await cache.aget(cache_key, _MISSING)
+        if value is _MISSING:
+            value = await acompute()
+            if keep is None or keep(value):
+                await cache.aset(cache_key, value, get_config()['TTL'])
+        return value
+
+    return await _flights.ado(cache_key, compute_and_remember)
@@ -0,0 +1,158 @@
+# login_app/incremental.py
+
+# Incremental re-enhancement. People iterate on a resume: tweak a bullet,
+# submit again. Every section gets a fingerprint (a hash of its heading and
+# whitespace-normalized text) that is stored with what was produced for it,
+# so a new version can be diffed against the previous one and only the
+# sections that changed go back to the model:
+#
+# - Section enhancer: ResumeDocument.fingerprints lets the upload page show
+#   what changed, and enhanced sections are cached by their own content (see
+#   section.py), so unchanged sections are answered from the cache.
+# - Crew: CrewJob.result_sections pairs each input section's fingerprint with
+#   its part of the crew's output. Resubmitting with the same job description
+#   rewrites only the changed sections, one short LLM call each, and reuses the
+#   rest of the previous result instead of running the three agents again.
+
+import hashlib
+from collections import namedtuple
+
+from django.conf import settings
+
+from .headings import Section, clean_heading, detect_text_headings, split_sections
+from .models import CrewJob
+from .prompt_prep import compact
+
+DEFAULTS = {
+    'ENABLED': True,
+    # With more than this share of sections changed, the crew runs in full instead.
+    'MAX_CHANGED_SHARE': 0.5,
+}
+
+# Heading used for the text above the first section (name, contact details)
+PREAMBLE = ""
+
+
+def get_config():
+    """Returns the INCREMENTAL settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'INCREMENTAL', {})}
+
+
+def fingerprint(heading, content):
+    """Hash of a section that ignores case, spacing and PDF artifacts."""
+    normalized = " ".join(compact(content).split()).lower()
+    return hashlib.sha256(f"{clean_heading(heading).lower()}\n{normalized}".encode('utf-8')).hexdigest()
+
+
+def _parts(text, sections):
+    # (heading, text) for the preamble and each section
+    sections = [Section(*section) for section in sections]
+    preamble = text[:sections[0].start] if sections else text
+    return [(PREAMBLE, preamble)] + [(section.heading, text[section.start:section.end]) for section in sections]
+
+
+def section_fingerprints(text, sections):
+    """
+    Fingerprints the sections of a resume.
+
+    Args:
+        text (str): The resume text.
+        sections (list): [heading, start, end] boundaries into text.
+
+    Returns:
+        list: [[heading, fingerprint], ...], the preamble (heading PREAMBLE) first.
+    """
+    return [[heading, fingerprint(heading, content)] for heading, content in _parts(text, sections)]
+
+
+# Headings of the current version that are new or different / the same as in
+# the previous version, and headings that are gone.
+SectionDiff = namedtuple('SectionDiff', ['changed', 'unchanged', 'removed'])
+
+
+def diff_sections(previous, current):
+    """Compares two section_fingerprints lists; the preamble is left out of the result."""
+    previous_fingerprints = dict(previous)
+    changed, unchanged = [], []
+    for heading, value in current:
+        if heading != PREAMBLE:
+            (unchanged if previous_fingerprints.get(heading) == value else changed).append(heading)
+    current_headings = {heading for heading, _ in current}
+    removed = [heading for heading, _ in previous if heading != PREAMBLE and heading not in current_headings]
+    return SectionDiff(changed, unchanged, removed)
+
+
+def _text_sections(resume_text):
+    # Sections of a pasted resume, or None when they can't be told apart reliably
+    result = detect_text_headings(resume_text)
+    if not result.sections or len(set(result.headings)) != len(result.headings):
+        return None
+    return result.sections
+
+
+def result_sections(resume_text, result):
+    """
+    Pairs each section of the crew's input with its part of the output, for
+    the next incremental run. The output is split at the input's headings;
+    if the crew renamed, dropped or reordered any, nothing is stored.
+
+    Returns:
+        list: [[heading, input fingerprint, output text], ...], preamble first, or [].
+    """
+    sections = _text_sections(resume_text)
+    if sections is None:
+        return []
+    headings = [section.heading for section in sections]
+    output_sections = split_sections(result, headings)
+    if [section.heading for section in output_sections] != headings:
+        return []
+    fingerprints = section_fingerprints(resume_text, sections)
+    outputs = _parts(result, output_sections)
+    return [[heading, value, output] for (heading, value), (_, output) in zip(fingerprints, outputs)]
+
+
+# One section of an incremental crew run: reuse previous_output as is, or
+# rewrite content (previous_output is then the earlier rewrite, for style).
+SectionUpdate = namedtuple('SectionUpdate', ['heading', 'content', 'previous_output', 'reuse'])
+CrewUpdatePlan = namedtuple('CrewUpdatePlan', ['previous_job_id', 'sections', 'changed'])
+
+
+def plan_crew_update(job):
+    """
+    Works out whether job can reuse the user's previous crew run on the same
+    job description (in the same mode), and which sections must be rewritten.
+
+    Returns:
+        CrewUpdatePlan, or None when the crew should run in full: no usable
+        previous run, a changed preamble, or too many changed sections.
+    """
+    config = get_config()
+    if not config['ENABLED'] or not job.use_cache:
+        return None
+    sections = _text_sections(job.resume_text)
+    if sections is None:
+        return None
+    previous = (
+        CrewJob.objects.filter(
+            user_id=job.user_id, status=CrewJob.STATUS_SUCCEEDED, mode=job.mode, job_description_text=job.job_description_text,
+        )
+        .exclude(id=job.id)
+        .order_by('-finished_at')
+        .only('id', 'result_sections')
+        .first()
+    )
+    if previous is None or not previous.result_sections:
+        return None
+
+    outputs = {heading: (value, output) for heading, value, output in previous.result_sections}
+    updates = []
+    for (heading, value), (_, content) in zip(section_fingerprints(job.resume_text, sections), _parts(job.resume_text, sections)):
+        previous_value, previous_output = outputs.get(heading, (None, ""))
+        updates.append(SectionUpdate(heading, content, previous_output, previous_value == value))
+    if not updates[0].reuse:
+        # The name and contact block is formatted by the full crew only.
+        return None
+    changed = [update.heading for update in updates if not update.reuse]
+    if len(changed) > config['MAX_CHANGED_SHARE'] * len(sections):
+        return None
+    return CrewUpdatePlan(previous.id, updates, changed)
@@ -0,0 +1,245 @@
+# login_app/instrumentation.py
+
+# Per-stage timing for requests. Code that does something slow wraps it in
+# stage('name') (or decorates it with @timed('name')); each duration is added
+# to an in-process histogram and to the current request's list of stages.
+# ServerTimingMiddleware sends that list back in a Server-Timing header (shown
+# in the browser's network panel), and metrics_view exposes the histograms
+# per stage, per model and per view in Prometheus text format.
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.shortcuts import render as django_render
+
+# Upper bounds (seconds) of the histogram buckets: PDF parsing lands in the
+# low buckets, LLM calls and crew tasks in the high ones.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Histogram:
+    """A Prometheus-style cumulative histogram with labels. Thread-safe."""
+
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+        self._series = {}   # label values -> [bucket counts..., count, sum]
+
+    def observe(self, seconds, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(BUCKETS) + 1) + [0.0]
+            for position, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    series[position] += 1
+            series[-2] += 1
+            series[-1] += seconds
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for label_values, values in sorted(series.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, label_values))
+            prefix = labels + "," if labels else ""
+            for bound, count in zip(BUCKETS, values):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {values[-2]}')
+            lines.append(f"{self.name}_count{{{labels}}} {values[-2]}")
+            lines.append(f"{self.name}_sum{{{labels}}} {values[-1]:.6f}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+STAGE_SECONDS = Histogram('resume_stage_duration_seconds', "Time spent in each processing stage.", ('stage',))
+LLM_SECONDS = Histogram('resume_llm_call_duration_seconds', "LLM call time per model, including rate-limit queueing.", ('model',))
+VIEW_SECONDS = Histogram('resume_view_duration_seconds', "Request time per view.", ('view', 'method', 'status'))
+
+# Stages recorded while handling the current request, for the Server-Timing header.
+_request_stages = contextvars.ContextVar('request_stages', default=None)
+# Models chosen by llm_router while handling the current request, for the X-LLM-Route header.
+_request_routes = contextvars.ContextVar('request_routes', default=None)
+
+
+def record(stage_name, seconds, histogram=STAGE_SECONDS, *label_values):
+    """Adds a duration to a histogram and to the current request's Server-Timing."""
+    histogram.observe(seconds, *(label_values or (stage_name,)))
+    stages = _request_stages.get()
+    if stages is not None:
+        stages.append((stage_name, seconds))
+
+
+def record_route(description):
+    """Adds an LLM routing decision (e.g. 'section_enhance=model (fallback)') to the current request."""
+    routes = _request_routes.get()
+    if routes is not None:
+        routes.append(description)
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Times the block as stage name. Works around sync code and awaits alike."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+@contextlib.contextmanager
+def llm_call(model):
+    """Times an LLM call to model (shown as the 'llm' stage in Server-Timing)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record('llm', time.perf_counter() - started, LLM_SECONDS, model)
+
+
+def timed(name):
+    """Decorator form of stage(), for plain and async functions and async generators."""
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def agen_wrapper(*args, **kwargs):
+                with stage(name):
+                    async for item in func(*args, **kwargs):
+                        yield item
+            return agen_wrapper
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def render(request, template_name, context=None, *args, **kwargs):
+    """django.shortcuts.render, timed as the 'template' stage."""
+    with stage('template'):
+        return django_render(request, template_name, context, *args, **kwargs)
+
+
+class TimedSessionMiddleware(SessionMiddleware):
+    """SessionMiddleware that times the session save as the 'session_save' stage."""
+
+    def process_response(self, request, response):
+        with stage('session_save'):
+            return super().process_response(request, response)
+
+
+def _server_timing(stages, total):
+    totals = {}
+    for name, seconds in stages:
+        totals[name] = totals.get(name, 0.0) + seconds
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """
+    Collects the stages timed during a request, adds them as a Server-Timing
+    header (and the LLM routes taken as X-LLM-Route) and records the request
+    in the per-view histogram. Put it first in
+    MIDDLEWARE so the session save is included. For streaming responses the
+    header only covers the work done before the first byte.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token, routes_token = _request_stages.set([]), _request_routes.set([])
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+            return self._finish(request, response, started)
+        finally:
+            _request_stages.reset(token)
+            _request_routes.reset(routes_token)
+
+    async def __acall__(self, request):
+        token, routes_token = _request_stages.set([]), _request_routes.set([])
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+            return self._finish(request, response, started)
+        finally:
+            _request_stages.reset(token)
+            _request_routes.reset(routes_token)
+
+    def _finish(self, request, response, started):
+        total = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        VIEW_SECONDS.observe(total, view, request.method, str(response.status_code))
+        response['Server-Timing'] = _server_timing(_request_stages.get() or (), total)
+        routes = _request_routes.get()
+        if routes:
+            response['X-LLM-Route'] = ", ".join(routes)
+        return response
+
+
+def render_metrics():
+    """Returns all histograms and the LLM counters in Prometheus text exposition format."""
+    from . import llm_cache, llm_router, llm_scheduler, tokens
+
+    lines = []
+    for histogram in (STAGE_SECONDS, LLM_SECONDS, VIEW_SECONDS):
+        lines.extend(histogram.render())
+
+    counters = [
+        ('resume_llm_rate_limited_total', "429 responses per model.", 'model',
+         {model: s['rate_limited'] for model, s in llm_scheduler.stats().items()}),
+        ('resume_llm_retries_total', "Retried LLM calls per model.", 'model',
+         {model: s['retries'] for model, s in llm_scheduler.stats().items()}),
+        ('resume_llm_input_tokens_saved_total', "Estimated input tokens saved by prompt trimming.", 'endpoint',
+         {endpoint: s['saved_tokens'] for endpoint, s in tokens.stats().items()}),
+        ('resume_llm_prompt_tokens_total', "Prompt tokens used per crew pipeline.", 'endpoint',
+         {endpoint: s['prompt_tokens'] for endpoint, s in tokens.usage_stats().items()}),
+        ('resume_llm_completion_tokens_total', "Completion tokens used per crew pipeline.", 'endpoint',
+         {endpoint: s['completion_tokens'] for endpoint, s in tokens.usage_stats().items()}),
+    ]
+    for name, help_text, label, values in counters:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        lines += [f'{name}{{{label}="{_escape(key)}"}} {value}' for key, value in sorted(values.items())]
+
+    lines += ["# HELP resume_llm_routes_total LLM requests answered per task, model and route (primary, hedge, fallback).",
+              "# TYPE resume_llm_routes_total counter"]
+    lines += [f'resume_llm_routes_total{{task="{_escape(task)}",model="{_escape(model)}",route="{outcome}"}} {value}'
+              for (task, model, outcome), value in sorted(llm_router.stats().items())]
+
+    cache_stats = llm_cache.stats()
+    lines += ["# HELP resume_llm_cache_hit_ratio LLM response cache hit ratio.", "# TYPE resume_llm_cache_hit_ratio gauge",
+              f"resume_llm_cache_hit_ratio {cache_stats['hit_rate']:.4f}"]
+    lines += ["# HELP resume_llm_coalesced_total LLM requests answered by an identical request already in flight.",
+              "# TYPE resume_llm_coalesced_total counter", f"resume_llm_coalesced_total {cache_stats['coalesced']}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,134 @@
+# login_app/job_profiles.py
+
+# Reusable job description profiles.
+# One job description is usually checked against many resumes, so it is saved
+# once as a JobDescription with its keyword weights and required skills
+# precomputed (for local ATS scoring) and a short requirements brief written
+# by the LLM (for prompts). Views then refer to the JD by id, and prompts carry
+# the brief instead of the full posting, which keeps them short and makes
+# their cache keys stable across resumes.
+
+import hashlib
+import logging
+import threading
+
+from django.db import IntegrityError, close_old_connections
+from django.utils import timezone
+
+from .ats_scoring import profile_keywords, required_skills
+from .llm_router import choose_route
+from .llm_scheduler import BATCH, priority
+from .models import JobDescription
+from .prompt_prep import prepare_text
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+BRIEF_PROMPT_TYPE = "jd_brief"
+BRIEF_TASK = "job_brief"   # llm_router task
+
+BRIEF_PROMPT = """
+You are an experienced technical recruiter. Summarize the job description below as a requirements brief for
+screening resumes. Use at most 120 words in plain text with these parts: role and seniority, must-have skills and
+qualifications, nice-to-have skills, and key responsibilities. Do not add anything that is not in the posting.
+
+Job Description:
+{text}
+"""
+
+TITLE_MAX_LENGTH = 80
+
+
+def normalize_text(text):
+    """Collapses runs of spaces and drops blank lines, so re-pasted copies of a JD match."""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _title(text):
+    first_line = text.split("\n", 1)[0]
+    return first_line if len(first_line) <= TITLE_MAX_LENGTH else first_line[:TITLE_MAX_LENGTH - 3].rstrip() + "..."
+
+
+def get_or_create_job_description(user, text):
+    """
+    Returns the user's saved JobDescription for text, creating it (with its
+    keywords and required skills precomputed) if this text is new. The brief
+    is generated in the background.
+
+    Args:
+        user (User): The owner.
+        text (str): The job description as pasted.
+
+    Returns:
+        JobDescription
+    """
+    text = normalize_text(text)
+    content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    job_description = JobDescription.objects.filter(user=user, content_hash=content_hash).first()
+    if job_description is not None:
+        # Recently used JDs are listed first.
+        JobDescription.objects.filter(pk=job_description.pk).update(updated_at=timezone.now())
+        return job_description
+
+    keywords = profile_keywords(text)
+    try:
+        job_description = JobDescription.objects.create(
+            user=user,
+            title=_title(text),
+            text=text,
+            content_hash=content_hash,
+            keywords=keywords,
+            required_skills=required_skills(keywords),
+        )
+    except IntegrityError:
+        # Saved by a concurrent request in the meantime.
+        return JobDescription.objects.get(user=user, content_hash=content_hash)
+    generate_brief_in_background(job_description.pk)
+    return job_description
+
+
+def generate_brief(job_description, use_cache=True):
+    """
+    Writes the LLM requirements brief for job_description and saves it.
+    Returns the brief, or '' if the LLM call failed (the full text is used meanwhile).
+    """
+    from .ats_service import get_llm_response, is_error_response
+
+    model = choose_route(BRIEF_TASK, estimate_tokens(job_description.text) + estimate_tokens(BRIEF_PROMPT)).model
+    text = prepare_text(job_description.text, model, BRIEF_PROMPT_TYPE, reserve_tokens=estimate_tokens(BRIEF_PROMPT)).text
+    brief = get_llm_response(BRIEF_PROMPT.format(text=text), BRIEF_PROMPT_TYPE, use_cache=use_cache, task=BRIEF_TASK)
+    if not brief or is_error_response(brief):
+        return ""
+    brief = brief.strip()
+    JobDescription.objects.filter(pk=job_description.pk).update(brief=brief)
+    job_description.brief = brief
+    return brief
+
+
+def generate_brief_in_background(job_description_id):
+    def run():
+        try:
+            job_description = JobDescription.objects.filter(pk=job_description_id).first()
+            if job_description is not None and not job_description.brief:
+                with priority(BATCH):
+                    generate_brief(job_description)
+        except Exception:
+            logger.exception("Generating the brief for job description %s failed", job_description_id)
+        finally:
+            close_old_connections()
+
+    threading.Thread(target=run, name='jd-brief', daemon=True).start()
+
+
+def prompt_text(job_description):
+    """
+    Returns what prompts should carry for this JD: the requirements brief plus
+    the required skills once the brief exists, otherwise the full text.
+    """
+    if not job_description.brief:
+        return job_description.text
+    parts = [job_description.title, job_description.brief]
+    if job_description.required_skills:
+        parts.append("Required skills: " + ", ".join(job_description.required_skills))
+    return "\n\n".join(parts)
@@ -0,0 +1,357 @@
+# login_app/jobs.py
+
+# Background job queue for the resume enhancement crew.
+# A crew run takes far longer than a proxy will hold an HTTP request open, so
+# resume_enhancer_view only stores a CrewJob row and returns. Worker threads
+# (started in the web process, or by `manage.py run_crew_workers`) claim
+# pending jobs from the database, run the crew, and write progress, the result
+# or the error back to the row. Jobs survive restarts: pending rows stay
+# queued, and running rows whose lease expired are picked up again, until
+# they have used up max_attempts. In-process workers start with the first
+# request after startup.
+#
+# Each attempt runs under a DEADLINE. A job can be cancelled from its page,
+# and one whose progress page was closed is cancelled if nobody opens it again
+# within ABANDON_AFTER seconds; the worker notices within CANCEL_CHECK_INTERVAL
+# and cancels the run's deadline scope, which stops its LLM calls (see
+# deadlines.py).
+
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import deadlines
+from .models import CrewJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'WORKERS': 2,
+    'IN_PROCESS_WORKERS': True,     # start workers inside the web process on first use
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 15,            # seconds, doubled after each failed attempt
+    'LEASE_SECONDS': 15 * 60,
+    'POLL_INTERVAL': 1.0,
+    'PROGRESS_INTERVAL': 0.5,       # how often partial output is written while streaming
+    'DEADLINE': 10 * 60,            # seconds per attempt, None for no limit; keep it below LEASE_SECONDS
+    'ABANDON_AFTER': 60,            # seconds after its page was closed; None never cancels abandoned jobs
+    'CANCEL_CHECK_INTERVAL': 2.0,   # how often a running job checks whether it was cancelled
+}
+
+
+def get_config():
+    """Returns the CREW_JOBS settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'CREW_JOBS', {})}
+
+
+def submit_crew_job(user, resume_text, job_description_text, use_cache=True, job_description=None, mode='full',
+                    idempotency_key=''):
+    """
+    Queues a crew run and returns the new CrewJob.
+    job_description is the saved JobDescription, if any; the crew then gets its brief instead of the full text.
+    mode picks the pipeline (agents.CREW_MODES).
+
+    Duplicates are not queued: a submission whose idempotency_key the user
+    already sent gets that job back, and so does one identical to a run of the
+    user's that is still pending or running (unless use_cache is off).
+    """
+    if idempotency_key:
+        job = CrewJob.objects.filter(user=user, idempotency_key=idempotency_key).first()
+        if job is not None:
+            logger.info("Crew job %s resubmitted with the same idempotency key", job.id)
+            return job
+    if use_cache:
+        job = (
+            CrewJob.objects.filter(
+                user=user, status__in=(CrewJob.STATUS_PENDING, CrewJob.STATUS_RUNNING), mode=mode,
+                job_description=job_description, resume_text=resume_text, job_description_text=job_description_text,
+            )
+            .order_by('-created_at')
+            .first()
+        )
+        if job is not None:
+            logger.info("Crew job %s is already running with the same input", job.id)
+            return job
+
+    config = get_config()
+    try:
+        with transaction.atomic():
+            job = CrewJob.objects.create(
+                user=user,
+                job_description=job_description,
+                resume_text=resume_text,
+                job_description_text=job_description_text,
+                use_cache=use_cache,
+                mode=mode,
+                idempotency_key=idempotency_key,
+                max_attempts=config['MAX_ATTEMPTS'],
+            )
+    except IntegrityError:
+        if not idempotency_key:
+            raise
+        # The same submission, queued by a concurrent request
+        return CrewJob.objects.get(user=user, idempotency_key=idempotency_key)
+    ensure_workers()
+    return job
+
+
+def claim_next_job(worker_name):
+    """
+    Atomically claims the oldest runnable job for worker_name.
+
+    Returns:
+        CrewJob or None: The claimed job, or None when the queue is empty.
+    """
+    config = get_config()
+    now = timezone.now()
+    # A job whose lease expired took its worker down (or hung it) on every attempt: stop retrying it.
+    CrewJob.objects.filter(
+        status=CrewJob.STATUS_RUNNING, lease_expires_at__lt=now, attempts__gte=F('max_attempts')
+    ).update(
+        status=CrewJob.STATUS_FAILED,
+        finished_at=now,
+        lease_expires_at=None,
+        error="The worker running this job stopped responding.",
+    )
+    runnable = (
+        Q(status=CrewJob.STATUS_PENDING, available_at__lte=now)
+        | Q(status=CrewJob.STATUS_RUNNING, lease_expires_at__lt=now, attempts__lt=F('max_attempts'))
+    )
+    for job in CrewJob.objects.filter(runnable).order_by('available_at').only('id', 'status', 'lease_expires_at')[:5]:
+        # Compare-and-set on the fields we read, so two workers can't claim the same job.
+        claimed = CrewJob.objects.filter(
+            id=job.id, status=job.status, lease_expires_at=job.lease_expires_at
+        ).update(
+            status=CrewJob.STATUS_RUNNING,
+            worker=worker_name,
+            attempts=F('attempts') + 1,
+            started_at=now,
+            lease_expires_at=now + timedelta(seconds=config['LEASE_SECONDS']),
+            stage='',
+            result='',
+        )
+        if claimed:
+            return CrewJob.objects.get(id=job.id)
+    return None
+
+
+def cancel_crew_job(job_id, user):
+    """
+    Cancels the user's job if it hasn't finished; a running attempt stops
+    within CANCEL_CHECK_INTERVAL. Returns whether the job was cancelled.
+    """
+    return bool(
+        CrewJob.objects.filter(
+            id=job_id, user=user, status__in=(CrewJob.STATUS_PENDING, CrewJob.STATUS_RUNNING),
+        ).update(status=CrewJob.STATUS_CANCELLED, finished_at=timezone.now(), lease_expires_at=None)
+    )
+
+
+def _cancel_requested(job_id, config):
+    # True if the job was cancelled, or abandoned for longer than ABANDON_AFTER
+    job = CrewJob.objects.filter(id=job_id).only('status', 'abandoned_at').first()
+    if job is None or job.status == CrewJob.STATUS_CANCELLED:
+        return True
+    return (
+        config['ABANDON_AFTER'] is not None and job.abandoned_at is not None
+        and job.abandoned_at < timezone.now() - timedelta(seconds=config['ABANDON_AFTER'])
+    )
+
+
+def _watch_for_cancellation(job_id, scope, finished, config):
+    # Runs next to a job attempt and cancels its scope once the job is cancelled or abandoned.
+    try:
+        while not finished.is_set():
+            if _cancel_requested(job_id, config):
+                scope.cancel()
+                return
+            finished.wait(config['CANCEL_CHECK_INTERVAL'])
+    except Exception:
+        logger.exception("Cancellation check of crew job %s failed", job_id)
+    finally:
+        close_old_connections()
+
+
+def run_job(job):
+    """
+    Runs the crew for a claimed job and records progress, result or error.
+    A cancelled job is left cancelled; a job that ran past its DEADLINE is
+    retried like any other failure.
+    """
+    from .agents import stream_crew, stream_crew_update
+    from .incremental import plan_crew_update, result_sections
+    from .job_profiles import generate_brief, prompt_text
+
+    config = get_config()
+    lease = timedelta(seconds=config['LEASE_SECONDS'])
+    pieces = []
+    last_flush = 0.0
+    plan = None
+    usage = {}
+    events = None
+    # Updates below only apply while the job is still running, so they can't undo a cancellation.
+    this_run = CrewJob.objects.filter(id=job.id, status=CrewJob.STATUS_RUNNING)
+
+    def save(**fields):
+        fields['lease_expires_at'] = timezone.now() + lease
+        this_run.update(**fields)
+
+    scope = deadlines.Scope(config['DEADLINE'], name='crew_job')
+    finished = threading.Event()
+    threading.Thread(
+        target=_watch_for_cancellation, args=(job.id, scope, finished, config), name='crew-job-watch', daemon=True,
+    ).start()
+    try:
+        with deadlines.bind(scope):
+            job_description_text = job.job_description_text
+            if job.job_description_id:
+                job_description = job.job_description
+                if not job_description.brief:
+                    generate_brief(job_description, use_cache=job.use_cache)
+                job_description_text = prompt_text(job_description)
+            # Resubmitted with a few sections edited: rewrite only those (see incremental.py).
+            plan = plan_crew_update(job)
+            if plan is not None:
+                events = stream_crew_update(plan, job_description_text, use_cache=job.use_cache)
+            else:
+                events = stream_crew(job.resume_text, job_description_text, use_cache=job.use_cache, mode=job.mode)
+            for event, data in events:
+                scope.check()
+                if event == 'stage' and data['status'] == 'running':
+                    save(stage=data['stage'])
+                elif event == 'usage':
+                    usage = data
+                elif event == 'token':
+                    pieces.append(data)
+                    if time.monotonic() - last_flush >= config['PROGRESS_INTERVAL']:
+                        save(result="".join(pieces))
+                        last_flush = time.monotonic()
+    except deadlines.Cancelled:
+        logger.info("Crew job %s cancelled", job.id)
+        # Abandoned jobs are still 'running'; explicitly cancelled ones are already marked.
+        this_run.update(status=CrewJob.STATUS_CANCELLED, finished_at=timezone.now(), lease_expires_at=None)
+        return
+    except Exception as e:
+        logger.exception("Crew job %s failed", job.id)
+        job.refresh_from_db(fields=['attempts', 'max_attempts'])
+        if job.attempts < job.max_attempts:
+            delay = config['RETRY_BACKOFF'] * 2 ** (job.attempts - 1)
+            this_run.update(
+                status=CrewJob.STATUS_PENDING,
+                available_at=timezone.now() + timedelta(seconds=delay),
+                lease_expires_at=None,
+                error=str(e),
+            )
+        else:
+            this_run.update(
+                status=CrewJob.STATUS_FAILED,
+                finished_at=timezone.now(),
+                lease_expires_at=None,
+                error=str(e),
+            )
+        return
+    finally:
+        finished.set()
+        if events is not None:
+            # Closes the LLM stream of a run that stopped early.
+            events.close()
+
+    result = "".join(pieces)
+    this_run.update(
+        status=CrewJob.STATUS_SUCCEEDED,
+        result=result,
+        result_sections=result_sections(job.resume_text, result),
+        incremental_from_id=plan.previous_job_id if plan else None,
+        rerun_sections=plan.changed if plan else [],
+        prompt_tokens=usage.get('prompt_tokens', 0),
+        completion_tokens=usage.get('completion_tokens', 0),
+        error='',
+        finished_at=timezone.now(),
+        lease_expires_at=None,
+    )
+
+
+class WorkerPool:
+    """
+    A set of daemon threads that claim and run crew jobs until stopped.
+    """
+
+    def __init__(self, workers=2, poll_interval=1.0):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for n in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, args=(f"{prefix}:{n}",), name=f"crew-worker-{n}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _work(self, worker_name):
+        while not self._stop.is_set():
+            try:
+                job = claim_next_job(worker_name)
+                if job is not None:
+                    run_job(job)
+            except Exception:
+                logger.exception("Crew worker %s error", worker_name)
+                job = None
+            finally:
+                close_old_connections()
+            if job is None:
+                self._stop.wait(self.poll_interval)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def ensure_workers():
+    """
+    Starts the in-process worker pool once, if IN_PROCESS_WORKERS is enabled.
+    """
+    global _pool
+    config = get_config()
+    if not config['IN_PROCESS_WORKERS'] or _pool is not None:
+        return
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(workers=config['WORKERS'], poll_interval=config['POLL_INTERVAL'])
+            _pool.start()
+
+
+def _start_workers(sender, **kwargs):
+    request_started.disconnect(dispatch_uid=_START_WORKERS_UID)
+    ensure_workers()
+
+
+_START_WORKERS_UID = 'crew_jobs.start_workers'
+
+
+def start_workers_with_server():
+    """
+    Starts the in-process workers when the web process handles its first
+    request, so jobs left pending or running by a restart are picked up
+    without waiting for a new submission. Management commands handle no
+    requests and so start no workers.
+    """
+    if get_config()['IN_PROCESS_WORKERS']:
+        request_started.connect(_start_workers, dispatch_uid=_START_WORKERS_UID)
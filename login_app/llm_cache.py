@@ -0,0 +1,386 @@
+# login_app/llm_cache.py
+
+# Content-addressed cache for LLM responses.
+# Responses are keyed by a hash of (model, prompt type, normalized prompt text)
+# and stored in two tiers: a small in-process LRU for hot entries and a
+# persistent Django cache (the 'llm' alias, backed by SQLite by default) that
+# survives restarts and is shared between worker processes. Identical calls
+# that miss the cache at the same time share one upstream request
+# (see singleflight.py). A response computed by a different model than the
+# one in its key (llm_router's fallback) is returned but not stored.
+
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+from .singleflight import Group
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TTL': 60 * 60 * 24,            # seconds an entry stays valid in both tiers
+    'LOCAL_MAX_ENTRIES': 256,       # LRU size limit for the in-process tier
+    'LOCAL_MAX_BYTES': 16 * 1024 * 1024,
+    'PERSISTENT_ALIAS': 'llm',      # Django cache alias, or None to disable
+    'SINGLE_FLIGHT': True,          # identical concurrent misses wait for one upstream call
+}
+
+_MISSING = object()
+
+# While a response is computed: {'store': bool}, cleared by dont_store().
+_storing = contextvars.ContextVar('llm_cache_storing', default=None)
+
+
+def get_config():
+    """Returns the LLM_CACHE settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'LLM_CACHE', {})}
+
+
+class LRUCache:
+    """
+    A thread-safe in-process LRU cache with a per-entry TTL.
+
+    Entries are evicted least-recently-used first once either the entry count
+    or the total size of the stored strings exceeds its limit.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=None, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _sizeof(value):
+        if isinstance(value, (str, bytes)):
+            return len(value)
+        if isinstance(value, (list, tuple)):
+            return sum(len(item) for item in value if isinstance(item, (str, bytes)))
+        return 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                self._remove(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires_at)
+            self._size += size
+            while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes is not None and self._size > self.max_bytes)
+            ):
+                self._remove(next(iter(self._data)))
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        value, _ = self._data.pop(key)
+        self._size -= self._sizeof(value)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+
+def dont_store():
+    """
+    Called while a response is being computed to keep it out of the cache,
+    e.g. because a different model than the one in its key answered.
+    """
+    storing = _storing.get()
+    if storing is not None:
+        storing['store'] = False
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapses whitespace so trivially different prompts share a key."""
+    return " ".join(text.split())
+
+
+def make_key(model: str, prompt_type: str, prompt_text: str) -> str:
+    """
+    Builds the content-addressed cache key for an LLM request.
+
+    Args:
+        model (str): The model the prompt is sent to.
+        prompt_type (str): What the call is for, e.g. 'ats_match'.
+        prompt_text (str): The full prompt (or its variable inputs).
+
+    Returns:
+        str: A hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    for part in (model, prompt_type, normalize_prompt(prompt_text)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache for LLM responses with hit/miss counters.
+    """
+
+    key_prefix = 'llm-response:'
+
+    def __init__(self, config=None):
+        config = config or get_config()
+        self.enabled = config['ENABLED']
+        self.ttl = config['TTL']
+        self.local = LRUCache(
+            max_entries=config['LOCAL_MAX_ENTRIES'],
+            max_bytes=config['LOCAL_MAX_BYTES'],
+            ttl=self.ttl,
+        )
+        self.persistent_alias = config['PERSISTENT_ALIAS']
+        self.flights = Group() if config['ENABLED'] and config['SINGLE_FLIGHT'] else None
+        self._counters = {'local_hits': 0, 'persistent_hits': 0, 'misses': 0, 'bypassed': 0, 'stores': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _persistent(self):
+        if not self.persistent_alias:
+            return None
+        try:
+            return caches[self.persistent_alias]
+        except InvalidCacheBackendError:
+            return None
+
+    def get(self, key):
+        """Returns the cached response for key, or None on a miss."""
+        value = self.local.get(key)
+        if value is not None:
+            self._count('local_hits')
+            return value
+
+        backend = self._persistent()
+        if backend is not None:
+            try:
+                value = backend.get(self.key_prefix + key)
+            except Exception as e:
+                logger.warning("LLM cache read failed: %s", e)
+                value = None
+            if value is not None:
+                self.local.set(key, value)
+                self._count('persistent_hits')
+                return value
+
+        self._count('misses')
+        return None
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        backend = self._persistent()
+        if backend is not None:
+            try:
+                backend.set(self.key_prefix + key, value, self.ttl)
+            except Exception as e:
+                logger.warning("LLM cache write failed: %s", e)
+        self._count('stores')
+
+    def get_or_compute(self, model, prompt_type, prompt_text, compute, use_cache=True):
+        """
+        Returns the cached response for the request, computing and storing it on a miss.
+
+        Args:
+            model (str): The model the prompt is sent to.
+            prompt_type (str): What the call is for, e.g. 'hr_review'.
+            prompt_text (str): The prompt the response depends on.
+            compute (callable): Called with no arguments to produce the response.
+                Exceptions propagate and nothing is stored, nor is a response
+                for which compute() called dont_store().
+            use_cache (bool): False skips the lookup (the fresh result is still stored).
+
+        A miss while the same request is already being computed waits for
+        that result instead of calling compute().
+
+        Returns:
+            str: The response.
+        """
+        if not self.enabled:
+            return compute()
+
+        key = make_key(model, prompt_type, prompt_text)
+        if use_cache:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+        else:
+            self._count('bypassed')
+
+        def compute_and_store():
+            if use_cache:
+                # Stored by a flight that ended since the lookup above
+                cached = self.local.get(key)
+                if cached is not None:
+                    return cached
+            storing = {'store': True}
+            token = _storing.set(storing)
+            try:
+                value = compute()
+            finally:
+                _storing.reset(token)
+            if value and storing['store']:
+                self.set(key, value)
+            return value
+
+        if self.flights is None:
+            return compute_and_store()
+        return self.flights.do(key, compute_and_store)
+
+    async def aget_or_compute(self, model, prompt_type, prompt_text, acompute, use_cache=True):
+        """
+        Async version of get_or_compute; acompute returns an awaitable.
+        The persistent tier is read and written off the event loop.
+        """
+        if not self.enabled:
+            return await acompute()
+
+        key = make_key(model, prompt_type, prompt_text)
+        if use_cache:
+            cached = self.local.get(key)
+            if cached is not None:
+                self._count('local_hits')
+                return cached
+            cached = await sync_to_async(self.get)(key)
+            if cached is not None:
+                return cached
+        else:
+            self._count('bypassed')
+
+        async def compute_and_store():
+            if use_cache:
+                cached = self.local.get(key)
+                if cached is not None:
+                    return cached
+            storing = {'store': True}
+            token = _storing.set(storing)
+            try:
+                value = await acompute()
+            finally:
+                _storing.reset(token)
+            if value and storing['store']:
+                await sync_to_async(self.set)(key, value)
+            return value
+
+        if self.flights is None:
+            return await compute_and_store()
+        return await self.flights.ado(key, compute_and_store)
+
+    async def astream_or_compute(self, model, prompt_type, prompt_text, astream, use_cache=True):
+        """
+        Streaming counterpart of aget_or_compute.
+
+        A cached response is yielded as a single piece. Otherwise the pieces
+        from astream() are passed through as they arrive and the joined text
+        is stored once the stream finishes. Requests for a response that is
+        already streaming read that stream from its start.
+        """
+        key = make_key(model, prompt_type, prompt_text)
+        if self.enabled and use_cache:
+            cached = self.local.get(key)
+            if cached is None:
+                cached = await sync_to_async(self.get)(key)
+            else:
+                self._count('local_hits')
+            if cached is not None:
+                yield cached
+                return
+        elif self.enabled:
+            self._count('bypassed')
+
+        async def stream_and_store():
+            pieces = []
+            storing = {'store': True}
+            token = _storing.set(storing)
+            try:
+                async for piece in astream():
+                    pieces.append(piece)
+                    yield piece
+            finally:
+                _storing.reset(token)
+            value = "".join(pieces)
+            if self.enabled and value and storing['store']:
+                await sync_to_async(self.set)(key, value)
+
+        stream = stream_and_store() if self.flights is None else self.flights.astream(key, stream_and_store)
+        async for piece in stream:
+            yield piece
+
+    def clear(self):
+        self.local.clear()
+        backend = self._persistent()
+        if backend is not None:
+            backend.clear()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters['local_hits'] + counters['persistent_hits'] + counters['misses']
+        counters['hit_rate'] = (lookups - counters['misses']) / lookups if lookups else 0.0
+        counters['local_entries'] = len(self.local)
+        counters['coalesced'] = self.flights.stats()['shared'] if self.flights is not None else 0
+        return counters
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMResponseCache:
+    """Returns the process-wide LLM response cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache()
+    return _cache
+
+
+def cached_llm_call(model, prompt_type, prompt_text, compute, use_cache=True):
+    """Shortcut for get_cache().get_or_compute(...)."""
+    return get_cache().get_or_compute(model, prompt_type, prompt_text, compute, use_cache=use_cache)
+
+
+def stats():
+    return get_cache().stats()
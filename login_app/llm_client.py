@@ -0,0 +1,341 @@
+# login_app/llm_client.py
+
+# Shared, connection-pooled Groq clients for every LLM entry point.
+# Creating a Groq/ChatGroq client per request meant a new TLS handshake and
+# connection pool each time. This module keeps one keep-alive pool per process
+# (one async pool per event loop, closed with the loop) and hands out clients
+# built on top of it.
+# Calls go through the rate-limit scheduler (llm_scheduler.py), and respect
+# the caller's deadline scope (deadlines.py): the HTTP timeout is capped at the
+# time left, and a stream is closed as soon as its scope ends, which aborts
+# the request upstream.
+
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING
+
+import httpx
+from django.conf import settings
+from dotenv import load_dotenv
+
+from . import deadlines
+from .instrumentation import llm_call
+from .llm_registry import get_or_build
+from .llm_scheduler import get_config as get_scheduler_config, get_scheduler
+
+if TYPE_CHECKING:
+    from groq import AsyncGroq, Groq
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BASE_URL': None,           # None uses the Groq API; point at a local server for testing
+    'TIMEOUT': 60.0,            # seconds for a whole request
+    'CONNECT_TIMEOUT': 5.0,
+    'MAX_CONNECTIONS': 50,
+    'MAX_KEEPALIVE_CONNECTIONS': 20,
+    'KEEPALIVE_EXPIRY': 60.0,
+    'MAX_RETRIES': 2,
+    'WARM_UP': False,           # open a pooled connection when the app starts
+}
+
+
+def get_config():
+    """Returns the LLM_CLIENT settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'LLM_CLIENT', {})}
+
+
+def get_api_key():
+    return os.environ.get("GROQ_API_KEY")
+
+
+def _timeout(config):
+    return httpx.Timeout(config['TIMEOUT'], connect=config['CONNECT_TIMEOUT'])
+
+
+def _request_options():
+    # Per-request timeout, when the caller's deadline is sooner than the client's own
+    remaining = deadlines.remaining()
+    config = get_config()
+    if remaining is None or remaining >= config['TIMEOUT']:
+        return {}
+    return {'timeout': httpx.Timeout(remaining, connect=min(config['CONNECT_TIMEOUT'], remaining))}
+
+
+def _max_retries(config):
+    # The scheduler retries rate limits and transient errors itself (see llm_scheduler.py).
+    return 0 if get_scheduler_config()['ENABLED'] else config['MAX_RETRIES']
+
+
+def _limits(config):
+    return httpx.Limits(
+        max_connections=config['MAX_CONNECTIONS'],
+        max_keepalive_connections=config['MAX_KEEPALIVE_CONNECTIONS'],
+        keepalive_expiry=config['KEEPALIVE_EXPIRY'],
+    )
+
+
+_lock = threading.RLock()
+_http_client = None
+_client = None
+# httpx async pools are bound to the loop that created them, so keep one per
+# loop: (client, the generator that closes it when the loop shuts down).
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.Client:
+    """Returns the process-wide keep-alive HTTP connection pool."""
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                config = get_config()
+                _http_client = httpx.Client(timeout=_timeout(config), limits=_limits(config))
+    return _http_client
+
+
+def get_client() -> "Groq":
+    """Returns the shared synchronous Groq client."""
+    global _client
+    if _client is None:
+        # The SDK is imported on first use, like the other AI libraries (see login_app/preload.py).
+        from groq import Groq
+
+        http_client = get_http_client()
+        with _lock:
+            if _client is None:
+                config = get_config()
+                _client = Groq(
+                    api_key=get_api_key(),
+                    base_url=config['BASE_URL'],
+                    timeout=_timeout(config),
+                    max_retries=_max_retries(config),
+                    http_client=http_client,
+                )
+    return _client
+
+
+async def _close_with_loop(client):
+    # Waits at the yield until the loop shuts down: asyncio.run(), which also
+    # runs every async view under WSGI (asgiref's async_to_sync), closes the
+    # async generators left on a loop before closing it.
+    try:
+        yield
+    finally:
+        await client.close()
+
+
+def get_async_client() -> "AsyncGroq":
+    """
+    Returns the AsyncGroq client for the running event loop. Its connections
+    are closed when the loop shuts down, so short-lived loops don't leak them.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None:
+        from groq import AsyncGroq
+
+        config = get_config()
+        client = AsyncGroq(
+            api_key=get_api_key(),
+            base_url=config['BASE_URL'],
+            timeout=_timeout(config),
+            max_retries=_max_retries(config),
+            http_client=httpx.AsyncClient(timeout=_timeout(config), limits=_limits(config)),
+        )
+        closer = _close_with_loop(client)
+        asyncio.ensure_future(closer.__anext__())
+        entry = _async_clients[loop] = (client, closer)
+    return entry[0]
+
+
+def chat_model(model: str):
+    """
+    Returns a LangChain ChatGroq for model that sends its requests over the
+    shared connection pool. Instances are created once per model.
+    """
+    def build():
+        from langchain_groq import ChatGroq
+
+        config = get_config()
+        kwargs = {}
+        if config['BASE_URL']:
+            kwargs['base_url'] = config['BASE_URL']
+        return ChatGroq(
+            model=model,
+            request_timeout=config['TIMEOUT'],
+            max_retries=_max_retries(config),
+            http_client=get_http_client(),
+            **kwargs,
+        )
+
+    return get_or_build(("chat_model", model), build)
+
+
+def _messages_text(messages):
+    # The text of crewAI's messages, for the scheduler's token estimate
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(str(message.get('content', '')) for message in messages)
+
+
+def _scheduled_llm_class():
+    def build():
+        from crewai import LLM
+
+        class ScheduledLLM(LLM):
+            """
+            crewAI's LLM, with each request admitted (and retried on 429s) by
+            the rate-limit scheduler, like every other call to the model.
+            """
+
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self._init_kwargs = kwargs
+
+            def call(self, messages, *args, **kwargs):
+                return get_scheduler().call(
+                    self.model.removeprefix('groq/'),
+                    lambda: super(ScheduledLLM, self).call(messages, *args, **kwargs),
+                    prompt=_messages_text(messages),
+                )
+
+            async def acall(self, messages, *args, **kwargs):
+                return await get_scheduler().acall(
+                    self.model.removeprefix('groq/'),
+                    lambda: super(ScheduledLLM, self).acall(messages, *args, **kwargs),
+                    prompt=_messages_text(messages),
+                )
+
+            # crewAI copies each agent's LLM for every run, and LLM's copies are plain LLMs.
+            def __copy__(self):
+                return type(self)(**self._init_kwargs)
+
+            def __deepcopy__(self, memo=None):
+                return type(self)(**self._init_kwargs)
+
+        return ScheduledLLM
+
+    return get_or_build(("scheduled_llm_class",), build)
+
+
+def crew_llm(model: str):
+    """
+    Returns a crewAI LLM for model with the configured timeout, created once per model.
+    crewAI routes Groq calls through LiteLLM, which keeps its own client pool;
+    the requests still go through the rate-limit scheduler, so crew runs share
+    the model's RPM/TPM budget with the direct calls.
+    """
+    def build():
+        config = get_config()
+        kwargs = {}
+        if config['BASE_URL']:
+            kwargs['base_url'] = config['BASE_URL']
+        return _scheduled_llm_class()(
+            model=model,
+            api_key=get_api_key(),
+            timeout=config['TIMEOUT'],
+            max_retries=_max_retries(config),
+            **kwargs,
+        )
+
+    return get_or_build(("crew_llm", model), build)
+
+
+def complete(model: str, prompt: str, **kwargs) -> str:
+    """
+    Sends a single-turn chat completion and returns the reply text.
+
+    Args:
+        model (str): The Groq model name.
+        prompt (str): The user message.
+        **kwargs: Extra arguments for chat.completions.create (e.g. temperature).
+
+    Returns:
+        str: The model's reply.
+    """
+    with llm_call(model):
+        response = get_scheduler().call(model, lambda: get_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            **_request_options(),
+            **kwargs,
+        ), prompt)
+    return response.choices[0].message.content
+
+
+async def acomplete(model: str, prompt: str, **kwargs) -> str:
+    """Async version of complete(); does not block a worker thread while waiting."""
+    with llm_call(model):
+        response = await get_scheduler().acall(model, lambda: get_async_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            **_request_options(),
+            **kwargs,
+        ), prompt)
+    return response.choices[0].message.content
+
+
+def stream(model: str, prompt: str, **kwargs):
+    """
+    Streaming version of complete(): yields the reply text piece by piece
+    as the model produces it.
+    """
+    with llm_call(model):
+        # Rate limits are reported before the first chunk, so only opening the stream is scheduled and retried.
+        chunks = get_scheduler().call(model, lambda: get_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            **_request_options(),
+            **kwargs,
+        ), prompt)
+        try:
+            for chunk in chunks:
+                deadlines.check()
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Also when the reader stops early or the scope ended: Groq stops generating.
+            chunks.close()
+
+
+async def astream(model: str, prompt: str, **kwargs):
+    """Async version of stream()."""
+    with llm_call(model):
+        chunks = await get_scheduler().acall(model, lambda: get_async_client().chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            **_request_options(),
+            **kwargs,
+        ), prompt)
+        try:
+            async for chunk in chunks:
+                deadlines.check()
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await chunks.close()
+
+
+def warm_up():
+    """
+    Opens a pooled connection to the API so the first user request doesn't
+    pay for DNS and the TLS handshake. Failures are logged, never raised.
+    """
+    if not get_api_key():
+        return
+    try:
+        get_client().models.list()
+    except Exception as e:
+        logger.warning("LLM client warm-up failed: %s", e)
+
+
+def warm_up_in_background():
+    threading.Thread(target=warm_up, name='llm-warm-up', daemon=True).start()
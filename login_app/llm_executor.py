@@ -0,0 +1,285 @@
+# login_app/llm_executor.py
+
+# Dedicated, bounded thread pool for blocking LLM work.
+# Async views used to run LLM calls through sync_to_async(thread_sensitive=True),
+# which puts every call on the one shared sync thread, so the site could only
+# run one enhancement at a time. LLM calls now run on this pool instead, with a
+# per-endpoint concurrency limit, while ORM and session access stays on
+# sync_to_async. Each call runs in its own deadline scope, cancelled when the
+# awaiting request goes away (see deadlines.py).
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import deadlines
+
+DEFAULTS = {
+    'WORKERS': 8,
+    # Maximum calls running at once per endpoint; endpoints not listed share DEFAULT_ENDPOINT_LIMIT.
+    'ENDPOINT_LIMITS': {},
+    'DEFAULT_ENDPOINT_LIMIT': None,
+}
+
+
+def get_config():
+    """Returns the LLM_EXECUTOR settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'LLM_EXECUTOR', {})}
+
+
+def _retrieve_outcome(task):
+    # Mark a background task's exception as seen; the caller already got it.
+    if not task.cancelled():
+        task.exception()
+
+
+class EndpointLimiter:
+    """
+    Caps how many calls of one endpoint may run at once.
+
+    Backed by a threading semaphore so the limit holds across event loops
+    (each request gets its own loop when async views run under WSGI).
+    """
+
+    poll_interval = 0.005
+    max_poll_interval = 0.05
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    async def acquire(self):
+        delay = self.poll_interval
+        while not self._semaphore.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+
+    def release(self):
+        self._semaphore.release()
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def as_dict(self):
+        finished = self.completed + self.failed
+        return {
+            'waiting': self.waiting,
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'avg_wait_seconds': self.total_wait / finished if finished else 0.0,
+            'max_wait_seconds': self.max_wait,
+            'avg_run_seconds': self.total_run / finished if finished else 0.0,
+        }
+
+
+class LLMExecutor:
+    """
+    Runs blocking LLM functions on a bounded worker pool and records
+    queue-depth and wait-time metrics per endpoint.
+    """
+
+    def __init__(self, workers=8, endpoint_limits=None, default_endpoint_limit=None):
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='llm-worker')
+        self._limiters = {
+            name: EndpointLimiter(limit) for name, limit in (endpoint_limits or {}).items()
+        }
+        self._default_limit = default_endpoint_limit
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _limiter(self, endpoint):
+        with self._lock:
+            limiter = self._limiters.get(endpoint)
+            if limiter is None and self._default_limit:
+                limiter = self._limiters[endpoint] = EndpointLimiter(self._default_limit)
+            return limiter
+
+    def _endpoint_stats(self, endpoint):
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = _EndpointStats()
+        return stats
+
+    def _run_in_worker(self, endpoint, queued_at, scope, func, args, kwargs):
+        started_at = time.monotonic()
+        waited = started_at - queued_at
+        with self._lock:
+            stats = self._endpoint_stats(endpoint)
+            stats.waiting -= 1
+            stats.running += 1
+            stats.total_wait += waited
+            stats.max_wait = max(stats.max_wait, waited)
+        failed = False
+        try:
+            with deadlines.bind(scope):
+                return func(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            # Worker threads live outside the request cycle, so close any DB
+            # connection the call opened (e.g. the persistent LLM cache tier).
+            close_old_connections()
+            with self._lock:
+                stats.running -= 1
+                stats.total_run += time.monotonic() - started_at
+                if failed:
+                    stats.failed += 1
+                else:
+                    stats.completed += 1
+
+    async def run(self, endpoint, func, *args, **kwargs):
+        """
+        Runs func(*args, **kwargs) on the LLM pool and awaits its result.
+
+        Args:
+            endpoint (str): Name used for the concurrency limit and metrics.
+            func (callable): The blocking function to run.
+
+        Returns:
+            Whatever func returns; exceptions propagate to the caller.
+
+        If the caller is cancelled (e.g. the client disconnected), func's
+        deadline scope is cancelled too, so its LLM calls stop at their next
+        check instead of running to the end.
+        """
+        queued_at = time.monotonic()
+        with self._lock:
+            self._endpoint_stats(endpoint).waiting += 1
+
+        limiter = self._limiter(endpoint)
+        if limiter is not None:
+            try:
+                await limiter.acquire()
+            except BaseException:
+                with self._lock:
+                    self._endpoint_stats(endpoint).waiting -= 1
+                raise
+
+        context = contextvars.copy_context()
+        scope = deadlines.child()
+        future = self._pool.submit(context.run, self._run_in_worker, endpoint, queued_at, scope, func, args, kwargs)
+
+        def _on_done(f):
+            # Release the endpoint slot only when the worker is really done,
+            # not when the awaiting request goes away.
+            if f.cancelled():
+                with self._lock:
+                    self._endpoint_stats(endpoint).waiting -= 1
+            if limiter is not None:
+                limiter.release()
+
+        future.add_done_callback(_on_done)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            scope.cancel()
+            raise
+
+    async def iterate(self, endpoint, gen_func, *args, **kwargs):
+        """
+        Runs the blocking generator gen_func(*args, **kwargs) on the LLM pool
+        and yields its items on the event loop as they are produced.
+
+        If the consumer stops early (e.g. the client disconnected), the
+        generator's deadline scope is cancelled, so an LLM stream it is
+        reading is closed at its next chunk.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stopped = threading.Event()
+        end = object()
+
+        def put(item, error=None):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+            except RuntimeError:
+                # The event loop is gone; nobody is listening any more.
+                stopped.set()
+
+        def produce():
+            generator = gen_func(*args, **kwargs)
+            try:
+                for item in generator:
+                    if stopped.is_set():
+                        break
+                    put(item)
+            except BaseException as e:
+                put(end, e)
+                raise
+            finally:
+                generator.close()
+            put(end)
+
+        task = asyncio.ensure_future(self.run(endpoint, produce))
+        try:
+            while True:
+                item, error = await queue.get()
+                if item is end:
+                    if error is not None:
+                        raise error
+                    break
+                yield item
+        finally:
+            stopped.set()
+            task.cancel()
+            task.add_done_callback(_retrieve_outcome)
+
+    def stats(self):
+        """Returns pool-wide and per-endpoint queue depth and timing metrics."""
+        with self._lock:
+            endpoints = {name: stats.as_dict() for name, stats in self._stats.items()}
+        return {
+            'workers': self.workers,
+            'queue_depth': sum(e['waiting'] for e in endpoints.values()),
+            'running': sum(e['running'] for e in endpoints.values()),
+            'endpoints': endpoints,
+        }
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> LLMExecutor:
+    """Returns the process-wide LLM executor, creating it from settings on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                config = get_config()
+                _executor = LLMExecutor(
+                    workers=config['WORKERS'],
+                    endpoint_limits=config['ENDPOINT_LIMITS'],
+                    default_endpoint_limit=config['DEFAULT_ENDPOINT_LIMIT'],
+                )
+    return _executor
+
+
+async def run_llm(endpoint, func, *args, **kwargs):
+    """Shortcut for get_executor().run(...)."""
+    return await get_executor().run(endpoint, func, *args, **kwargs)
+
+
+def iterate_llm(endpoint, gen_func, *args, **kwargs):
+    """Shortcut for get_executor().iterate(...)."""
+    return get_executor().iterate(endpoint, gen_func, *args, **kwargs)
+
+
+def stats():
+    return get_executor().stats()
@@ -0,0 +1,94 @@
+# login_app/llm_registry.py
+
+# Process-level registry for expensive, reusable LLM objects: LangChain chat
+# models and chains, crewAI LLMs, agents and crew templates. Each object is
+# built once per key (normally the model/configuration it depends on) and then
+# shared; per-request inputs are bound at call time. The registry records how
+# long each build took, so stats() can report the setup time that reuse saved.
+
+import threading
+import time
+
+
+class _Entry:
+    def __init__(self, value, build_seconds):
+        self.value = value
+        self.build_seconds = build_seconds
+        self.hits = 0
+
+
+class Registry:
+    """
+    Thread-safe build-once store. Objects put here must be safe to share
+    between concurrent requests (or be copied by the caller before use).
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key, builder):
+        """
+        Returns the object registered under key, calling builder() to create it
+        the first time. Concurrent first calls for the same key build it once.
+
+        Args:
+            key (tuple | str): Identifies the object and the configuration it was built from.
+            builder (callable): Builds the object; called with no arguments.
+
+        Returns:
+            The shared object.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+            with key_lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    started = time.perf_counter()
+                    value = builder()
+                    entry = _Entry(value, time.perf_counter() - started)
+                    self._entries[key] = entry
+                    return value
+        with self._lock:
+            entry.hits += 1
+        return entry.value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+
+    def stats(self):
+        """
+        Returns build time and reuse counts per key, plus the total
+        construction time saved by reusing objects instead of rebuilding them.
+        """
+        with self._lock:
+            entries = {
+                str(key): {
+                    'build_seconds': entry.build_seconds,
+                    'reuses': entry.hits,
+                    'saved_seconds': entry.build_seconds * entry.hits,
+                }
+                for key, entry in self._entries.items()
+            }
+        return {
+            'objects': len(entries),
+            'saved_seconds': sum(e['saved_seconds'] for e in entries.values()),
+            'entries': entries,
+        }
+
+
+registry = Registry()
+
+
+def get_or_build(key, builder):
+    """Shortcut for registry.get(...) on the process-wide registry."""
+    return registry.get(key, builder)
+
+
+def stats():
+    return registry.stats()
@@ -0,0 +1,347 @@
+# login_app/llm_router.py
+
+# Central model routing. Features ask for a task ('ats_evaluation',
+# 'section_enhance', ...) rather than a model, and the router picks one:
+#
+# - by size: each task lists its models smallest first, and a prompt goes to
+#   the first one whose input budget (PROMPT_BUDGETS) it fits, so a long resume
+#   reaches a model with a larger context window instead of being cut;
+# - by deadline: if the model hasn't answered within the task's DEADLINE, the
+#   same prompt is sent to its FALLBACK (a faster model) and whichever answers
+#   first is used (a fallback answer isn't cached, see llm_cache.dont_store);
+# - by hedging: with HEDGE on, a duplicate request to the same model is sent
+#   once the first has been running longer than that model's recent p95
+#   latency (or HEDGE_AFTER seconds), which cuts the slow tail.
+#
+# Hedges and fallbacks trade quota and some answer quality for tail latency,
+# so both are off unless a task enables them in LLM_ROUTER. Every decision is
+# logged, counted per task/model/outcome for /metrics, and listed in the
+# request's X-LLM-Route header.
+#
+# Each call runs under its task's deadline (DEADLINES['STAGES'], see
+# deadlines.py); the requests that lose a race are cancelled.
+
+import asyncio
+import contextvars
+import logging
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+
+from django.conf import settings
+
+from . import deadlines, llm_client
+from .instrumentation import record_route
+from .llm_cache import dont_store
+from .prompt_prep import input_budget
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'TASKS': {
+        'ats_evaluation': {'MODELS': ['llama3-8b-8192']},
+        'job_brief': {'MODELS': ['llama3-8b-8192']},
+        'section_headings': {'MODELS': ['meta-llama/llama-4-maverick-17b-128e-instruct']},
+        'section_enhance': {'MODELS': ['meta-llama/llama-4-maverick-17b-128e-instruct']},
+        # Direct calls of the crew pipelines (agents.py); crewAI's own agents always use CREW_MODEL.
+        'crew_step': {'MODELS': ['llama-3.3-70b-versatile']},
+    },
+    'HEDGE_PERCENTILE': 95,
+    'HEDGE_AFTER': None,        # fixed seconds before hedging, instead of the measured percentile
+    'HEDGE_MIN_SAMPLES': 20,    # calls to a model before its measured latency is trusted
+    'LATENCY_WINDOW': 200,      # recent calls per model the percentile is taken over
+}
+
+TASK_DEFAULTS = {
+    'MODELS': [],
+    'FALLBACK': None,   # faster model tried when the primary misses DEADLINE
+    'DEADLINE': None,   # seconds
+    'HEDGE': False,
+}
+
+PRIMARY = 'primary'
+HEDGE = 'hedge'
+FALLBACK = 'fallback'
+
+
+def get_config():
+    """Returns the LLM_ROUTER settings merged over the defaults (TASKS merged per task)."""
+    overrides = getattr(settings, 'LLM_ROUTER', {})
+    config = {**DEFAULTS, **overrides}
+    config['TASKS'] = {**DEFAULTS['TASKS'], **overrides.get('TASKS', {})}
+    return config
+
+
+def get_task_config(task, config=None):
+    config = config or get_config()
+    if task not in config['TASKS']:
+        raise KeyError(f"Unknown LLM task {task!r}; add it to LLM_ROUTER['TASKS'].")
+    return {**TASK_DEFAULTS, **config['TASKS'][task]}
+
+
+# model: where the prompt goes first; fallback/deadline and hedge_after (seconds,
+# or None) say when a second request is sent.
+Route = namedtuple('Route', ['task', 'model', 'fallback', 'deadline', 'hedge_after'])
+
+
+class LatencyTracker:
+    """Recent call durations per model, for the hedging threshold. Thread-safe."""
+
+    def __init__(self, window):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def observe(self, model, seconds):
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, model, percent, min_samples):
+        """Returns the percentile of model's recent durations, or None with fewer than min_samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+_latencies = None
+_stats_lock = threading.Lock()
+_stats = {}     # (task, model, outcome) -> calls
+
+
+def _get_latencies():
+    global _latencies
+    if _latencies is None:
+        _latencies = LatencyTracker(get_config()['LATENCY_WINDOW'])
+    return _latencies
+
+
+def choose_route(task, input_tokens=0):
+    """
+    Picks the model for a task and prompt size, and when to hedge or fall back.
+
+    Args:
+        task (str): A key of LLM_ROUTER['TASKS'].
+        input_tokens (int): Estimated prompt size.
+
+    Returns:
+        Route
+    """
+    config = get_config()
+    task_config = get_task_config(task, config)
+    models = task_config['MODELS']
+    model = next((m for m in models if input_tokens <= input_budget(m)), models[-1])
+    hedge_after = None
+    if task_config['HEDGE']:
+        hedge_after = config['HEDGE_AFTER']
+        if hedge_after is None:
+            hedge_after = _get_latencies().percentile(model, config['HEDGE_PERCENTILE'], config['HEDGE_MIN_SAMPLES'])
+    fallback = task_config['FALLBACK'] if task_config['DEADLINE'] is not None else None
+    return Route(task, model, fallback, task_config['DEADLINE'], hedge_after)
+
+
+def _launches(route):
+    # (delay, model, outcome) for each request a call may send, earliest first
+    launches = [(0.0, route.model, PRIMARY)]
+    if route.hedge_after is not None:
+        launches.append((route.hedge_after, route.model, HEDGE))
+    if route.fallback:
+        launches.append((route.deadline, route.fallback, FALLBACK))
+    return sorted(launches, key=lambda launch: launch[0])
+
+
+def _record(route, model, outcome, seconds):
+    if outcome == FALLBACK:
+        # The response is cached under the primary model, which didn't write it.
+        dont_store()
+    with _stats_lock:
+        key = (route.task, model, outcome)
+        _stats[key] = _stats.get(key, 0) + 1
+    description = f"{route.task}={model}" + ("" if outcome == PRIMARY else f" ({outcome})")
+    record_route(description)
+    logger.info("LLM route %s in %.2fs", description, seconds)
+
+
+def call(task, prompt, call_model, route=None):
+    """
+    Runs call_model(model) for task's route and returns its result, hedging
+    and falling back as configured. Once one answers, the scopes of the
+    others are cancelled: a request already sent finishes in its thread and
+    its answer is dropped, but it isn't retried, and a stream stops.
+
+    Args:
+        task (str): A key of LLM_ROUTER['TASKS'].
+        prompt (str): The prompt, used for the size estimate.
+        call_model (callable): Sends the prompt to the model it is given.
+        route (Route): A route already chosen with choose_route(), e.g. to size the prompt.
+    """
+    route = route or choose_route(task, estimate_tokens(prompt))
+    launches = _launches(route)
+    started = time.perf_counter()
+    with deadlines.deadline(task) as scope:
+        if len(launches) == 1:
+            result = call_model(route.model)
+            _get_latencies().observe(route.model, time.perf_counter() - started)
+            _record(route, route.model, PRIMARY, time.perf_counter() - started)
+            return result
+
+        answers = queue.Queue()
+        attempts = []
+
+        def attempt(model, outcome):
+            attempt_started = time.perf_counter()
+            try:
+                with deadlines.deadline() as attempt_scope:
+                    attempts.append(attempt_scope)
+                    result = call_model(model)
+            except Exception as e:
+                answers.put((model, outcome, None, e))
+                return
+            _get_latencies().observe(model, time.perf_counter() - attempt_started)
+            answers.put((model, outcome, result, None))
+
+        running, error = 0, None
+        try:
+            while True:
+                elapsed = time.perf_counter() - started
+                while launches and (launches[0][0] <= elapsed or running == 0):
+                    # Due, or nothing is running any more because the earlier requests failed.
+                    _, model, outcome = launches.pop(0)
+                    context = contextvars.copy_context()
+                    threading.Thread(target=context.run, args=(attempt, model, outcome), name=f'llm-{outcome}', daemon=True).start()
+                    running += 1
+                if running == 0:
+                    raise error
+                # Wakes up at the next launch, or now and then to notice the scope ending.
+                wait = launches[0][0] - elapsed if launches else None
+                try:
+                    model, outcome, result, failure = answers.get(timeout=min(wait, 0.5) if wait is not None else 0.5)
+                except queue.Empty:
+                    scope.check()
+                    continue
+                running -= 1
+                if failure is None:
+                    _record(route, model, outcome, time.perf_counter() - started)
+                    return result
+                logger.warning("LLM %s request to %s failed: %s", outcome, model, failure)
+                error = failure
+        finally:
+            for attempt_scope in attempts:
+                attempt_scope.cancel()
+
+
+async def acall(task, prompt, acall_model, route=None, discard=None):
+    """
+    Async version of call(): acall_model(model) returns an awaitable. Requests
+    that lose the race are cancelled; discard(result) is called for a loser
+    that had already finished (e.g. to close a stream).
+    """
+    with deadlines.deadline(task):
+        return await _acall(task, prompt, acall_model, route, discard)
+
+
+async def _acall(task, prompt, acall_model, route, discard):
+    route = route or choose_route(task, estimate_tokens(prompt))
+    launches = _launches(route)
+    started = time.perf_counter()
+
+    async def attempt(model):
+        attempt_started = time.perf_counter()
+        result = await acall_model(model)
+        _get_latencies().observe(model, time.perf_counter() - attempt_started)
+        return result
+
+    tasks = {}      # asyncio task -> (model, outcome)
+    error = None
+    try:
+        while True:
+            elapsed = time.perf_counter() - started
+            while launches and (launches[0][0] <= elapsed or not tasks):
+                _, model, outcome = launches.pop(0)
+                tasks[asyncio.ensure_future(attempt(model))] = (model, outcome)
+            if not tasks:
+                raise error
+            done, _ = await asyncio.wait(
+                tasks, timeout=launches[0][0] - elapsed if launches else None, return_when=asyncio.FIRST_COMPLETED,
+            )
+            for finished in done:
+                model, outcome = tasks.pop(finished)
+                if finished.exception() is None:
+                    _record(route, model, outcome, time.perf_counter() - started)
+                    return finished.result()
+                logger.warning("LLM %s request to %s failed: %s", outcome, model, finished.exception())
+                error = finished.exception()
+    finally:
+        for pending in tasks:
+            pending.cancel()
+            if discard is not None and pending.done() and not pending.cancelled() and pending.exception() is None:
+                discard(pending.result())
+
+
+def complete(task, prompt, route=None, **kwargs):
+    """llm_client.complete() for task's route."""
+    return call(task, prompt, lambda model: llm_client.complete(model, prompt, **kwargs), route=route)
+
+
+async def acomplete(task, prompt, route=None, **kwargs):
+    """llm_client.acomplete() for task's route."""
+    return await acall(task, prompt, lambda model: llm_client.acomplete(model, prompt, **kwargs), route=route)
+
+
+async def astream(task, prompt, route=None, **kwargs):
+    """
+    llm_client.astream() for task's route. The fallback deadline and hedge apply
+    to the first piece of the reply: whichever stream starts first is the one
+    read. The task's deadline covers the whole stream.
+    """
+    scope = deadlines.child(task)
+    async def open_stream(model):
+        stream = llm_client.astream(model, prompt, **kwargs)
+        try:
+            return stream, await stream.__anext__()
+        except StopAsyncIteration:
+            return stream, None
+
+    def close(opened):
+        asyncio.ensure_future(opened[0].aclose())
+
+    with deadlines.bind(scope):
+        stream, first = await acall(task, prompt, open_stream, route=route, discard=close)
+    if first is None:
+        return
+    yield first
+    try:
+        async for piece in stream:
+            scope.check()
+            yield piece
+    finally:
+        await stream.aclose()
+
+
+def stream(task, prompt, route=None, **kwargs):
+    """
+    llm_client.stream() for task's route. Only the model choice and the task's
+    deadline apply: the synchronous streams are read by background jobs, where
+    the tail matters less.
+    """
+    route = route or choose_route(task, estimate_tokens(prompt))
+    scope = deadlines.child(task)
+    started = time.perf_counter()
+    pieces = llm_client.stream(route.model, prompt, **kwargs)
+    try:
+        for piece in pieces:
+            scope.check()
+            yield piece
+    finally:
+        pieces.close()
+    _get_latencies().observe(route.model, time.perf_counter() - started)
+    _record(route, route.model, PRIMARY, time.perf_counter() - started)
+
+
+def stats():
+    """Calls per (task, model, outcome)."""
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,356 @@
+# login_app/llm_scheduler.py
+
+# Rate-limit-aware scheduling for LLM calls.
+# Groq enforces per-model requests-per-minute and tokens-per-minute limits and
+# answers bursts with 429s. Every call made through llm_client (including
+# crewAI's agents, see crew_llm, and the LangChain chains in section.py)
+# first takes a slot from its model's RPM and TPM token buckets, so bursts
+# turn into a short queueing delay instead of errors. Waiting callers are served by priority (interactive before batch),
+# then in arrival order. If the API still says 429, the model is paused for
+# the Retry-After time the server sent; 429s, transient 5xx responses and
+# connection errors are retried with jittered exponential backoff. Queueing
+# and retries stop when the caller's deadline scope ends (see deadlines.py).
+
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import logging
+import random
+import re
+import threading
+import time
+
+import httpx
+from django.conf import settings
+
+from . import deadlines
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0     # a user is waiting on the page
+BATCH = 1           # background work: crew jobs, bulk screening, JD briefs
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DEFAULT_RPM': 30,
+    'DEFAULT_TPM': 30000,
+    'MODEL_LIMITS': {},                 # model -> {'RPM': ..., 'TPM': ...}
+    'OUTPUT_TOKENS': 500,               # expected reply size, counted against TPM up front
+    'MAX_RETRIES': 4,
+    'BACKOFF_BASE': 1.0,                # seconds, doubled per retry, with jitter
+    'BACKOFF_MAX': 30.0,
+    'MAX_QUEUE_WAIT': 120.0,            # give up waiting for a slot after this long
+}
+
+RATE_LIMITED = 429
+# Transient failures worth retrying; the LLM clients' own retries are off so these aren't retried twice.
+RETRY_STATUS_CODES = (408, 409, RATE_LIMITED, 500, 502, 503, 504)
+
+# Wait granularity while queued; short enough to notice a higher-priority caller leaving.
+_POLL_INTERVAL = 0.25
+
+
+def get_config():
+    """Returns the LLM_SCHEDULER settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'LLM_SCHEDULER', {})}
+
+
+class SchedulerTimeout(Exception):
+    """Raised when a call waited longer than MAX_QUEUE_WAIT for a rate-limit slot."""
+
+
+_priority = contextvars.ContextVar('llm_priority', default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def priority(level):
+    """Runs the calls made inside the block (in this thread or task) at the given priority."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """A bucket of capacity tokens refilled continuously over a minute. Not thread-safe on its own."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount tokens are available (amount is capped at the capacity)."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(missing / self.rate, 0.0)
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+
+class ModelScheduler:
+    """Request and token buckets plus the wait queue for one model."""
+
+    def __init__(self, model, rpm, tpm):
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+        self._queue = []
+        self._counter = itertools.count()
+        self._stats = {'calls': 0, 'queued_seconds': 0.0, 'rate_limited': 0, 'retries': 0, 'failed': 0}
+
+    def _enqueue(self, level):
+        ticket = (level, next(self._counter))
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _leave(self, ticket):
+        with self._lock:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+
+    def _try_take(self, ticket, tokens):
+        """Takes the slot and returns 0 if ticket is first in line and the buckets allow it; else seconds to wait."""
+        with self._lock:
+            if self._queue[0] != ticket:
+                return _POLL_INTERVAL
+            now = time.monotonic()
+            wait = max(self.paused_until - now, self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            heapq.heappop(self._queue)
+            return 0.0
+
+    def _record_wait(self, started):
+        with self._lock:
+            self._stats['calls'] += 1
+            self._stats['queued_seconds'] += time.monotonic() - started
+
+    def _check_wait(self, started, wait, max_wait):
+        # Raises if the caller can't wait `wait` more seconds for a slot
+        if time.monotonic() - started + wait > max_wait:
+            raise SchedulerTimeout(f"No {self.model} rate-limit slot within {max_wait:.0f}s")
+        remaining = deadlines.remaining()
+        if remaining is not None and wait > remaining:
+            raise deadlines.DeadlineExceeded(f"No {self.model} rate-limit slot before the deadline")
+
+    def acquire(self, tokens, level, max_wait):
+        """Blocks until a slot is free."""
+        started = time.monotonic()
+        ticket = self._enqueue(level)
+        try:
+            while (wait := self._try_take(ticket, tokens)) > 0:
+                self._check_wait(started, wait, max_wait)
+                deadlines.sleep(min(wait, _POLL_INTERVAL))
+        finally:
+            self._leave(ticket)
+        self._record_wait(started)
+
+    async def aacquire(self, tokens, level, max_wait):
+        """Async version of acquire(); waits without blocking the event loop."""
+        started = time.monotonic()
+        ticket = self._enqueue(level)
+        try:
+            while (wait := self._try_take(ticket, tokens)) > 0:
+                self._check_wait(started, wait, max_wait)
+                deadlines.check()
+                await asyncio.sleep(min(wait, _POLL_INTERVAL))
+        finally:
+            self._leave(ticket)
+        self._record_wait(started)
+
+    def pause(self, seconds):
+        """Holds every call to this model for seconds (after a 429)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self._stats['rate_limited'] += 1
+
+    def count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, 'waiting': len(self._queue)}
+
+
+_DURATION_RE = re.compile(r"(?:(\d+(?:\.\d+)?)m(?!s))?(?:(\d+(?:\.\d+)?)s)?(?:(\d+(?:\.\d+)?)ms)?$")
+
+
+def _parse_duration(value):
+    """Parses Retry-After style values: '7', '7.5', '2m30s', '850ms'. Returns seconds or None."""
+    value = (value or "").strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    match = _DURATION_RE.match(value)
+    if not value or not match:
+        return None
+    minutes, seconds, millis = (float(part) if part else 0.0 for part in match.groups())
+    return minutes * 60 + seconds + millis / 1000
+
+
+def _status(error):
+    return getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+
+
+def retry_after(error):
+    """
+    Returns (retryable, seconds) for an exception raised by an LLM call:
+    connection errors, 429s and transient 5xx responses are retryable.
+    seconds is the server's Retry-After (or rate-limit reset) hint, or None.
+    """
+    # An error from the SDK means it is already imported, so this import is free.
+    from groq import APIConnectionError
+
+    if isinstance(error, (APIConnectionError, httpx.TransportError)):
+        return True, None
+    if _status(error) not in RETRY_STATUS_CODES:
+        return False, None
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    for header in ('retry-after', 'x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens'):
+        seconds = _parse_duration(headers.get(header))
+        if seconds is not None:
+            return True, seconds
+    return True, None
+
+
+def backoff_delay(attempt, hint, config):
+    """Seconds to wait before retry number attempt (1-based): the server's hint plus jittered exponential backoff."""
+    exponential = min(config['BACKOFF_MAX'], config['BACKOFF_BASE'] * 2 ** (attempt - 1))
+    return (hint or 0.0) + random.uniform(exponential / 2, exponential)
+
+
+class LLMScheduler:
+    """Process-wide set of ModelSchedulers, one per model."""
+
+    def __init__(self, config):
+        self.config = config
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def for_model(self, model):
+        scheduler = self._models.get(model)
+        if scheduler is None:
+            with self._lock:
+                scheduler = self._models.get(model)
+                if scheduler is None:
+                    limits = self.config['MODEL_LIMITS'].get(model, {})
+                    scheduler = ModelScheduler(
+                        model,
+                        limits.get('RPM', self.config['DEFAULT_RPM']),
+                        limits.get('TPM', self.config['DEFAULT_TPM']),
+                    )
+                    self._models[model] = scheduler
+        return scheduler
+
+    def _tokens(self, prompt):
+        return estimate_tokens(prompt) + self.config['OUTPUT_TOKENS']
+
+    def _should_retry(self, scheduler, error, attempt):
+        retryable, hint = retry_after(error)
+        if not retryable or attempt > self.config['MAX_RETRIES']:
+            if retryable:
+                scheduler.count('failed')
+            return None
+        delay = backoff_delay(attempt, hint, self.config)
+        if _status(error) == RATE_LIMITED:
+            # Everyone waits, not just this caller: the limit is per model.
+            scheduler.pause(hint if hint is not None else delay)
+        remaining = deadlines.remaining()
+        if remaining is not None and delay > remaining:
+            # Sleeping until the deadline would only delay the same error.
+            scheduler.count('failed')
+            raise deadlines.DeadlineExceeded(f"{scheduler.model} retry due after the deadline") from error
+        scheduler.count('retries')
+        logger.warning("%s call failed (attempt %d: %s), retrying in %.1fs", scheduler.model, attempt, error, delay)
+        return delay
+
+    def call(self, model, func, prompt=""):
+        """
+        Runs func() once model's rate limits allow it, retrying on 429/503.
+
+        Args:
+            model (str): The model the call goes to (selects the limits).
+            func (callable): Makes the request; called again for each retry.
+            prompt (str): The prompt, for the tokens-per-minute estimate.
+
+        Returns:
+            Whatever func returns.
+
+        Raises:
+            SchedulerTimeout: If no slot was free within MAX_QUEUE_WAIT.
+            deadlines.Cancelled, deadlines.DeadlineExceeded: If the caller's
+                scope ended, or will end, before a (further) attempt.
+        """
+        deadlines.check()
+        if not self.config['ENABLED']:
+            return func()
+        scheduler = self.for_model(model)
+        for attempt in itertools.count(1):
+            deadlines.check()
+            scheduler.acquire(self._tokens(prompt), _priority.get(), self.config['MAX_QUEUE_WAIT'])
+            try:
+                return func()
+            except Exception as e:
+                delay = self._should_retry(scheduler, e, attempt)
+                if delay is None:
+                    raise
+                deadlines.sleep(delay)
+
+    async def acall(self, model, coro_func, prompt=""):
+        """Async version of call(); coro_func() returns a new awaitable for each attempt."""
+        deadlines.check()
+        if not self.config['ENABLED']:
+            return await coro_func()
+        scheduler = self.for_model(model)
+        for attempt in itertools.count(1):
+            deadlines.check()
+            await scheduler.aacquire(self._tokens(prompt), _priority.get(), self.config['MAX_QUEUE_WAIT'])
+            try:
+                return await coro_func()
+            except Exception as e:
+                delay = self._should_retry(scheduler, e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    def stats(self):
+        with self._lock:
+            models = dict(self._models)
+        return {model: scheduler.stats() for model, scheduler in models.items()}
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Returns the process-wide LLMScheduler, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler(get_config())
+    return _scheduler
+
+
+def stats():
+    return get_scheduler().stats()
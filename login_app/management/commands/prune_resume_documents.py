@@ -0,0 +1,16 @@
+# login_app/management/commands/prune_resume_documents.py
+
+from django.core.management.base import BaseCommand
+
+from login_app.resume_store import prune
+
+
+class Command(BaseCommand):
+    help = "Deletes stored resume documents that haven't been uploaded for a while."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Age limit in days (default: RESUME_STORE['MAX_AGE_DAYS']).")
+
+    def handle(self, *args, **options):
+        deleted = prune(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} resume document(s)."))
@@ -0,0 +1,29 @@
+# login_app/management/commands/run_crew_workers.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from login_app.jobs import WorkerPool, get_config
+
+
+class Command(BaseCommand):
+    help = "Runs background workers for queued resume enhancement (crew) jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Number of worker threads (default: CREW_JOBS['WORKERS']).")
+
+    def handle(self, *args, **options):
+        config = get_config()
+        pool = WorkerPool(
+            workers=options['workers'] or config['WORKERS'],
+            poll_interval=config['POLL_INTERVAL'],
+        )
+        pool.start()
+        self.stdout.write(self.style.SUCCESS(f"Started {pool.workers} crew worker(s). Press Ctrl+C to stop."))
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers...")
+            pool.stop(timeout=5)
@@ -0,0 +1,58 @@
+# login_app/management/commands/screen_resumes.py
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from login_app.bulk_screening import BulkScreeningError, collect_directory_pdfs, screen_resumes, write_csv
+
+
+class Command(BaseCommand):
+    help = "Ranks every PDF resume in a directory (and zip files in it) against one job description and writes a CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help="Directory containing PDF resumes and/or zip files of PDFs.")
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument('--jd', help="Job description text.")
+        group.add_argument('--jd-file', help="File containing the job description.")
+        parser.add_argument('--top', type=int, default=None, help="Candidates that get an AI HR review (default: BULK_SCREENING['TOP_N']).")
+        parser.add_argument('--no-review', action='store_true', help="Only score locally; don't call the AI.")
+        parser.add_argument('--processes', type=int, default=None, help="PDF extraction processes (default: BULK_SCREENING['PROCESSES']).")
+        parser.add_argument('--output', '-o', help="CSV file to write (default: standard output).")
+        parser.add_argument('--refresh', action='store_true', help="Ignore cached AI responses.")
+
+    def handle(self, *args, **options):
+        if options['jd_file']:
+            with open(options['jd_file'], encoding='utf-8') as f:
+                job_description = f.read()
+        else:
+            job_description = options['jd']
+
+        try:
+            items = collect_directory_pdfs(options['directory'])
+        except (BulkScreeningError, OSError) as e:
+            raise CommandError(str(e))
+        if not items:
+            raise CommandError(f"No PDF files found in {options['directory']}.")
+
+        result = screen_resumes(
+            items,
+            job_description,
+            top_n=options['top'],
+            use_cache=not options['refresh'],
+            hr_review=not options['no_review'],
+            processes=options['processes'],
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as f:
+                write_csv(result, f)
+        else:
+            write_csv(result, sys.stdout)
+
+        timings = result.timings
+        self.stderr.write(self.style.SUCCESS(
+            f"Screened {len(items)} resumes: {result.resumes_per_second:.1f} resumes/s "
+            f"(extract {timings['extract']:.2f}s, score {timings['score']:.3f}s, "
+            f"AI reviews {timings['review']:.2f}s, total {timings['total']:.2f}s)."
+        ))
@@ -0,0 +1,22 @@
+# login_app/management/commands/warmup.py
+
+from django.core.management.base import BaseCommand
+
+from login_app import llm_client
+from login_app.preload import preload
+
+
+class Command(BaseCommand):
+    help = "Imports the AI libraries and builds the shared LLM clients, chains and crews, reporting the time each step takes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connect', action='store_true', help="Also open a pooled connection to the LLM API.")
+
+    def handle(self, *args, **options):
+        steps = preload()
+        for step in steps:
+            line = f"{step.name:<10} {step.seconds * 1000:8.1f} ms"
+            self.stdout.write(line if step.error is None else self.style.WARNING(f"{line}  failed: {step.error}"))
+        if options['connect']:
+            llm_client.warm_up()
+        self.stdout.write(self.style.SUCCESS(f"Preloaded in {sum(step.seconds for step in steps):.2f}s."))
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('login_app', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobDescription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('text', models.TextField()),
+                ('content_hash', models.CharField(max_length=64)),
+                ('keywords', models.JSONField(blank=True, default=list)),
+                ('required_skills', models.JSONField(blank=True, default=list)),
+                ('brief', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_descriptions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-updated_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='crewjob',
+            name='job_description',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='crew_jobs', to='login_app.jobdescription'),
+        ),
+        migrations.AddConstraint(
+            model_name='jobdescription',
+            constraint=models.UniqueConstraint(fields=('user', 'content_hash'), name='unique_job_description_per_user'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Expression indexes on auth_user for the prefix search in login_app/user_admin.py.
+# The User model belongs to django.contrib.auth, so they are added through the
+# schema editor instead of a Meta.indexes entry.
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+INDEXES = (
+    models.Index(Lower('username'), name='user_username_lower_idx'),
+    models.Index(Lower('email'), name='user_email_lower_idx'),
+)
+
+
+def _user_model(apps):
+    return apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+
+def add_indexes(apps, schema_editor):
+    for index in INDEXES:
+        schema_editor.add_index(_user_model(apps), index)
+
+
+def remove_indexes(apps, schema_editor):
+    for index in INDEXES:
+        schema_editor.remove_index(_user_model(apps), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('login_app', '0003_resume_documents'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(add_indexes, remove_indexes),
+    ]
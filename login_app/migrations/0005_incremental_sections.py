@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('login_app', '0004_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crewjob',
+            name='incremental_from',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='login_app.crewjob'),
+        ),
+        migrations.AddField(
+            model_name='crewjob',
+            name='rerun_sections',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='crewjob',
+            name='result_sections',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='resumedocument',
+            name='fingerprints',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
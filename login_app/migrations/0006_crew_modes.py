@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('login_app', '0005_incremental_sections'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crewjob',
+            name='completion_tokens',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='crewjob',
+            name='mode',
+            field=models.CharField(choices=[('full', 'Thorough: three agents, one after another'), ('parallel', 'Balanced: parallel analysis, then one rewrite'), ('fast', 'Quick: a single pass')], default='full', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='crewjob',
+            name='prompt_tokens',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,160 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils import timezone
+
+
+class JobDescription(models.Model):
+    """
+    A job description saved once and reused with many resumes. Its keyword
+    weights and required skills are computed when it is saved (see
+    login_app/job_profiles.py), and a short LLM-written requirements brief
+    replaces the full text in prompts once it has been generated.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_descriptions')
+    title = models.CharField(max_length=200)
+    text = models.TextField()
+    # SHA-256 of the normalized text, so pasting the same JD again reuses the row.
+    content_hash = models.CharField(max_length=64)
+
+    # [[term, weight], ...] from ats_scoring.profile_keywords, heaviest first
+    keywords = models.JSONField(default=list, blank=True)
+    required_skills = models.JSONField(default=list, blank=True)
+    brief = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-updated_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'content_hash'], name='unique_job_description_per_user'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class ResumeDocument(models.Model):
+    """
+    A resume PDF parsed by the section enhancer: its text, headings, section
+    boundaries and context summary. Stored once per distinct file (keyed by
+    the SHA-256 of the PDF bytes) and shared by every user who uploads it; the
+    session only keeps the hash (see login_app/resume_store.py).
+    """
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    text = models.TextField()
+    headings = models.JSONField(default=list)
+    # [[heading, start, end], ...] offsets into text
+    sections = models.JSONField(default=list)
+    context = models.TextField(blank=True)
+    # [[heading, fingerprint], ...] from incremental.section_fingerprints
+    fingerprints = models.JSONField(default=list, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on each upload of the same file; documents unused for long are pruned.
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return self.content_hash[:12]
+
+
+class CrewJob(models.Model):
+    """
+    A resume enhancement crew run, queued by resume_enhancer_view and
+    executed by the background workers in login_app/jobs.py.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_CANCELLED, 'Cancelled'),
+    ]
+    FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+    # Pipelines from agents.CREW_MODES
+    MODE_CHOICES = [
+        ('full', 'Thorough: three agents, one after another'),
+        ('parallel', 'Balanced: parallel analysis, then one rewrite'),
+        ('fast', 'Quick: a single pass'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='crew_jobs')
+    resume_text = models.TextField()
+    job_description_text = models.TextField()
+    # Set when the JD was chosen from (or saved as) a JobDescription; the crew then uses its brief.
+    job_description = models.ForeignKey(
+        JobDescription, on_delete=models.SET_NULL, null=True, blank=True, related_name='crew_jobs'
+    )
+    use_cache = models.BooleanField(default=True)
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default='full')
+    # From the submitted form; a repeated submission finds this job instead of queuing another.
+    idempotency_key = models.CharField(max_length=64, blank=True)
+
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    stage = models.CharField(max_length=20, blank=True)
+    result = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    # [[heading, input fingerprint, output text], ...] so a later run on an
+    # edited resume can reuse the unchanged sections (see login_app/incremental.py).
+    result_sections = models.JSONField(default=list, blank=True)
+    # Set when this run reused incremental_from and only rewrote rerun_sections.
+    incremental_from = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    rerun_sections = models.JSONField(default=list, blank=True)
+    # Reported by the pipeline; estimates for steps that call the model directly.
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    # Retries are scheduled by pushing available_at into the future.
+    available_at = models.DateTimeField(default=timezone.now)
+    # A running job whose lease has expired is picked up again (e.g. after a restart).
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    # Set when the last page following the job's progress was closed; the
+    # worker cancels the run if nobody comes back (CREW_JOBS['ABANDON_AFTER']).
+    abandoned_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'idempotency_key'], condition=~models.Q(idempotency_key=''),
+                name='unique_crew_job_idempotency_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    @property
+    def seconds(self):
+        """How long the last attempt ran, or None before it has finished."""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
@@ -0,0 +1,264 @@
+# login_app/pdf_extract.py
+
+# Single PDF text extraction path for every view.
+# PDFs are opened straight from the uploaded bytes (no tempfile), read in one
+# pass, and results are cached by a hash of the file contents, so the same
+# resume uploaded to the ATS scanner and then the section enhancer is only
+# parsed once. Pages aren't extracted in threads: PyMuPDF holds the GIL, so
+# that was slower than one pass. Batches of PDFs are spread over processes
+# instead (see text_or_error and bulk_screening).
+
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+
+from .llm_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MAX_BYTES': 10 * 1024 * 1024,  # larger uploads are rejected before parsing
+    'MAX_PAGES': 30,                # pages after this are ignored
+    'CACHE_MAX_ENTRIES': 64,
+    'CACHE_MAX_BYTES': 8 * 1024 * 1024,
+    'CACHE_TTL': 60 * 60,
+}
+
+
+def get_config():
+    """Returns the PDF_EXTRACT settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'PDF_EXTRACT', {})}
+
+
+# One text line with the font metadata heading detection needs.
+Line = namedtuple('Line', ['page', 'text', 'size', 'bold'])
+
+_BOLD_FLAG = 16
+
+
+class PDFExtractionError(ValueError):
+    """Raised for uploads that are too large or can't be read as a PDF."""
+
+
+def read_upload(uploaded_file) -> bytes:
+    """
+    Reads an uploaded file into memory, enforcing the size limit.
+
+    Args:
+        uploaded_file: An UploadedFile from request.FILES.
+
+    Returns:
+        bytes: The file contents.
+
+    Raises:
+        FileNotFoundError: If no file is provided.
+        PDFExtractionError: If the file is larger than MAX_BYTES.
+    """
+    if not uploaded_file:
+        raise FileNotFoundError("No file uploaded")
+    max_bytes = get_config()['MAX_BYTES']
+    if uploaded_file.size is not None and uploaded_file.size > max_bytes:
+        raise PDFExtractionError(f"The PDF is larger than {max_bytes // (1024 * 1024)} MB.")
+    uploaded_file.seek(0)
+    return b"".join(uploaded_file.chunks())
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _open(data):
+    import fitz  # PyMuPDF, imported on first use (see login_app/preload.py)
+
+    try:
+        return fitz.open(stream=data, filetype="pdf")
+    except Exception as e:
+        raise PDFExtractionError(f"Could not read the PDF: {e}") from e
+
+
+def _span_is_bold(span):
+    return bool(span['flags'] & _BOLD_FLAG) or 'bold' in span['font'].lower()
+
+
+def _page_lines(page):
+    lines = []
+    for block in page.get_text('dict')['blocks']:
+        if block['type'] != 0:
+            continue
+        for line in block['lines']:
+            spans = [span for span in line['spans'] if span['text'].strip()]
+            if not spans:
+                continue
+            text = " ".join("".join(span['text'] for span in line['spans']).split())
+            lines.append(Line(
+                page=page.number,
+                text=text,
+                size=round(max(span['size'] for span in spans), 1),
+                bold=all(_span_is_bold(span) for span in spans),
+            ))
+    return lines
+
+
+def text_from_bytes(data, max_pages):
+    """
+    Extracts the text of the first max_pages pages without touching settings
+    or the cache, so it can run in a worker process (see bulk_screening).
+    """
+    doc = _open(data)
+    try:
+        return "".join(doc[number].get_text() for number in range(min(doc.page_count, max_pages))).strip()
+    finally:
+        doc.close()
+
+
+def text_or_error(data, max_pages, max_bytes):
+    """
+    Like text_from_bytes, but returns (text, None) or (None, error message)
+    instead of raising, for batch extraction.
+    """
+    if len(data) > max_bytes:
+        return None, f"The PDF is larger than {max_bytes // (1024 * 1024)} MB."
+    try:
+        return text_from_bytes(data, max_pages), None
+    except PDFExtractionError as e:
+        return None, str(e)
+
+
+class PDFExtractor:
+    """
+    Extracts page text from PDF bytes, with an in-process cache keyed by content hash.
+    """
+
+    def __init__(self, config=None):
+        config = config or get_config()
+        self.max_bytes = config['MAX_BYTES']
+        self.max_pages = config['MAX_PAGES']
+        self.cache = LRUCache(
+            max_entries=config['CACHE_MAX_ENTRIES'],
+            max_bytes=config['CACHE_MAX_BYTES'],
+            ttl=config['CACHE_TTL'],
+        )
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'truncated': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def pages(self, data: bytes) -> tuple:
+        """
+        Returns the text of each page (up to MAX_PAGES).
+
+        Args:
+            data (bytes): The PDF file contents.
+
+        Returns:
+            tuple[str]: One string per page.
+
+        Raises:
+            PDFExtractionError: If the data is too large or not a readable PDF.
+        """
+        if len(data) > self.max_bytes:
+            raise PDFExtractionError(f"The PDF is larger than {self.max_bytes // (1024 * 1024)} MB.")
+
+        key = content_hash(data)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count('hits')
+            return cached
+        self._count('misses')
+
+        doc = _open(data)
+        try:
+            page_count = doc.page_count
+            if page_count > self.max_pages:
+                logger.info("PDF has %d pages, extracting the first %d", page_count, self.max_pages)
+                self._count('truncated')
+                page_count = self.max_pages
+            pages = tuple(doc[number].get_text() for number in range(page_count))
+        finally:
+            doc.close()
+
+        self.cache.set(key, pages)
+        return pages
+
+    def lines(self, data: bytes) -> tuple:
+        """
+        Returns every non-empty text line (up to MAX_PAGES) with its font size and weight.
+
+        Args:
+            data (bytes): The PDF file contents.
+
+        Returns:
+            tuple[Line]: Lines in reading order.
+        """
+        if len(data) > self.max_bytes:
+            raise PDFExtractionError(f"The PDF is larger than {self.max_bytes // (1024 * 1024)} MB.")
+
+        key = 'lines:' + content_hash(data)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._count('hits')
+            return cached
+        self._count('misses')
+
+        pages_key = content_hash(data)
+        doc = _open(data)
+        try:
+            page_count = min(doc.page_count, self.max_pages)
+            lines = tuple(line for number in range(page_count) for line in _page_lines(doc[number]))
+            # Also read the page text while the document is open, so a later pages() call
+            # doesn't reopen the file. It must come from get_text(), like in pages(): the
+            # lines' text has its spacing collapsed.
+            if pages_key not in self.cache:
+                self.cache.set(pages_key, tuple(doc[number].get_text() for number in range(page_count)))
+        finally:
+            doc.close()
+        self.cache.set(key, lines)
+        return lines
+
+    def text(self, data: bytes) -> str:
+        """Returns the text of the whole document (up to MAX_PAGES)."""
+        return "".join(self.pages(data)).strip()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters['cached_documents'] = len(self.cache)
+        return counters
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor() -> PDFExtractor:
+    """Returns the process-wide PDF extractor."""
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = PDFExtractor()
+    return _extractor
+
+
+def extract_pages(data: bytes) -> tuple:
+    """Shortcut for get_extractor().pages(data)."""
+    return get_extractor().pages(data)
+
+
+def extract_lines(data: bytes) -> tuple:
+    """Shortcut for get_extractor().lines(data)."""
+    return get_extractor().lines(data)
+
+
+def extract_text(data: bytes) -> str:
+    """Shortcut for get_extractor().text(data)."""
+    return get_extractor().text(data)
+
+
+def stats():
+    return get_extractor().stats()
@@ -0,0 +1,94 @@
+# login_app/preload.py
+
+# The AI libraries (crewAI, LangChain, the Groq SDK, PyMuPDF) are imported on
+# first use instead of when Django loads the views, so management commands,
+# tests and workers that never call a model start in a fraction of a second
+# and without hundreds of MB of modules. Production web workers can pay that
+# cost up front instead: with PRELOAD['ENABLED'] every library is imported and
+# the shared clients, chains and crew templates are built when the app starts,
+# so the first user request isn't the one that waits. Run
+# `python manage.py warmup` to see what each step costs.
+
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    # Preload in a thread so startup isn't delayed; leave False with a preforking
+    # server (e.g. gunicorn --preload) so the master loads everything before forking.
+    'BACKGROUND': False,
+}
+
+
+def get_config():
+    """Returns the PRELOAD settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'PRELOAD', {})}
+
+
+def _pymupdf():
+    import fitz  # noqa: F401
+
+
+def _groq():
+    from . import llm_client
+
+    llm_client.get_client()
+
+
+def _langchain():
+    from . import section
+
+    section.get_headings_chain()
+    section.get_enhance_chain()
+    section.get_enhance_slice_chain()
+
+
+def _crewai():
+    from . import agents
+
+    agents.get_crew_template("full")
+    agents.get_crew_template("analysis")
+    agents.get_editor_task()
+
+
+STEPS = (
+    ('pymupdf', _pymupdf),
+    ('groq', _groq),
+    ('langchain', _langchain),
+    ('crewai', _crewai),
+)
+
+# error is None when the step succeeded
+PreloadStep = namedtuple('PreloadStep', ['name', 'seconds', 'error'])
+
+
+def preload():
+    """
+    Imports the AI libraries and builds the shared LLM objects. A failing step
+    (e.g. no GROQ_API_KEY for the crew) is logged and the rest still run.
+
+    Returns:
+        list[PreloadStep]: How long each step took.
+    """
+    results = []
+    for name, step in STEPS:
+        started = time.perf_counter()
+        error = None
+        try:
+            step()
+        except Exception as e:
+            logger.warning("Preloading %s failed: %s", name, e)
+            error = str(e)
+        results.append(PreloadStep(name, time.perf_counter() - started, error))
+    logger.info("Preloaded AI libraries in %.2fs", sum(result.seconds for result in results))
+    return results
+
+
+def preload_in_background():
+    threading.Thread(target=preload, name='ai-preload', daemon=True).start()
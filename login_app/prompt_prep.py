@@ -0,0 +1,163 @@
+# login_app/prompt_prep.py
+
+# Prompt preparation shared by every LLM entry point (ats_service, section,
+# agents, job_profiles). Text extracted from PDFs still carries layout
+# artifacts: runs of spaces, words hyphenated across line breaks, page
+# numbers, running headers and footers, and lines printed twice. compact()
+# removes them, and prepare_text() then makes the text fit the model's input
+# budget (PROMPT_BUDGETS), cutting at line boundaries and keeping the start
+# and the end of the document. Token counts before and after are logged and
+# added to the tokens.py savings counters.
+
+import logging
+import re
+import unicodedata
+from collections import Counter, namedtuple
+
+from django.conf import settings
+
+from .tokens import estimate_tokens, record_saving
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'DEFAULT_INPUT_TOKENS': 6000,
+    # Input tokens allowed per model, below its context window to leave room for the answer.
+    'MODEL_INPUT_TOKENS': {},
+    'TAIL_SHARE': 0.25,             # share of a truncated text kept from its end (skills, education)
+    'EDGE_LINES': 3,                # lines at the top (bottom) of the document that can be a running header (footer)
+}
+
+TRUNCATION_MARKER = "[... {lines} lines omitted to fit the model's input limit ...]"
+
+_HYPHENATION_RE = re.compile(r"(\w)-\n(?=[a-z])")
+_PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$", re.IGNORECASE)
+_BULLETS = "•●▪■◦‣∙·"
+
+# text is what to send; tokens_before/tokens_after are estimates around compaction and truncation.
+PreparedText = namedtuple('PreparedText', ['text', 'tokens_before', 'tokens_after', 'truncated'])
+
+
+def get_config():
+    """Returns the PROMPT_BUDGETS settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'PROMPT_BUDGETS', {})}
+
+
+def input_budget(model):
+    """Returns the input token budget for model (Groq's name, with or without LiteLLM's 'groq/' prefix)."""
+    config = get_config()
+    return config['MODEL_INPUT_TOKENS'].get(model.removeprefix('groq/'), config['DEFAULT_INPUT_TOKENS'])
+
+
+def _normalize_line(line):
+    line = " ".join(line.split())
+    if line and line[0] in _BULLETS:
+        line = "- " + line[1:].lstrip()
+    return line
+
+
+def compact(text):
+    """
+    Removes PDF extraction artifacts from text without changing its wording:
+    normalizes Unicode and whitespace, joins words hyphenated across line
+    breaks, and drops page numbers, consecutive duplicate lines and the
+    repeats of running headers and footers (lines at the very top or bottom
+    of the document that also appear elsewhere). Other repeated lines, such
+    as the same bullet under two jobs, are kept.
+
+    Returns:
+        str: The compacted text.
+    """
+    if not text:
+        return ""
+    config = get_config()
+    text = unicodedata.normalize('NFKC', text).replace('\u00ad', '')  # soft hyphens
+    text = _HYPHENATION_RE.sub(r"\1", text)
+    lines = [_normalize_line(line) for line in text.splitlines()]
+
+    # Running headers repeat the top of the first page (name, contact line) on later pages,
+    # and running footers end every page, the last one included.
+    non_blank = [line for line in lines if line and not _PAGE_NUMBER_RE.match(line)]
+    counts = Counter(non_blank)
+    edges = non_blank[:config['EDGE_LINES']] + non_blank[-config['EDGE_LINES']:]
+    running = {line for line in edges if counts[line] > 1}
+
+    kept = []
+    seen = set()
+    for line in lines:
+        if not line:
+            if kept and kept[-1]:
+                kept.append("")
+            continue
+        if _PAGE_NUMBER_RE.match(line):
+            continue
+        if kept and line == kept[-1]:
+            continue
+        if line in running and line in seen:
+            continue
+        seen.add(line)
+        kept.append(line)
+    return "\n".join(kept).strip()
+
+
+def truncate(text, max_tokens):
+    """
+    Shortens text to about max_tokens, cutting at line boundaries. The start
+    of the text and its last TAIL_SHARE are kept, with a marker where lines
+    were left out.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lines = text.splitlines()
+    marker_tokens = estimate_tokens(TRUNCATION_MARKER.format(lines=len(lines)))
+    available = max(max_tokens - marker_tokens, 0)
+    tail_budget = int(available * get_config()['TAIL_SHARE'])
+    head_budget = available - tail_budget
+
+    head, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > head_budget:
+            break
+        head.append(line)
+        used += cost
+    tail, used = [], 0
+    for line in reversed(lines[len(head):]):
+        cost = estimate_tokens(line) + 1
+        if used + cost > tail_budget:
+            break
+        tail.append(line)
+        used += cost
+    tail.reverse()
+
+    if not head and not tail:
+        # A single huge line: fall back to a character cut.
+        return text[:max_tokens * 4].rsplit(" ", 1)[0]
+    omitted = len(lines) - len(head) - len(tail)
+    return "\n".join(head + [TRUNCATION_MARKER.format(lines=omitted)] + tail)
+
+
+def prepare_text(text, model, endpoint, reserve_tokens=0):
+    """
+    Compacts text and fits it into model's input budget, less reserve_tokens
+    for the rest of the prompt. Logs and records the tokens saved.
+
+    Args:
+        text (str): Resume or job description text.
+        model (str): The model the prompt is for (selects the budget).
+        endpoint (str): Which feature is calling, for the token counters.
+        reserve_tokens (int): Tokens the other parts of the prompt will use.
+
+    Returns:
+        PreparedText
+    """
+    tokens_before = estimate_tokens(text)
+    prepared = compact(text)
+    budget = max(input_budget(model) - reserve_tokens, 0)
+    truncated = estimate_tokens(prepared) > budget
+    if truncated:
+        prepared = truncate(prepared, budget)
+        logger.warning("%s: input truncated to fit the %d-token budget of %s", endpoint, budget, model)
+    tokens_after = estimate_tokens(prepared)
+    record_saving(endpoint, tokens_before, tokens_after)
+    return PreparedText(prepared, tokens_before, tokens_after, truncated)
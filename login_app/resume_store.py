@@ -0,0 +1,126 @@
+# login_app/resume_store.py
+
+# Content-addressed storage for resumes uploaded to the section enhancer.
+# A parsed resume (text, headings, section boundaries, context summary) is
+# saved once as a ResumeDocument keyed by the SHA-256 of the PDF bytes and
+# shared by every user who uploads the same file; the session only holds that
+# hash. Uploading a known file skips parsing and heading detection entirely,
+# and recently read documents are kept in an in-process LRU cache so a page
+# view doesn't have to load the resume from the database.
+
+import logging
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from .incremental import section_fingerprints
+from .llm_cache import LRUCache
+from .models import ResumeDocument
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'CACHE_MAX_ENTRIES': 128,
+    'CACHE_MAX_BYTES': 8 * 1024 * 1024,
+    'CACHE_TTL': 60 * 60,
+    'MAX_AGE_DAYS': 30,  # documents not uploaded again for this long are pruned
+}
+
+# Session key holding the content hash of the user's current resume
+SESSION_KEY = 'resume_document'
+
+
+def get_config():
+    """Returns the RESUME_STORE settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'RESUME_STORE', {})}
+
+
+# What the section enhancer needs from a stored resume. sections holds
+# [heading, start, end] lists, as accepted by prepare_section_request;
+# fingerprints is from incremental.section_fingerprints.
+ResumeData = namedtuple('ResumeData', ['content_hash', 'text', 'headings', 'sections', 'context', 'fingerprints'])
+
+_cache = None
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        config = get_config()
+        _cache = LRUCache(config['CACHE_MAX_ENTRIES'], config['CACHE_MAX_BYTES'], config['CACHE_TTL'])
+    return _cache
+
+
+def _data(document):
+    return ResumeData(
+        document.content_hash, document.text, document.headings, document.sections, document.context, document.fingerprints,
+    )
+
+
+async def aget_document(content_hash):
+    """
+    Returns the ResumeData stored under content_hash, or None if there is
+    none (no upload yet, or the document has been pruned).
+    """
+    if not content_hash:
+        return None
+    data = _get_cache().get(content_hash)
+    if data is None:
+        document = await ResumeDocument.objects.filter(content_hash=content_hash).afirst()
+        if document is None:
+            return None
+        data = _data(document)
+        _get_cache().set(content_hash, data)
+    return data
+
+
+async def atouch_document(content_hash):
+    """
+    Returns the stored ResumeData for an uploaded file's hash, marking the
+    document as recently used, or None if this file hasn't been seen before.
+    """
+    updated = await ResumeDocument.objects.filter(content_hash=content_hash).aupdate(last_used_at=timezone.now())
+    return await aget_document(content_hash) if updated else None
+
+
+async def asave_document(content_hash, text, headings, sections, context):
+    """
+    Stores a parsed resume under content_hash and returns its ResumeData.
+
+    Args:
+        content_hash (str): SHA-256 of the PDF bytes (pdf_extract.content_hash).
+        text (str): The resume text.
+        headings (list): Section headings, in resume order.
+        sections (list): [heading, start, end] boundaries into text.
+        context (str): The summary from build_resume_context.
+
+    Returns:
+        ResumeData
+    """
+    sections = [list(section) for section in sections]
+    try:
+        document = await ResumeDocument.objects.acreate(
+            content_hash=content_hash, text=text, headings=headings, sections=sections, context=context,
+            fingerprints=section_fingerprints(text, sections),
+        )
+    except IntegrityError:
+        # The same file was uploaded by someone else in the meantime; theirs is identical.
+        document = await ResumeDocument.objects.aget(content_hash=content_hash)
+    data = _data(document)
+    _get_cache().set(content_hash, data)
+    return data
+
+
+def prune(max_age_days=None):
+    """Deletes documents not uploaded for max_age_days (MAX_AGE_DAYS by default); returns how many."""
+    if max_age_days is None:
+        max_age_days = get_config()['MAX_AGE_DAYS']
+    cutoff = timezone.now() - timedelta(days=max_age_days)
+    deleted, _ = ResumeDocument.objects.filter(last_used_at__lt=cutoff).delete()
+    if deleted:
+        _get_cache().clear()
+        logger.info("Pruned %d resume documents unused since %s", deleted, cutoff.date())
+    return deleted
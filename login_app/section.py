@@ -1,65 +1,277 @@
 # section.py (updated to be a module with functions)
 
-from langchain_core.output_parsers import StrOutputParser
-from langchain_groq import ChatGroq
-from langchain_core.prompts import PromptTemplate
-from langchain_community.document_loaders import PyPDFLoader
+import asyncio
+from collections import namedtuple
+
 from dotenv import load_dotenv
 
+from . import llm_client, llm_router
+from .headings import HeadingResult, Section, clean_heading, detect_headings, get_config as get_headings_config, split_sections
+from .instrumentation import llm_call, timed
+from .llm_cache import cached_llm_call, get_cache
+from .llm_executor import run_llm
+from .llm_registry import get_or_build
+from .llm_scheduler import get_scheduler
+from .pdf_extract import extract_lines
+from .prompt_prep import compact, input_budget, prepare_text, truncate
+from .tokens import estimate_tokens
+
 load_dotenv() # Load environment variables, including GROQ_API_KEY if used here
 
-def get_headings_from_pdf(pdf_file_path):
+# llm_router tasks; the models are set in LLM_ROUTER['TASKS']
+HEADINGS_TASK = 'section_headings'
+ENHANCE_TASK = 'section_enhance'
+
+ENHANCE_SECTION_TEMPLATE = (
+    "You are an expert resume editor. The resume content is given below:\n\n"
+    "{content}\n\n"
+    "The user wants to enhance only the **{text}** section of the resume.\n"
+    "Your task:\n"
+    "- Rewrite only the {text} section to make it more professional, concise, and well-structured.\n"
+    "- Do NOT include any other part of the resume.\n"
+    "- Do NOT explain your edits or list what you changed.\n"
+    "- ONLY return the updated version of the {text} section as plain text.\n\n"
+    "Begin:"
+)
+
+# Used when the selected section can be sliced out: only that section and a
+# short summary of the rest of the resume are sent.
+ENHANCE_SLICE_TEMPLATE = (
+    "You are an expert resume editor. Background on the candidate, for context only:\n\n"
+    "{context}\n\n"
+    "The current **{text}** section of their resume is given below:\n\n"
+    "{content}\n\n"
+    "Your task:\n"
+    "- Rewrite this {text} section to make it more professional, concise, and well-structured.\n"
+    "- Do NOT include any other part of the resume.\n"
+    "- Do NOT explain your edits or list what you changed.\n"
+    "- ONLY return the updated version of the {text} section as plain text.\n\n"
+    "Begin:"
+)
+
+# Upper bound for the context summary sent with a section
+CONTEXT_MAX_CHARS = 600
+
+HEADINGS_TEMPLATE = (
+    "Analyze the entire PDF document text below:\n\n"
+    "{text}\n\n"
+    "Return only the **headings** present in the document, "
+    "excluding the applicant's name. Format them as a comma-separated list, e.g., 'Summary, Experience, Education'."
+)
+
+def _build_chain(template, input_variables, model):
+    # LangChain is imported on first use (or by login_app/preload.py), not when views are loaded.
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+
+    prompt = PromptTemplate(template=template, input_variables=input_variables)
+    return prompt | llm_client.chat_model(model) | StrOutputParser()
+
+def get_headings_chain(model=None):
+    """Returns the shared headings chain (prompt | ChatGroq | parser) for model, built once per process."""
+    model = model or llm_router.choose_route(HEADINGS_TASK).model
+    return get_or_build(("chain", "section_headings", model), lambda: _build_chain(HEADINGS_TEMPLATE, ["text"], model))
+
+def get_enhance_chain(model=None):
+    """Returns the shared section enhancement chain for model, built once per process."""
+    model = model or llm_router.choose_route(ENHANCE_TASK).model
+    return get_or_build(
+        ("chain", "enhance_section", model), lambda: _build_chain(ENHANCE_SECTION_TEMPLATE, ["content", "text"], model)
+    )
+
+def get_enhance_slice_chain(model=None):
+    """Returns the shared chain for enhancing a sliced-out section with model, built once per process."""
+    model = model or llm_router.choose_route(ENHANCE_TASK).model
+    return get_or_build(
+        ("chain", "enhance_section_slice", model),
+        lambda: _build_chain(ENHANCE_SLICE_TEMPLATE, ["context", "content", "text"], model),
+    )
+
+def _invoke_chain(get_chain, inputs, prompt):
+    # Returns call_model(model) for llm_router: the chain for that model, timed and scheduled
+    def call_model(model):
+        with llm_call(model):
+            return get_scheduler().call(model, lambda: get_chain(model).invoke(inputs), prompt)
+    return call_model
+
+@timed('headings')
+def get_resume_sections(pdf_data, previous_headings=None):
     """
-    Extracts headings from a PDF document.
-    Returns a tuple: (list of headings, full content of the PDF).
+    Finds the section headings of a PDF resume and where each section starts and ends.
+    Headings come from the PDF layout; the headings LLM call is only made when
+    the layout detector isn't confident (see headings.py). previous_headings,
+    from the user's previous upload, are reused instead when all of them are
+    still in the text, as they are for an edited version of the same resume.
+    Returns a HeadingResult.
     """
-    llm = ChatGroq(model="meta-llama/llama-4-maverick-17b-128e-instruct")
-    parser = StrOutputParser()
-
-    loader = PyPDFLoader(pdf_file_path)
-    document = loader.load()
-    
-    if not document:
-        return [], ""
-
-    doc_content = document[0].page_content
-
-    prompt = PromptTemplate(
-        template=(
-            "Analyze the entire PDF document text below:\n\n"
-            "{text}\n\n"
-            "Return only the **headings** present in the document, "
-            "excluding the applicant's name. Format them as a comma-separated list, e.g., 'Summary, Experience, Education'."
-        ),
-        input_variables=["text"]
+    result = detect_headings(extract_lines(pdf_data))
+    if not result.text or result.confidence >= get_headings_config()['MIN_CONFIDENCE']:
+        return result
+    if previous_headings:
+        sections = split_sections(result.text, previous_headings)
+        if len(sections) == len(previous_headings):
+            return HeadingResult(list(previous_headings), sections, result.text, result.confidence, 'previous')
+
+    route = llm_router.choose_route(HEADINGS_TASK, estimate_tokens(result.text) + estimate_tokens(HEADINGS_TEMPLATE))
+    prepared = prepare_text(result.text, route.model, 'section_headings', reserve_tokens=estimate_tokens(HEADINGS_TEMPLATE))
+    prompt = HEADINGS_TEMPLATE + prepared.text
+    headings_raw = llm_router.call(
+        HEADINGS_TASK, prompt, _invoke_chain(get_headings_chain, {"text": prepared.text}, prompt), route=route
     )
-    chain = prompt | llm | parser
-    headings_raw = chain.invoke({"text": doc_content})
-    headings = [h.strip().replace('*', '') for h in headings_raw.split(',') if h.strip()]
-    return headings, doc_content
+    headings = [clean_heading(h) for h in headings_raw.split(',') if clean_heading(h)]
+    return HeadingResult(headings, split_sections(result.text, headings), result.text, result.confidence, 'llm')
+
+def get_headings_from_pdf(pdf_data):
+    """
+    Extracts headings from a PDF document, given its bytes.
+    Returns a tuple: (list of headings, full content of the PDF).
+    """
+    result = get_resume_sections(pdf_data)
+    return result.headings, result.text
+
+def build_resume_context(full_resume_content, sections):
+    """
+    Builds the compact summary sent along with a single section: the lines
+    above the first heading (name, title), the list of sections and the start
+    of the summary/profile section. Computed once per upload and kept in the resume store.
+    """
+    sections = [Section(*section) for section in sections]
+    if not sections:
+        return ""
+    parts = []
+    preamble = full_resume_content[:sections[0].start].strip()
+    if preamble:
+        parts.append(" ".join(preamble.split()))
+    parts.append("Resume sections: " + ", ".join(section.heading for section in sections))
+    for section in sections:
+        if any(word in section.heading.lower() for word in ("summary", "profile", "objective", "about")):
+            body = full_resume_content[section.start:section.end].strip()[len(section.heading):]
+            parts.append("Summary: " + " ".join(body.split()))
+            break
+    context = "\n".join(parts)
+    return context if len(context) <= CONTEXT_MAX_CHARS else context[:CONTEXT_MAX_CHARS].rsplit(" ", 1)[0] + " ..."
+
+# What is sent to the model for one section. sliced is False when the section
+# couldn't be located and the whole resume is sent instead.
+SectionRequest = namedtuple(
+    'SectionRequest', ['heading', 'content', 'context', 'sliced', 'prompt', 'full_tokens', 'sent_tokens']
+)
 
-def get_enhanced_section(full_resume_content, selected_heading):
+def prepare_section_request(full_resume_content, selected_heading, sections=None, context=""):
+    """
+    Works out what to send for selected_heading: just that section plus the
+    context summary when the section boundaries are known, the whole resume otherwise.
+
+    Args:
+        full_resume_content (str): The resume text.
+        selected_heading (str): The heading the user picked.
+        sections (list): [heading, start, end] boundaries from get_resume_sections.
+        context (str): The summary from build_resume_context.
+
+    Returns:
+        SectionRequest
+    """
+    full_prompt = ENHANCE_SECTION_TEMPLATE.format(content=full_resume_content, text=selected_heading)
+    full_tokens = estimate_tokens(full_prompt)
+    model = llm_router.choose_route(ENHANCE_TASK, full_tokens).model
+    # Sections are sliced from the raw text (the offsets refer to it) and compacted afterwards.
+    budget = input_budget(model) - estimate_tokens(ENHANCE_SLICE_TEMPLATE) - estimate_tokens(context)
+
+    for section in sections or ():
+        section = Section(*section)
+        if section.heading == selected_heading:
+            content = truncate(compact(full_resume_content[section.start:section.end]), budget)
+            if content:
+                prompt = ENHANCE_SLICE_TEMPLATE.format(context=context, content=content, text=selected_heading)
+                return SectionRequest(selected_heading, content, context, True, prompt, full_tokens, estimate_tokens(prompt))
+
+    content = truncate(compact(full_resume_content), input_budget(model) - estimate_tokens(ENHANCE_SECTION_TEMPLATE))
+    prompt = ENHANCE_SECTION_TEMPLATE.format(content=content, text=selected_heading)
+    return SectionRequest(selected_heading, content, "", False, prompt, full_tokens, estimate_tokens(prompt))
+
+def _cache_args(section_request):
+    if section_request.sliced:
+        # Keyed on the section alone: editing another part of the resume (which may
+        # change the context summary) doesn't invalidate the unchanged sections.
+        return "enhance_section_slice", f"{section_request.heading}\n{section_request.content}"
+    return "enhance_section", f"{section_request.heading}\n{section_request.content}"
+
+@timed('section_enhance')
+def enhance_section(section_request, use_cache=True):
+    """
+    Sends a prepared SectionRequest to the model and returns the enhanced
+    section text, from the LLM cache when the same request was answered
+    before (unless use_cache is False).
+    """
+    if section_request.sliced:
+        get_chain = get_enhance_slice_chain
+        inputs = {"context": section_request.context, "content": section_request.content, "text": section_request.heading}
+    else:
+        get_chain = get_enhance_chain
+        inputs = {"content": section_request.content, "text": section_request.heading}
+    prompt_type, cache_text = _cache_args(section_request)
+    route = llm_router.choose_route(ENHANCE_TASK, section_request.sent_tokens)
+
+    def invoke():
+        return llm_router.call(
+            ENHANCE_TASK, section_request.prompt, _invoke_chain(get_chain, inputs, section_request.prompt), route=route
+        )
+
+    return cached_llm_call(route.model, prompt_type, cache_text, invoke, use_cache=use_cache)
+
+def get_enhanced_section(full_resume_content, selected_heading, use_cache=True, sections=None, context=""):
     """
     Enhances a specific section of the resume.
-    Returns the enhanced section text.
-    """
-    llm = ChatGroq(model="meta-llama/llama-4-maverick-17b-128e-instruct")
-    parser = StrOutputParser()
-
-    prompt1 = PromptTemplate(
-        template=(
-            "You are an expert resume editor. The resume content is given below:\n\n"
-            "{content}\n\n"
-            "The user wants to enhance only the **{text}** section of the resume.\n"
-            "Your task:\n"
-            "- Rewrite only the {text} section to make it more professional, concise, and well-structured.\n"
-            "- Do NOT include any other part of the resume.\n"
-            "- Do NOT explain your edits or list what you changed.\n"
-            "- ONLY return the updated version of the {text} section as plain text.\n\n"
-            "Begin:"
-        ),
-        input_variables=["content", "text"]
-    )
-    chain1 = prompt1 | llm | parser
-    enhanced_result = chain1.invoke({"content": full_resume_content, "text": selected_heading})
-    return enhanced_result
\ No newline at end of file
+    Returns the enhanced section text. Only the section itself is sent when
+    its boundaries are given (see prepare_section_request).
+    """
+    section_request = prepare_section_request(full_resume_content, selected_heading, sections, context)
+    return enhance_section(section_request, use_cache=use_cache)
+
+@timed('section_enhance')
+async def astream_enhanced_section(section_request, use_cache=True):
+    """
+    Streaming version of enhance_section: yields the enhanced section
+    piece by piece as the model produces it. Shares its cache entries.
+    """
+    prompt_type, cache_text = _cache_args(section_request)
+    route = llm_router.choose_route(ENHANCE_TASK, section_request.sent_tokens)
+    async for piece in get_cache().astream_or_compute(
+        route.model,
+        prompt_type,
+        cache_text,
+        lambda: llm_router.astream(ENHANCE_TASK, section_request.prompt, route=route),
+        use_cache=use_cache,
+    ):
+        yield piece
+
+# Executor endpoint for "Enhance all sections"; its ENDPOINT_LIMITS entry caps how many run at once.
+ENHANCE_ALL_ENDPOINT = 'section_enhance_all'
+
+async def aenhance_sections(section_requests, use_cache=True):
+    """
+    Enhances several sections concurrently and yields each result as soon as it is ready.
+    A failing section doesn't stop the others.
+
+    Args:
+        section_requests (list[SectionRequest]): One prepared request per section.
+        use_cache (bool): Set to False to bypass cached responses.
+
+    Yields:
+        tuple: (heading, enhanced text or None, error message or None), in completion order.
+    """
+    async def enhance(section_request):
+        try:
+            result = await run_llm(ENHANCE_ALL_ENDPOINT, enhance_section, section_request, use_cache=use_cache)
+            return section_request.heading, result, None
+        except Exception as e:
+            return section_request.heading, None, str(e)
+
+    tasks = [asyncio.create_task(enhance(section_request)) for section_request in section_requests]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # The client went away (or the caller stopped early): don't start the remaining sections.
+        for task in tasks:
+            task.cancel()
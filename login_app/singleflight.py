@@ -0,0 +1,231 @@
+# login_app/singleflight.py
+
+# In-flight request coalescing ("single flight"). When several requests need
+# the same LLM response at the same time (a double-clicked button, the same
+# ATS scan open in two tabs, everyone screening against the same popular job
+# description), only the first one calls the model; the rest wait for its
+# answer instead of sending identical requests of their own. llm_cache keys
+# its flights by the response cache key, so "the same" means same model,
+# prompt type and normalized prompt.
+#
+# Nothing is stored: a flight ends with its call, and a failure is raised in
+# every waiter. The cache then serves later requests. An async flight runs on
+# the event loop of the request that started it, outside any request's
+# deadline scope, and requests on other loops (under WSGI each request has
+# its own) wait for it there. It is cancelled once every waiter has gone
+# away. If the caller making a call is cancelled (or its loop shuts down),
+# the next waiter makes the call instead.
+
+import asyncio
+import threading
+
+from .deadlines import Cancelled, bind
+
+
+class _Call:
+    # A synchronous flight: followers block on done until the leader has finished.
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class _Flight:
+    # An async flight, run by a task on the leader's event loop. Followers can
+    # wait on other loops (under WSGI every request has its own), so they are
+    # woken with call_soon_threadsafe.
+    def __init__(self, key):
+        self.key = key
+        self.loop = None
+        self.task = None
+        self.pieces = []
+        self.finished = False
+        self.cancelled = False     # the leader's loop cancelled it while others waited
+        self.error = None
+        self.waiters = 0
+        self._lock = threading.Lock()
+        self._wakeups = []
+
+    def add(self, piece):
+        with self._lock:
+            self.pieces.append(piece)
+        self._wake()
+
+    def finish(self, error=None, cancelled=False):
+        with self._lock:
+            self.error, self.cancelled, self.finished = error, cancelled, True
+        self._wake()
+
+    def _wake(self):
+        with self._lock:
+            wakeups, self._wakeups = self._wakeups, []
+        for loop, future in wakeups:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                pass    # that waiter's loop has closed
+
+    async def changed(self, read):
+        """Returns once there are more than read pieces, or the flight has finished."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if read < len(self.pieces) or self.finished:
+                return
+            self._wakeups.append((loop, future))
+        await future
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class Group:
+    """
+    A set of in-flight calls keyed by what they compute. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._flights = {}
+        self._counters = {'calls': 0, 'shared': 0}
+
+    def do(self, key, fn):
+        """
+        Returns fn(), or the result of the identical call already running.
+
+        Args:
+            key (str): What the call computes; equal keys share one call.
+            fn (callable): Called with no arguments by the first caller only.
+                Its exception is raised in every caller.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                self._counters['calls' if leader else 'shared'] += 1
+            if leader:
+                break
+            call.done.wait()
+            if isinstance(call.error, Cancelled):
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _join(self, key, start):
+        # The flight for key, started on this loop with start(flight) if there is none
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight(key)
+            self._counters['calls' if leader else 'shared'] += 1
+            flight.waiters += 1
+        if leader:
+            flight.loop = asyncio.get_running_loop()
+            flight.task = asyncio.ensure_future(start(flight))
+            flight.task.add_done_callback(lambda _: self._end(flight))
+        return flight
+
+    def _end(self, flight):
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+
+    def _leave(self, flight):
+        with self._lock:
+            flight.waiters -= 1
+            abandoned = flight.waiters == 0 and not flight.finished
+        if abandoned:
+            # Nobody is waiting for the answer any more.
+            self._end(flight)
+            try:
+                flight.loop.call_soon_threadsafe(flight.task.cancel)
+            except RuntimeError:
+                pass    # the leader's loop has closed, which cancelled the task already
+
+    def _run(self, flight, pieces):
+        # Runs the flight's work in start(): pieces is an async iterator of its results.
+        async def run():
+            try:
+                with bind(None):
+                    async for piece in pieces:
+                        flight.add(piece)
+            except asyncio.CancelledError:
+                # Others may still be waiting, e.g. when the leader's loop shut down.
+                flight.finish(cancelled=True)
+                raise
+            except Exception as e:
+                flight.finish(error=e)
+            else:
+                flight.finish()
+            finally:
+                # Closes the upstream stream too when the flight was cancelled.
+                await pieces.aclose()
+        return run()
+
+    async def ado(self, key, afn):
+        """Async version of do(); afn returns an awaitable. Callers on any event loop share the call."""
+        async def result():
+            yield await afn()
+
+        while True:
+            flight = self._join(key, lambda flight: self._run(flight, result()))
+            try:
+                while not flight.finished:
+                    await flight.changed(0)
+                if flight.cancelled:
+                    continue    # run it again, as the leader of a new flight
+                if flight.error is not None:
+                    raise flight.error
+                return flight.pieces[0]
+            finally:
+                self._leave(flight)
+
+    async def astream(self, key, astream):
+        """
+        Streaming version of ado(): the pieces astream() yields are passed to
+        every caller as they arrive. A caller that joins late is first given
+        the pieces it missed.
+        """
+        read = 0
+        while True:
+            flight = self._join(key, lambda flight: self._run(flight, astream()))
+            try:
+                while True:
+                    while read < len(flight.pieces):
+                        yield flight.pieces[read]
+                        read += 1
+                    if flight.finished:
+                        break
+                    await flight.changed(read)
+                if flight.cancelled:
+                    if read == 0:
+                        continue
+                    raise Cancelled("The shared response was cancelled")
+                if flight.error is not None:
+                    raise flight.error
+                return
+            finally:
+                self._leave(flight)
+
+    def stats(self):
+        """Calls made, and calls answered by one already in flight."""
+        with self._lock:
+            return dict(self._counters)
@@ -0,0 +1,53 @@
+# login_app/streaming.py
+
+# Helpers for Server-Sent Events responses.
+# Streaming views send named events ('token', 'stage', 'error', 'done', ...)
+# with a JSON payload; static/js/stream.js reads them on the page.
+
+import asyncio
+import json
+import logging
+
+from django.http import StreamingHttpResponse
+
+from .deadlines import bind, current
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event: str, data=None) -> str:
+    """Formats one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data or {})}\n\n"
+
+
+def sse_response(events) -> StreamingHttpResponse:
+    """
+    Wraps an async iterator of (event, data) pairs in a text/event-stream response.
+
+    Args:
+        events: Async iterator yielding (event name, JSON-serialisable data).
+
+    The events are produced in the request's deadline scope, which is
+    cancelled if the client disconnects before the stream ends.
+
+    Returns:
+        StreamingHttpResponse: Sends each event as soon as it is produced.
+    """
+    scope = current()
+
+    async def body():
+        with bind(scope):
+            try:
+                async for event, data in events:
+                    yield sse_event(event, data)
+            except asyncio.CancelledError:
+                logger.info("Client disconnected from an event stream; cancelling its LLM work")
+                if scope is not None:
+                    scope.cancel()
+                raise
+
+    response = StreamingHttpResponse(body(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx and similar proxies from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
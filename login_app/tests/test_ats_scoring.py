@@ -0,0 +1,47 @@
+from django.test import SimpleTestCase
+
+from login_app.ats_scoring import format_report, normalize_terms, profile_keywords, required_skills, score_many, score_resume
+
+
+class ATSScoringTests(SimpleTestCase):
+    JOB = (
+        "We need a Python developer. You'll join a fast paced team. We are looking for someone with "
+        "Django and PostgreSQL experience. Ideal applicants know Docker."
+    )
+
+    def test_ranks_and_lists_keywords(self):
+        strong, weak = score_many(["Python developer: Django, PostgreSQL, Docker", "Java developer"], self.JOB)
+        self.assertGreater(strong.score, weak.score)
+        self.assertIn('Django', strong.matched)
+        self.assertIn('PostgreSQL', weak.missing)
+
+    def test_skill_synonyms_match(self):
+        score, = score_many(["Wrote services in python3 on nodejs"], "Python and Node.js developer")
+        self.assertIn('Python', score.matched)
+        self.assertIn('Node.js', score.matched)
+
+    def test_job_ad_filler_is_not_missing(self):
+        score, = score_many(["Java developer"], self.JOB)
+        for word in ('need', 'looking', 'join', 'ideal', 'applicant', 'experience', 'll', 'someone'):
+            self.assertNotIn(word, score.missing)
+
+    def test_precomputed_keywords_score_the_same(self):
+        resume = "Python developer: Django, PostgreSQL"
+        keywords = profile_keywords(self.JOB)
+        self.assertEqual(score_resume(resume, "", keywords=keywords), score_resume(resume, self.JOB))
+        self.assertEqual(set(required_skills(keywords)), {'Python', 'Django', 'PostgreSQL', 'Docker'})
+
+    def test_normalizes_phrases_and_plurals(self):
+        terms = normalize_terms("Built APIs in C++ and machine learning models")
+        self.assertIn('skill:c++', terms)
+        self.assertIn('model', terms)
+        self.assertNotIn('and', terms)
+
+    def test_empty_job_description(self):
+        self.assertEqual(score_many(["Python"], ""), [(0.0, [], [])])
+
+    def test_format_report(self):
+        report = format_report(score_resume("Python developer", "Python and Django developer"))
+        self.assertTrue(report.startswith("Percentage match: "))
+        self.assertIn("Missing keywords: Django", report)
+        self.assertIn("Matched keywords: Python", report)
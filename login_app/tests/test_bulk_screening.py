@@ -0,0 +1,104 @@
+import csv
+import io
+import os
+import tempfile
+import zipfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+
+from login_app.bulk_screening import (
+    CSV_COLUMNS, BulkScreeningError, collect_directory_pdfs, collect_uploaded_pdfs, screen_resumes, to_csv,
+)
+
+from .test_pdf_extract import make_pdf
+
+JOB = "Python developer with Django, PostgreSQL and Docker"
+
+
+def make_zip(files):
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w') as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return out.getvalue()
+
+
+class CollectPDFsTests(SimpleTestCase):
+    def test_reads_pdfs_and_zips(self):
+        archive = make_zip({
+            'resumes/b.pdf': b"%PDF b", 'notes.txt': b"notes", '__MACOSX/resumes/._b.pdf': b"junk", 'resumes/': b"",
+        })
+        items = collect_uploaded_pdfs([
+            SimpleUploadedFile('a.pdf', b"%PDF a"),
+            SimpleUploadedFile('batch.zip', archive),
+            SimpleUploadedFile('cover.docx', b"docx"),
+        ])
+        self.assertEqual(items, [('a.pdf', b"%PDF a"), ('b.pdf', b"%PDF b")])
+
+    @override_settings(BULK_SCREENING={'MAX_FILES': 2})
+    def test_file_limit(self):
+        with self.assertRaisesMessage(BulkScreeningError, "At most 2 resumes"):
+            collect_uploaded_pdfs([SimpleUploadedFile(f'{n}.pdf', b"%PDF") for n in range(3)])
+        with self.assertRaises(BulkScreeningError):
+            collect_uploaded_pdfs([SimpleUploadedFile('batch.zip', make_zip({f'{n}.pdf': b"%PDF" for n in range(3)}))])
+
+    @override_settings(BULK_SCREENING={'MAX_TOTAL_BYTES': 10})
+    def test_size_limit(self):
+        with self.assertRaises(BulkScreeningError):
+            collect_uploaded_pdfs([SimpleUploadedFile('a.pdf', b"x" * 6), SimpleUploadedFile('b.pdf', b"x" * 6)])
+        # Checked against the declared size before the member is inflated
+        with mock.patch('zipfile.ZipFile.read') as read, self.assertRaises(BulkScreeningError):
+            collect_uploaded_pdfs([SimpleUploadedFile('batch.zip', make_zip({'a.pdf': b"x" * 11}))])
+        read.assert_not_called()
+
+    def test_bad_zip(self):
+        with self.assertRaisesMessage(BulkScreeningError, "not a valid zip file"):
+            collect_uploaded_pdfs([SimpleUploadedFile('batch.zip', b"not a zip")])
+
+    def test_reads_directories(self):
+        with tempfile.TemporaryDirectory() as path:
+            os.makedirs(os.path.join(path, 'team'))
+            for name, data in [('a.pdf', b"%PDF a"), ('team/b.PDF', b"%PDF b"), ('readme.txt', b"text")]:
+                with open(os.path.join(path, name), 'wb') as f:
+                    f.write(data)
+            with open(os.path.join(path, 'more.zip'), 'wb') as f:
+                f.write(make_zip({'c.pdf': b"%PDF c"}))
+            items = collect_directory_pdfs(path)
+        self.assertEqual(sorted(items), [('a.pdf', b"%PDF a"), ('c.pdf', b"%PDF c"), (os.path.join('team', 'b.PDF'), b"%PDF b")])
+
+
+class ScreenResumesTests(SimpleTestCase):
+    def setUp(self):
+        self.items = [
+            ('weak.pdf', make_pdf(["Java developer"])),
+            ('strong.pdf', make_pdf(["Python developer: Django, PostgreSQL, Docker"])),
+            ('broken.pdf', b"not a pdf"),
+        ]
+
+    def test_ranks_without_llm(self):
+        with mock.patch('login_app.bulk_screening.generate_ats_evaluation') as review:
+            result = screen_resumes(self.items, JOB, hr_review=False)
+        review.assert_not_called()
+        self.assertEqual([(c.rank, c.name) for c in result.candidates], [(1, 'strong.pdf'), (2, 'weak.pdf'), (None, 'broken.pdf')])
+        self.assertGreater(result.candidates[0].score, result.candidates[1].score)
+        self.assertIsNone(result.candidates[2].score)
+        self.assertIn("Could not read the PDF", result.candidates[2].error)
+        self.assertEqual(set(result.timings), {'extract', 'score', 'review', 'total'})
+
+    def test_reviews_only_the_top_candidates(self):
+        with mock.patch('login_app.bulk_screening.generate_ats_evaluation', return_value="Strong fit") as review:
+            result = screen_resumes(self.items, JOB, top_n=1)
+        self.assertEqual(review.call_count, 1)
+        self.assertEqual([c.hr_review for c in result.candidates], ["Strong fit", "", ""])
+
+    def test_csv(self):
+        result = screen_resumes(self.items, JOB, hr_review=False)
+        rows = list(csv.reader(io.StringIO(to_csv(result))))
+        self.assertEqual(rows[0], CSV_COLUMNS)
+        self.assertEqual(rows[1][:2], ['1', 'strong.pdf'])
+        self.assertIn('Django', rows[1][4])
+        self.assertIn('Django', rows[2][3])
+        self.assertEqual(rows[3][:3], ['', 'broken.pdf', ''])
+        self.assertTrue(rows[3][6])
@@ -0,0 +1,90 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from login_app import ats_service, deadlines
+
+
+class DeadlineTests(SimpleTestCase):
+    def test_child_never_outlives_parent(self):
+        parent = deadlines.Scope(1.0, name='request')
+        self.assertLessEqual(deadlines.Scope(60.0, parent=parent).remaining(), 1.0)
+        self.assertLessEqual(deadlines.Scope(None, parent=parent).remaining(), 1.0)
+        self.assertLess(deadlines.Scope(0.1, parent=parent).remaining(), 0.2)
+        self.assertIsNone(deadlines.Scope().remaining())
+
+    def test_cancelling_parent_cancels_children(self):
+        parent = deadlines.Scope()
+        child = deadlines.Scope(parent=parent, name='stage')
+        parent.cancel()
+        self.assertTrue(child.cancelled)
+        with self.assertRaises(deadlines.Cancelled):
+            child.check()
+        self.assertFalse(deadlines.Scope(parent=deadlines.Scope()).cancelled)
+
+    def test_expired_scope_raises(self):
+        scope = deadlines.Scope(0.0)
+        with self.assertRaises(deadlines.DeadlineExceeded):
+            scope.check()
+
+    def test_bind_nests_and_restores(self):
+        self.assertIsNone(deadlines.current())
+        with deadlines.deadline(seconds=10) as outer:
+            with deadlines.deadline('stage', seconds=1) as inner:
+                self.assertIs(deadlines.current(), inner)
+                self.assertIs(inner.parent, outer)
+                self.assertLessEqual(deadlines.timeout(5), 1.0)
+            self.assertIs(deadlines.current(), outer)
+        self.assertIsNone(deadlines.current())
+        self.assertEqual(deadlines.timeout(5), 5)
+
+    def test_sleep_wakes_up_when_cancelled(self):
+        scope = deadlines.Scope()
+        threading.Timer(0.05, scope.cancel).start()
+        started = time.monotonic()
+        with self.assertRaises(deadlines.Cancelled):
+            scope.sleep(5)
+        self.assertLess(time.monotonic() - started, 1.0)
+
+
+@mock.patch.object(ats_service, 'GROQ_API_KEY', 'test')
+class ATSServiceDeadlineTests(SimpleTestCase):
+    def test_cancelled_calls_raise(self):
+        with mock.patch.object(ats_service, 'cached_llm_call', side_effect=deadlines.Cancelled("Request cancelled")):
+            with self.assertRaises(deadlines.Cancelled):
+                ats_service.get_llm_response("prompt")
+
+    def test_deadline_and_errors_become_messages(self):
+        with mock.patch.object(ats_service, 'cached_llm_call', side_effect=deadlines.DeadlineExceeded("ats_evaluation deadline exceeded")), \
+                self.assertLogs('login_app.ats_service', 'WARNING'):
+            self.assertEqual(ats_service.get_llm_response("prompt"), ats_service.TIMEOUT_MESSAGE)
+        with mock.patch.object(ats_service, 'cached_llm_call', side_effect=RuntimeError("model unavailable")), \
+                self.assertLogs('login_app.ats_service', 'ERROR') as logs:
+            self.assertEqual(ats_service.get_llm_response("prompt"), ats_service.LLM_ERROR_MESSAGE)
+        self.assertIn("model unavailable", logs.output[0])
+        self.assertTrue(ats_service.is_error_response("Score: 80%\n\nFinal thoughts:\n" + ats_service.TIMEOUT_MESSAGE))
+        self.assertFalse(ats_service.is_error_response("Strong fit"))
+
+    async def test_async_calls(self):
+        cache = mock.Mock()
+        with mock.patch.object(ats_service, 'get_cache', return_value=cache):
+            cache.aget_or_compute = mock.AsyncMock(side_effect=deadlines.Cancelled("Request cancelled"))
+            with self.assertRaises(deadlines.Cancelled):
+                await ats_service.aget_llm_response("prompt")
+            cache.aget_or_compute = mock.AsyncMock(side_effect=deadlines.DeadlineExceeded("ats_evaluation deadline exceeded"))
+            with self.assertLogs('login_app.ats_service', 'WARNING'):
+                self.assertEqual(await ats_service.aget_llm_response("prompt"), ats_service.TIMEOUT_MESSAGE)
+
+    async def test_stream_cancelled(self):
+        async def stream(*args, **kwargs):
+            yield "Partial"
+            raise deadlines.Cancelled("Request cancelled")
+
+        cache = mock.Mock(astream_or_compute=stream)
+        pieces = []
+        with mock.patch.object(ats_service, 'get_cache', return_value=cache), self.assertRaises(deadlines.Cancelled):
+            async for piece in ats_service.astream_ats_evaluation("Python developer", "Python developer", 'hr_review'):
+                pieces.append(piece)
+        self.assertEqual(pieces, ["Partial"])
@@ -0,0 +1,72 @@
+import os
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase, override_settings
+
+from benchmarks.fake_llm import FakeLLMConfig, FakeLLMServer
+from login_app import llm_client
+from login_app.llm_scheduler import DEFAULTS as SCHEDULER_DEFAULTS
+from login_app.llm_scheduler import LLMScheduler
+
+
+class FakeLLMTestCase(SimpleTestCase):
+    """Runs the LLM client against benchmarks.fake_llm instead of the Groq API."""
+
+    fake_llm_config = FakeLLMConfig(latency=0.0, tokens_per_second=0, reply_tokens=5)
+    settings_overrides = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeLLMServer(config=cls.fake_llm_config).start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+
+    def setUp(self):
+        settings = override_settings(LLM_CLIENT={'BASE_URL': self.server.url}, **self.settings_overrides)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # A client for the fake server, dropped afterwards
+        for patch in (mock.patch.dict(os.environ, {'GROQ_API_KEY': 'test'}), mock.patch.object(llm_client, '_client', None)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def requests(self):
+        return self.server.stats.snapshot()['requests']
+
+
+class LLMClientTests(FakeLLMTestCase):
+    def test_complete_and_stream(self):
+        before = self.requests()
+        reply = llm_client.complete('fake-small', "Rewrite my resume")
+        self.assertEqual(len(reply.split()), 5)
+        self.assertEqual("".join(llm_client.stream('fake-small', "Rewrite my resume")), reply)
+        self.assertEqual(self.requests() - before, 2)
+
+    async def test_async_complete_and_stream(self):
+        reply = await llm_client.acomplete('fake-small', "Rewrite my resume")
+        self.assertEqual(len(reply.split()), 5)
+        self.assertEqual("".join([piece async for piece in llm_client.astream('fake-small', "Rewrite my resume")]), reply)
+
+    def test_fake_server_lists_models(self):
+        response = httpx.get(f"{self.server.url}/openai/v1/models")
+        self.assertEqual(response.json()['data'][0]['id'], 'fake')
+        self.assertEqual(httpx.post(f"{self.server.url}/other", json={}).status_code, 404)
+
+
+class RateLimitedClientTests(FakeLLMTestCase):
+    fake_llm_config = FakeLLMConfig(latency=0.0, tokens_per_second=0, error_rate=1.0, retry_after=0)
+
+    def test_retries_429s_then_raises(self):
+        from groq import RateLimitError
+
+        scheduler = LLMScheduler({**SCHEDULER_DEFAULTS, 'MAX_RETRIES': 1, 'BACKOFF_BASE': 0.01, 'BACKOFF_MAX': 0.01})
+        before = self.requests()
+        with mock.patch.object(llm_client, 'get_scheduler', return_value=scheduler), \
+                self.assertLogs('login_app.llm_scheduler', 'WARNING'), self.assertRaises(RateLimitError):
+            llm_client.complete('fake-small', "Rewrite my resume")
+        # The SDK doesn't retry on its own; the scheduler retried once.
+        self.assertEqual(self.requests() - before, 2)
+        self.assertEqual(scheduler.stats()['fake-small']['rate_limited'], 1)
+        self.assertEqual(scheduler.stats()['fake-small']['failed'], 1)
@@ -0,0 +1,95 @@
+from django.test import SimpleTestCase
+
+from login_app.headings import DEFAULTS, detect_headings, detect_text_headings, split_sections
+from login_app.pdf_extract import DEFAULTS as PDF_DEFAULTS
+from login_app.pdf_extract import Line, PDFExtractor
+
+from .test_pdf_extract import make_pdf
+
+RESUME = """Jane Doe
+jane@example.com
+
+SUMMARY
+Backend engineer with eight years of Python.
+
+EXPERIENCE
+- Built billing APIs in Django.
+- Ran PostgreSQL on AWS.
+
+SKILLS
+Python, Django, PostgreSQL, Docker
+
+EDUCATION
+BSc Computer Science
+"""
+
+
+class LayoutHeadingTests(SimpleTestCase):
+    def line(self, text, size=11.0, bold=False):
+        return Line(0, text, size, bold)
+
+    def test_detects_headings_from_font(self):
+        lines = [
+            self.line("Jane Doe", 20.0, True),
+            self.line("EXPERIENCE", 14.0, True),
+            self.line("Built billing APIs in Django and ran them on AWS"),
+            self.line("Led a team of five engineers"),
+            self.line("SKILLS", 14.0, True),
+            self.line("Python, Django, PostgreSQL"),
+            self.line("EDUCATION", 14.0, True),
+            self.line("BSc Computer Science, University of Leeds"),
+        ]
+        result = detect_headings(lines)
+        self.assertEqual(result.headings, ['EXPERIENCE', 'SKILLS', 'EDUCATION'])
+        self.assertGreaterEqual(result.confidence, DEFAULTS['MIN_CONFIDENCE'])
+        self.assertTrue(result.text[result.sections[1].start:].startswith("SKILLS\nPython"))
+        self.assertEqual(result.sections[-1].end, len(result.text))
+
+    def test_no_confidence_without_headings(self):
+        lines = [self.line("Jane Doe", 20.0, True), self.line("Python developer"), self.line("Django and SQL")]
+        result = detect_headings(lines)
+        self.assertEqual((result.headings, result.confidence), ([], 0.0))
+        self.assertEqual(detect_headings([]).headings, [])
+
+    def test_reads_pdf_lines(self):
+        data = make_pdf([("Jane Doe", 20, True), ("EXPERIENCE", 14, True), "Built billing APIs", ("SKILLS", 14, True), "Python"])
+        lines = PDFExtractor({**PDF_DEFAULTS}).lines(data)
+        self.assertEqual([line.text for line in lines], ["Jane Doe", "EXPERIENCE", "Built billing APIs", "SKILLS", "Python"])
+        self.assertTrue(lines[1].bold)
+        self.assertFalse(lines[2].bold)
+        self.assertEqual(detect_headings(lines).headings, ['EXPERIENCE', 'SKILLS'])
+
+    def test_lines_leave_page_text_unchanged(self):
+        data = make_pdf(["Python,   Django    and  SQL\ttools"])
+        cold = PDFExtractor({**PDF_DEFAULTS}).text(data)
+        extractor = PDFExtractor({**PDF_DEFAULTS})
+        self.assertEqual(extractor.lines(data)[0].text, "Python, Django and SQL tools")
+        self.assertEqual(extractor.text(data), cold)
+        self.assertEqual(extractor.stats()['misses'], 1)
+
+
+class TextHeadingTests(SimpleTestCase):
+    def test_detects_text_headings(self):
+        result = detect_text_headings(RESUME)
+        self.assertEqual(result.headings, ['SUMMARY', 'EXPERIENCE', 'SKILLS', 'EDUCATION'])
+        self.assertEqual(result.confidence, 1.0)
+        self.assertTrue(RESUME[result.sections[0].start:].startswith('SUMMARY'))
+        self.assertEqual(result.sections[-1].end, len(RESUME))
+
+    def test_ignores_bullets_and_sentences(self):
+        text = "Skills:\n- Work experience in Python\nProfessional experience.\nEducation\nBSc"
+        self.assertEqual(detect_text_headings(text).headings, ['Skills', 'Education'])
+
+    def test_needs_two_headings(self):
+        result = detect_text_headings("Jane Doe\nSKILLS\nPython, Django")
+        self.assertEqual(result.headings, [])
+        self.assertEqual(result.confidence, 0.0)
+
+
+class SplitSectionsTests(SimpleTestCase):
+    def test_finds_headings_at_line_starts(self):
+        text = "Jane Doe\n**Skills:**\nPython\nEducation\nBSc"
+        sections = split_sections(text, ['Skills', 'Education', 'Awards'])
+        self.assertEqual([section.heading for section in sections], ['Skills', 'Education'])
+        self.assertEqual(text[sections[0].start:sections[0].end], "**Skills:**\nPython\n")
+        self.assertEqual(sections[1].end, len(text))
@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from login_app.ats_service import LLM_ERROR_MESSAGE
+from login_app.idempotency import FIELD_NAME
+
+KEY = 'a' * 32
+
+
+@override_settings(CREW_JOBS={'IN_PROCESS_WORKERS': False})
+class ATSScannerReplayTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('jane')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def post(self, key=KEY, button='hr_review'):
+        data = {
+            'resume_file': SimpleUploadedFile('resume.pdf', b"%PDF-1.4"), 'job_description': "Python developer",
+            button: "1", FIELD_NAME: key,
+        }
+        with mock.patch('login_app.views.extract_text_from_pdf', return_value="Python developer"), \
+                mock.patch('login_app.job_profiles.generate_brief_in_background'):
+            return self.client.post(reverse('ats_scanner'), data)
+
+    def test_repeated_submission_gets_the_first_answer(self):
+        with mock.patch('login_app.views.agenerate_ats_evaluation', side_effect=["First answer", "Second answer"]) as evaluate:
+            self.assertContains(self.post(), "First answer")
+            self.assertContains(self.post(), "First answer")
+            self.assertEqual(evaluate.call_count, 1)
+            # Another rendering of the form, or another button, runs again
+            self.assertContains(self.post(key='b' * 32), "Second answer")
+        with mock.patch('login_app.views.agenerate_ats_evaluation', return_value="Match") as evaluate:
+            self.post(button='ats_match')
+        evaluate.assert_called_once()
+
+    def test_error_messages_are_not_replayed(self):
+        with mock.patch('login_app.views.agenerate_ats_evaluation', side_effect=[LLM_ERROR_MESSAGE, "Answer"]) as evaluate:
+            self.assertContains(self.post(), LLM_ERROR_MESSAGE)
+            self.assertContains(self.post(), "Answer")
+            self.assertEqual(evaluate.call_count, 2)
+
+    @override_settings(IDEMPOTENCY={'ENABLED': False})
+    def test_disabled(self):
+        with mock.patch('login_app.views.agenerate_ats_evaluation', return_value="Answer") as evaluate:
+            self.post()
+            self.post()
+        self.assertEqual(evaluate.call_count, 2)
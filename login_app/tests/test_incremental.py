@@ -0,0 +1,46 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from login_app.headings import detect_text_headings
+from login_app.incremental import PREAMBLE, diff_sections, plan_crew_update, result_sections, section_fingerprints
+from login_app.models import CrewJob
+
+from .test_headings import RESUME
+
+
+class IncrementalTests(TestCase):
+    def test_diff_sections(self):
+        previous = [[PREAMBLE, 'p'], ['Summary', 'a'], ['Skills', 'b'], ['Awards', 'c']]
+        current = [[PREAMBLE, 'p2'], ['Summary', 'a'], ['Skills', 'b2'], ['Projects', 'd']]
+        self.assertEqual(diff_sections(previous, current), (['Skills', 'Projects'], ['Summary'], ['Awards']))
+
+    def test_fingerprints_ignore_spacing(self):
+        spaced = RESUME.replace("Built billing", "Built   billing")
+        sections = detect_text_headings(RESUME).sections
+        self.assertEqual(
+            section_fingerprints(RESUME, sections), section_fingerprints(spaced, detect_text_headings(spaced).sections)
+        )
+
+    def test_plan_crew_update(self):
+        user = User.objects.create_user('jane')
+        previous = CrewJob.objects.create(
+            user=user, resume_text=RESUME, job_description_text="JD", status=CrewJob.STATUS_SUCCEEDED,
+            finished_at=timezone.now(), result_sections=result_sections(RESUME, RESUME.upper()),
+        )
+        edited = RESUME.replace("Docker", "Docker, Kubernetes")
+        job = CrewJob.objects.create(user=user, resume_text=edited, job_description_text="JD")
+        plan = plan_crew_update(job)
+        self.assertEqual(plan.previous_job_id, previous.id)
+        self.assertEqual(plan.changed, ['SKILLS'])
+        reused = {update.heading: update for update in plan.sections}
+        self.assertTrue(reused['EXPERIENCE'].reuse)
+        self.assertEqual(reused['EXPERIENCE'].previous_output.strip(), "EXPERIENCE\n- BUILT BILLING APIS IN DJANGO.\n- RAN POSTGRESQL ON AWS.")
+
+        # A new contact block, too many changes or another job description run the full crew.
+        job.resume_text = edited.replace("jane@example.com", "jane@example.org")
+        self.assertIsNone(plan_crew_update(job))
+        job.resume_text = edited.replace("Python.", "Go.").replace("Computer", "Data")
+        self.assertIsNone(plan_crew_update(job))
+        job.resume_text, job.job_description_text = edited, "Another JD"
+        self.assertIsNone(plan_crew_update(job))
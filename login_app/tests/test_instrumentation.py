@@ -0,0 +1,47 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from login_app.instrumentation import BUCKETS, Histogram, _server_timing
+
+
+class HistogramTests(SimpleTestCase):
+    def test_render(self):
+        histogram = Histogram('test_seconds', "Test durations.", ('stage',))
+        histogram.observe(BUCKETS[0], 'parse')
+        histogram.observe(BUCKETS[-1] + 1, 'parse')
+        lines = histogram.render()
+        self.assertIn(f'test_seconds_bucket{{stage="parse",le="{BUCKETS[0]:g}"}} 1', lines)
+        self.assertIn(f'test_seconds_bucket{{stage="parse",le="{BUCKETS[-1]:g}"}} 1', lines)
+        self.assertIn('test_seconds_bucket{stage="parse",le="+Inf"} 2', lines)
+        self.assertIn('test_seconds_count{stage="parse"} 2', lines)
+
+    def test_server_timing_adds_up_repeated_stages(self):
+        self.assertEqual(_server_timing([('llm', 0.1), ('pdf', 0.02), ('llm', 0.2)], 0.5), "llm;dur=300.0, pdf;dur=20.0, total;dur=500.0")
+
+
+@override_settings(METRICS={'TOKEN': 'secret-token'}, CREW_JOBS={'IN_PROCESS_WORKERS': False})
+class MetricsViewTests(TestCase):
+    def test_needs_superuser_or_token(self):
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION="secret-token").status_code, 403)
+        self.client.force_login(User.objects.create_user('jane'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        response = self.client.get(url, HTTP_AUTHORIZATION="Bearer secret-token")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "# TYPE resume_stage_duration_seconds histogram")
+        self.client.force_login(User.objects.create_superuser('admin'))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(METRICS={'TOKEN': None})
+    def test_no_token_configured(self):
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION="Bearer None").status_code, 403)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION="Bearer ").status_code, 403)
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('login'))
+        self.assertIn('total;dur=', response['Server-Timing'])
+        self.assertIn('template;dur=', response['Server-Timing'])
@@ -0,0 +1,162 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from login_app import jobs
+from login_app.agents import CREW_STAGES
+from login_app.models import CrewJob
+
+# No worker threads: the tests claim and run jobs themselves.
+NO_WORKERS = {'IN_PROCESS_WORKERS': False, 'RETRY_BACKOFF': 15}
+
+
+@override_settings(CREW_JOBS=NO_WORKERS)
+class CrewJobQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('jane')
+
+    def create_job(self, **fields):
+        return CrewJob.objects.create(
+            user=self.user, resume_text="resume", job_description_text="JD", max_attempts=3, **fields
+        )
+
+    def test_claims_oldest_available_job(self):
+        now = timezone.now()
+        self.create_job(available_at=now + timedelta(minutes=5))
+        second = self.create_job(available_at=now - timedelta(seconds=1))
+        first = self.create_job(available_at=now - timedelta(seconds=2))
+
+        claimed = jobs.claim_next_job('worker-1')
+        self.assertEqual(claimed.id, first.id)
+        self.assertEqual((claimed.status, claimed.worker, claimed.attempts), (CrewJob.STATUS_RUNNING, 'worker-1', 1))
+        self.assertGreater(claimed.lease_expires_at, now)
+        self.assertEqual(jobs.claim_next_job('worker-2').id, second.id)
+        self.assertIsNone(jobs.claim_next_job('worker-3'))
+
+    def test_reclaims_expired_lease(self):
+        expired = timezone.now() - timedelta(seconds=1)
+        job = self.create_job(status=CrewJob.STATUS_RUNNING, attempts=1, lease_expires_at=expired)
+        self.create_job(status=CrewJob.STATUS_RUNNING, attempts=1, lease_expires_at=timezone.now() + timedelta(minutes=5))
+        claimed = jobs.claim_next_job('worker-2')
+        self.assertEqual((claimed.id, claimed.attempts), (job.id, 2))
+        self.assertIsNone(jobs.claim_next_job('worker-3'))
+
+    def test_fails_expired_lease_after_last_attempt(self):
+        job = self.create_job(status=CrewJob.STATUS_RUNNING, attempts=3, lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(jobs.claim_next_job('worker-1'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, CrewJob.STATUS_FAILED)
+        self.assertIsNotNone(job.finished_at)
+        self.assertIn("stopped responding", job.error)
+
+    def run_claimed(self, stream_crew):
+        with mock.patch.object(jobs, '_watch_for_cancellation'), mock.patch('login_app.agents.stream_crew', stream_crew):
+            job = jobs.claim_next_job('worker-1')
+            jobs.run_job(job)
+        job.refresh_from_db()
+        return job
+
+    def test_failed_attempt_is_retried_with_backoff(self):
+        self.create_job(available_at=timezone.now() - timedelta(seconds=1))
+        with self.assertLogs('login_app.jobs', 'ERROR'):
+            job = self.run_claimed(mock.Mock(side_effect=RuntimeError("model unavailable")))
+        self.assertEqual((job.status, job.attempts, job.error), (CrewJob.STATUS_PENDING, 1, "model unavailable"))
+        self.assertGreater(job.available_at, timezone.now() + timedelta(seconds=10))
+        self.assertIsNone(job.lease_expires_at)
+
+    def test_last_failed_attempt_fails_the_job(self):
+        self.create_job(attempts=2, available_at=timezone.now() - timedelta(seconds=1))
+        with self.assertLogs('login_app.jobs', 'ERROR'):
+            job = self.run_claimed(mock.Mock(side_effect=RuntimeError("model unavailable")))
+        self.assertEqual((job.status, job.attempts), (CrewJob.STATUS_FAILED, 3))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_successful_attempt_stores_result(self):
+        self.create_job(available_at=timezone.now() - timedelta(seconds=1))
+        events = [('stage', {'stage': 'rewrite', 'status': 'running'}), ('token', "Better "), ('token', "resume"),
+                  ('usage', {'prompt_tokens': 10, 'completion_tokens': 2})]
+        job = self.run_claimed(mock.Mock(return_value=(event for event in events)))
+        self.assertEqual((job.status, job.result, job.completion_tokens), (CrewJob.STATUS_SUCCEEDED, "Better resume", 2))
+
+    def test_cancelled_job_is_not_claimed(self):
+        job = self.create_job(available_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(jobs.cancel_crew_job(job.id, self.user))
+        self.assertIsNone(jobs.claim_next_job('worker-1'))
+        self.assertFalse(jobs.cancel_crew_job(job.id, self.user))
+
+
+@override_settings(CREW_JOBS=NO_WORKERS)
+class CrewJobViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('jane')
+        cls.other = User.objects.create_user('john')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def create_job(self, **fields):
+        return CrewJob.objects.create(user=self.user, resume_text="resume", job_description_text="JD", **fields)
+
+    def test_submit_queues_one_job_per_idempotency_key(self):
+        data = {'resume': "My resume", 'job_description': "Python developer", 'mode': 'fast', 'idempotency_key': 'a' * 32}
+        with mock.patch('login_app.job_profiles.generate_brief_in_background'):
+            first = self.client.post(reverse('resume_enhancer'), data)
+            again = self.client.post(reverse('resume_enhancer'), data, HTTP_ACCEPT='application/json')
+        job = CrewJob.objects.get()
+        self.assertRedirects(first, reverse('resume_enhancer_job', args=[job.id]))
+        self.assertEqual(again.status_code, 202)
+        self.assertEqual(again.json()['id'], str(job.id))
+        self.assertEqual((job.mode, job.status), ('fast', CrewJob.STATUS_PENDING))
+
+    def test_job_page(self):
+        job = self.create_job(status=CrewJob.STATUS_SUCCEEDED, result="Better\nresume")
+        response = self.client.get(reverse('resume_enhancer_job', args=[job.id]))
+        self.assertContains(response, "Better<br>resume")
+        failed = self.create_job(status=CrewJob.STATUS_FAILED, error="model unavailable")
+        response = self.client.get(reverse('resume_enhancer_job', args=[failed.id]))
+        self.assertContains(response, "Sorry, we encountered an error")
+        self.assertNotContains(response, "model unavailable")
+
+    def test_jobs_are_private(self):
+        job = CrewJob.objects.create(user=self.other, resume_text="resume", job_description_text="JD")
+        self.assertEqual(self.client.get(reverse('resume_enhancer_job', args=[job.id])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('resume_enhancer_job_status', args=[job.id])).status_code, 404)
+        self.assertEqual(self.client.post(reverse('resume_enhancer_job_cancel', args=[job.id])).status_code, 404)
+
+    def test_status_and_cancel(self):
+        job = self.create_job(status=CrewJob.STATUS_RUNNING, stage='writer', result="partial")
+        payload = self.client.get(reverse('resume_enhancer_job_status', args=[job.id])).json()
+        self.assertEqual((payload['status'], payload['stage'], payload['result']), ('running', 'writer', ''))
+
+        self.assertEqual(self.client.get(reverse('resume_enhancer_job_cancel', args=[job.id])).status_code, 405)
+        response = self.client.post(reverse('resume_enhancer_job_cancel', args=[job.id]), HTTP_ACCEPT='application/json')
+        self.assertEqual(response.json()['status'], CrewJob.STATUS_CANCELLED)
+        self.assertEqual(response.json()['error'], "This enhancement was cancelled.")
+
+    async def test_events_of_a_finished_job(self):
+        job = await CrewJob.objects.acreate(
+            user=self.user, resume_text="resume", job_description_text="JD", status=CrewJob.STATUS_SUCCEEDED,
+            stage='editor', result="Better resume", completion_tokens=2,
+        )
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('resume_enhancer_job_events', args=[job.id]))
+        body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        events = [block.split("\n") for block in body.strip().split("\n\n")]
+        events = [(name.removeprefix("event: "), json.loads(data.removeprefix("data: "))) for name, data in events]
+        self.assertEqual(events[:3], [('stage', {'stage': stage, 'status': 'done'}) for stage in CREW_STAGES[:2]] + [
+            ('stage', {'stage': 'editor', 'status': 'running'})])
+        self.assertIn(('token', {'text': "Better resume"}), events)
+        self.assertEqual(events[-1][0], 'done')
+        self.assertEqual(events[-1][1]['status'], CrewJob.STATUS_SUCCEEDED)
+
+    async def test_events_need_the_owner(self):
+        job = await CrewJob.objects.acreate(user=self.other, resume_text="resume", job_description_text="JD")
+        response = await self.async_client.get(reverse('resume_enhancer_job_events', args=[job.id]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from login_app.llm_cache import DEFAULTS, LLMResponseCache, LRUCache, make_key
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.set('a', '1')
+        cache.set('b', '2')
+        cache.get('a')
+        cache.set('c', '3')
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+
+    def test_evicts_by_size(self):
+        cache = LRUCache(max_entries=10, max_bytes=10)
+        cache.set('a', 'x' * 6)
+        cache.set('b', 'y' * 6)
+        self.assertNotIn('a', cache)
+        self.assertEqual(cache.get('b'), 'y' * 6)
+
+    def test_skips_values_larger_than_the_cache(self):
+        cache = LRUCache(max_bytes=5)
+        cache.set('a', 'x' * 6)
+        self.assertEqual(len(cache), 0)
+
+    def test_entries_expire(self):
+        cache = LRUCache(ttl=10)
+        with mock.patch('login_app.llm_cache.time.monotonic', return_value=100.0):
+            cache.set('a', '1')
+        with mock.patch('login_app.llm_cache.time.monotonic', return_value=105.0):
+            self.assertEqual(cache.get('a'), '1')
+        with mock.patch('login_app.llm_cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+
+class MakeKeyTests(SimpleTestCase):
+    def test_ignores_whitespace_differences(self):
+        self.assertEqual(
+            make_key('model', 'ats_match', "Python  developer\n\nDjango "),
+            make_key('model', 'ats_match', "Python developer Django"),
+        )
+
+    def test_depends_on_model_type_and_text(self):
+        key = make_key('model', 'ats_match', "text")
+        self.assertNotEqual(key, make_key('other', 'ats_match', "text"))
+        self.assertNotEqual(key, make_key('model', 'hr_review', "text"))
+        self.assertNotEqual(key, make_key('model', 'ats_match', "other text"))
+
+    def test_parts_are_separated(self):
+        self.assertNotEqual(make_key('ab', 'c', "text"), make_key('a', 'bc', "text"))
+
+
+class LLMResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = LLMResponseCache({**DEFAULTS, 'PERSISTENT_ALIAS': None})
+
+    def test_stores_computed_response(self):
+        compute = mock.Mock(return_value="answer")
+        self.assertEqual(self.cache.get_or_compute('m', 't', "prompt", compute), "answer")
+        self.assertEqual(self.cache.get_or_compute('m', 't', "prompt", compute), "answer")
+        self.assertEqual(compute.call_count, 1)
+
+    def test_errors_are_not_stored(self):
+        with self.assertRaises(ValueError):
+            self.cache.get_or_compute('m', 't', "prompt", mock.Mock(side_effect=ValueError))
+        self.assertEqual(self.cache.get_or_compute('m', 't', "prompt", lambda: "answer"), "answer")
+
+    def test_use_cache_false_recomputes(self):
+        self.cache.get_or_compute('m', 't', "prompt", lambda: "old")
+        self.assertEqual(self.cache.get_or_compute('m', 't', "prompt", lambda: "new", use_cache=False), "new")
+        self.assertEqual(self.cache.get_or_compute('m', 't', "prompt", lambda: "unused"), "new")
+
+    def test_persistent_tier_fills_local_tier(self):
+        writer = LLMResponseCache({**DEFAULTS, 'PERSISTENT_ALIAS': 'default'})
+        self.addCleanup(writer.clear)
+        writer.get_or_compute('m', 't', "shared prompt", lambda: "answer")
+        reader = LLMResponseCache({**DEFAULTS, 'PERSISTENT_ALIAS': 'default'})
+        self.assertEqual(reader.get(make_key('m', 't', "shared prompt")), "answer")
+        self.assertEqual(reader.stats()['persistent_hits'], 1)
+        self.assertIn(make_key('m', 't', "shared prompt"), reader.local)
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from login_app import deadlines
+from login_app.llm_executor import LLMExecutor
+
+
+class LLMExecutorTests(SimpleTestCase):
+    def setUp(self):
+        self.executor = LLMExecutor(workers=4, endpoint_limits={'crew': 1})
+        self.addCleanup(self.executor._pool.shutdown)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def work(self, seconds=0.05):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(seconds)
+        with self.lock:
+            self.running -= 1
+        return threading.current_thread().name
+
+    async def test_runs_on_the_pool(self):
+        name = await self.executor.run('ats', self.work)
+        self.assertTrue(name.startswith('llm-worker'))
+        self.assertEqual(self.executor.stats()['endpoints']['ats']['completed'], 1)
+
+    async def test_endpoint_limit(self):
+        await asyncio.gather(*(self.executor.run('crew', self.work) for _ in range(3)))
+        self.assertEqual(self.peak, 1)
+
+    async def test_unlimited_endpoints_run_in_parallel(self):
+        await asyncio.gather(*(self.executor.run('ats', self.work, 0.2) for _ in range(3)))
+        self.assertEqual(self.peak, 3)
+
+    async def test_errors_propagate(self):
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            await self.executor.run('ats', fail)
+        stats = self.executor.stats()
+        self.assertEqual(stats['endpoints']['ats']['failed'], 1)
+        self.assertEqual((stats['queue_depth'], stats['running']), (0, 0))
+
+    async def test_cancelling_the_caller_cancels_the_scope(self):
+        scopes = []
+        started = threading.Event()
+
+        def wait_for_cancel():
+            scopes.append(deadlines.current())
+            started.set()
+            deadlines.sleep(5)
+
+        task = asyncio.ensure_future(self.executor.run('crew', wait_for_cancel))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertTrue(scopes[0].cancelled)
+        # The slot is released once the worker has stopped.
+        self.assertEqual(await self.executor.run('crew', lambda: "next"), "next")
+
+    async def test_iterate(self):
+        def pieces():
+            yield "a"
+            yield "b"
+            raise ValueError("stream broke")
+
+        received = []
+        with self.assertRaises(ValueError):
+            async for piece in self.executor.iterate('section', pieces):
+                received.append(piece)
+        self.assertEqual(received, ["a", "b"])
@@ -0,0 +1,78 @@
+import time
+
+from django.test import SimpleTestCase
+
+from login_app import llm_router
+from login_app.llm_cache import DEFAULTS as LLM_CACHE_DEFAULTS
+from login_app.llm_cache import LLMResponseCache, dont_store, make_key
+
+from .test_fake_llm import FakeLLMTestCase
+
+
+def slow_primary(model):
+    time.sleep(1.0 if model == 'slow' else 0.0)
+    return model
+
+
+class RouterTests(FakeLLMTestCase):
+    settings_overrides = {'LLM_ROUTER': {'TASKS': {'test': {'MODELS': ['fake-small']}}}}
+
+    def test_uses_task_model(self):
+        route = llm_router.choose_route('test', 10)
+        self.assertEqual(route.model, 'fake-small')
+        self.assertIsNone(route.fallback)
+        key = ('test', 'fake-small', llm_router.PRIMARY)
+        before = llm_router.stats().get(key, 0)
+        self.assertEqual(len(llm_router.complete('test', "Summarize this").split()), 5)
+        self.assertEqual(llm_router.stats()[key], before + 1)
+        with self.assertRaises(KeyError):
+            llm_router.choose_route('unknown')
+
+
+class FallbackTests(SimpleTestCase):
+    def test_falls_back_after_deadline(self):
+        route = llm_router.Route('test', 'slow', 'fast', 0.05, None)
+        self.assertEqual(llm_router.call('test', "prompt", slow_primary, route=route), 'fast')
+
+    def test_falls_back_when_primary_fails(self):
+        route = llm_router.Route('test', 'broken', 'fast', 5.0, None)
+
+        def call_model(model):
+            if model == 'broken':
+                raise RuntimeError("model unavailable")
+            return model
+
+        started = time.monotonic()
+        with self.assertLogs('login_app.llm_router', 'WARNING'):
+            self.assertEqual(llm_router.call('test', "prompt", call_model, route=route), 'fast')
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    async def test_async_falls_back_when_primary_fails(self):
+        route = llm_router.Route('test', 'broken', 'fast', 5.0, None)
+
+        async def call_model(model):
+            if model == 'broken':
+                raise RuntimeError("model unavailable")
+            return model
+
+        with self.assertLogs('login_app.llm_router', 'WARNING'):
+            self.assertEqual(await llm_router.acall('test', "prompt", call_model, route=route), 'fast')
+
+
+class FallbackCachingTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = LLMResponseCache({**LLM_CACHE_DEFAULTS, 'PERSISTENT_ALIAS': None})
+
+    def test_dont_store_keeps_response_out(self):
+        def compute():
+            dont_store()
+            return "fallback answer"
+
+        self.assertEqual(self.cache.get_or_compute('m', 't', "prompt", compute), "fallback answer")
+        self.assertIsNone(self.cache.local.get(make_key('m', 't', "prompt")))
+
+    def test_fallback_answer_is_not_cached(self):
+        route = llm_router.Route('test', 'slow', 'fast', 0.05, None)
+        answer = self.cache.get_or_compute('slow', 'test', "prompt", lambda: llm_router.call('test', "prompt", slow_primary, route=route))
+        self.assertEqual(answer, 'fast')
+        self.assertIsNone(self.cache.local.get(make_key('slow', 'test', "prompt")))
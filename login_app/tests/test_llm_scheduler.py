@@ -0,0 +1,131 @@
+import time
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase
+
+from login_app import deadlines
+
+from login_app.llm_scheduler import (
+    BATCH, DEFAULTS, INTERACTIVE, LLMScheduler, ModelScheduler, SchedulerTimeout, TokenBucket, _parse_duration, _priority,
+    priority, retry_after,
+)
+
+
+class _APIError(Exception):
+    """Looks like an SDK error: a status code and the HTTP response."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = httpx.Response(status_code, headers=headers or {})
+
+
+class SchedulerTests(SimpleTestCase):
+    def test_token_bucket_refills_over_a_minute(self):
+        with mock.patch('login_app.llm_scheduler.time.monotonic', return_value=0.0):
+            bucket = TokenBucket(60)
+        bucket.take(60)
+        self.assertAlmostEqual(bucket.wait_time(1, 0.0), 1.0)
+        self.assertAlmostEqual(bucket.wait_time(1, 0.5), 0.5)
+        self.assertEqual(bucket.wait_time(1, 1.0), 0.0)
+        # Requests larger than the bucket wait for a full bucket, not forever.
+        self.assertAlmostEqual(bucket.wait_time(120, 1.0), 59.0)
+
+    def test_parse_duration(self):
+        self.assertEqual(_parse_duration('7'), 7.0)
+        self.assertEqual(_parse_duration('7.5'), 7.5)
+        self.assertEqual(_parse_duration('2m30s'), 150.0)
+        self.assertEqual(_parse_duration('850ms'), 0.85)
+        self.assertEqual(_parse_duration('1m'), 60.0)
+        self.assertIsNone(_parse_duration(''))
+        self.assertIsNone(_parse_duration(None))
+        self.assertIsNone(_parse_duration('soon'))
+
+    def test_retry_after(self):
+        self.assertEqual(retry_after(_APIError(429, {'retry-after': '3'})), (True, 3.0))
+        self.assertEqual(retry_after(_APIError(429, {'x-ratelimit-reset-tokens': '1m2s'})), (True, 62.0))
+        self.assertEqual(retry_after(_APIError(503)), (True, None))
+        self.assertEqual(retry_after(_APIError(400)), (False, None))
+        self.assertEqual(retry_after(httpx.ConnectError("refused")), (True, None))
+        self.assertEqual(retry_after(ValueError()), (False, None))
+
+    def test_call_retries_rate_limits(self):
+        scheduler = LLMScheduler({**DEFAULTS, 'BACKOFF_BASE': 0.01, 'BACKOFF_MAX': 0.01})
+        func = mock.Mock(side_effect=[_APIError(429, {'retry-after': '0'}), "answer"])
+        with self.assertLogs('login_app.llm_scheduler', 'WARNING'):
+            self.assertEqual(scheduler.call('m', func, "prompt"), "answer")
+        self.assertEqual(func.call_count, 2)
+        self.assertEqual(scheduler.stats()['m']['rate_limited'], 1)
+        self.assertEqual(scheduler.stats()['m']['retries'], 1)
+
+    def test_call_gives_up(self):
+        scheduler = LLMScheduler({**DEFAULTS, 'MAX_RETRIES': 1, 'BACKOFF_BASE': 0.01, 'BACKOFF_MAX': 0.01})
+        func = mock.Mock(side_effect=_APIError(503))
+        with self.assertRaises(_APIError), self.assertLogs('login_app.llm_scheduler', 'WARNING'):
+            scheduler.call('m', func)
+        self.assertEqual(func.call_count, 2)
+        with self.assertRaises(_APIError):
+            scheduler.call('m', mock.Mock(side_effect=_APIError(400)))
+        self.assertEqual(scheduler.stats()['m']['failed'], 1)
+
+    def test_backoff_past_the_deadline_gives_up(self):
+        scheduler = LLMScheduler({**DEFAULTS, 'BACKOFF_BASE': 0.01, 'BACKOFF_MAX': 0.01})
+        func = mock.Mock(side_effect=_APIError(429, {'retry-after': '30'}))
+        started = time.monotonic()
+        with deadlines.deadline(seconds=5), self.assertRaises(deadlines.DeadlineExceeded):
+            scheduler.call('m', func)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(func.call_count, 1)
+        self.assertEqual(scheduler.stats()['m']['failed'], 1)
+
+    async def test_async_backoff_past_the_deadline_gives_up(self):
+        scheduler = LLMScheduler({**DEFAULTS, 'BACKOFF_BASE': 0.01, 'BACKOFF_MAX': 0.01})
+        request = mock.AsyncMock(side_effect=_APIError(503, {'retry-after': '30'}))
+        started = time.monotonic()
+        with deadlines.deadline(seconds=5), self.assertRaises(deadlines.DeadlineExceeded):
+            await scheduler.acall('m', request)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(request.call_count, 1)
+
+    async def test_acall_retries_rate_limits(self):
+        scheduler = LLMScheduler({**DEFAULTS, 'BACKOFF_BASE': 0.01, 'BACKOFF_MAX': 0.01})
+        attempts = []
+
+        async def request():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise _APIError(429, {'retry-after': '0'})
+            return "answer"
+
+        with self.assertLogs('login_app.llm_scheduler', 'WARNING'):
+            self.assertEqual(await scheduler.acall('m', request, "prompt"), "answer")
+        self.assertEqual(len(attempts), 2)
+
+    def test_gives_up_waiting_for_a_slot(self):
+        scheduler = LLMScheduler({**DEFAULTS, 'DEFAULT_RPM': 1, 'MAX_QUEUE_WAIT': 0.5})
+        self.assertEqual(scheduler.call('m', lambda: "first"), "first")
+        with self.assertRaises(SchedulerTimeout):
+            scheduler.call('m', lambda: "second")
+        self.assertEqual(scheduler.stats()['m']['waiting'], 0)
+
+    def test_disabled_scheduler_calls_directly(self):
+        scheduler = LLMScheduler({**DEFAULTS, 'ENABLED': False})
+        func = mock.Mock(side_effect=_APIError(429))
+        with self.assertRaises(_APIError):
+            scheduler.call('m', func)
+        self.assertEqual(func.call_count, 1)
+
+    def test_priority(self):
+        self.assertEqual(_priority.get(), INTERACTIVE)
+        with priority(BATCH):
+            self.assertEqual(_priority.get(), BATCH)
+        self.assertEqual(_priority.get(), INTERACTIVE)
+
+    def test_interactive_callers_go_first(self):
+        model = ModelScheduler('m', rpm=60, tpm=100000)
+        batch = model._enqueue(BATCH)
+        interactive = model._enqueue(INTERACTIVE)
+        self.assertGreater(model._try_take(batch, 1), 0)
+        self.assertEqual(model._try_take(interactive, 1), 0)
+        self.assertEqual(model._try_take(batch, 1), 0)
@@ -0,0 +1,78 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+
+from login_app.pdf_extract import DEFAULTS, PDFExtractionError, PDFExtractor, read_upload, text_or_error
+
+
+def make_pdf(*pages):
+    """
+    PDF bytes with one page per argument. A page is a list of lines: strings,
+    or (text, size, bold) tuples.
+    """
+    import fitz
+
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page()
+        y = 72
+        for line in lines:
+            text, size, bold = (line, 11, False) if isinstance(line, str) else line
+            page.insert_text((72, y), text, fontsize=size, fontname='hebo' if bold else 'helv')
+            y += size * 1.6
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+class PDFExtractorTests(SimpleTestCase):
+    def extractor(self, **config):
+        return PDFExtractor({**DEFAULTS, **config})
+
+    def test_extracts_page_text(self):
+        data = make_pdf(["First page"], ["Second page"])
+        extractor = self.extractor()
+        self.assertEqual(extractor.pages(data), ("First page\n", "Second page\n"))
+        self.assertEqual(extractor.text(data), "First page\nSecond page")
+
+    def test_caches_by_content(self):
+        extractor = self.extractor()
+        data = make_pdf(["Resume"])
+        extractor.text(data)
+        extractor.text(bytes(data))
+        self.assertEqual((extractor.stats()['misses'], extractor.stats()['hits']), (1, 1))
+        extractor.text(make_pdf(["Another resume"]))
+        self.assertEqual(extractor.stats()['misses'], 2)
+
+    def test_page_limit(self):
+        extractor = self.extractor(MAX_PAGES=2)
+        data = make_pdf(["One"], ["Two"], ["Three"])
+        self.assertEqual(extractor.text(data), "One\nTwo")
+        self.assertEqual(extractor.stats()['truncated'], 1)
+        self.assertEqual({line.page for line in extractor.lines(data)}, {0, 1})
+
+    def test_size_limit(self):
+        extractor = self.extractor(MAX_BYTES=100)
+        with self.assertRaises(PDFExtractionError):
+            extractor.pages(make_pdf(["Resume"]))
+        with self.assertRaises(PDFExtractionError):
+            extractor.lines(make_pdf(["Resume"]))
+
+    def test_rejects_other_files(self):
+        with self.assertRaises(PDFExtractionError):
+            self.extractor().pages(b"not a pdf")
+
+    def test_text_or_error(self):
+        data = make_pdf(["One"], ["Two"])
+        self.assertEqual(text_or_error(data, 1, 1024 * 1024), ("One", None))
+        text, error = text_or_error(data, 1, 100)
+        self.assertIsNone(text)
+        self.assertIn("larger than", error)
+        self.assertIsNone(text_or_error(b"not a pdf", 1, 1024 * 1024)[0])
+
+    @override_settings(PDF_EXTRACT={'MAX_BYTES': 10})
+    def test_read_upload(self):
+        self.assertEqual(read_upload(SimpleUploadedFile('resume.pdf', b"%PDF-1.4")), b"%PDF-1.4")
+        with self.assertRaises(PDFExtractionError):
+            read_upload(SimpleUploadedFile('resume.pdf', b"%PDF-1.4 and more"))
+        with self.assertRaises(FileNotFoundError):
+            read_upload(None)
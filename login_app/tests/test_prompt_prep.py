@@ -0,0 +1,36 @@
+from django.test import SimpleTestCase, override_settings
+
+from login_app.prompt_prep import compact, input_budget, prepare_text, truncate
+from login_app.tokens import estimate_tokens
+
+
+class PromptPrepTests(SimpleTestCase):
+    def test_compact_removes_pdf_artifacts(self):
+        text = "Jane Doe\nBuilt pay-\nments APIs\n\n\n\nPage 1 of 2\nJane Doe\nLed   the team\nLed the team"
+        self.assertEqual(compact(text), "Jane Doe\nBuilt payments APIs\n\nLed the team")
+
+    def test_compact_keeps_repeated_bullets(self):
+        text = "Jane Doe\njane@example.com\nLondon\nACME\n- Wrote tests\n- Shipped features\nGLOBEX\n- Wrote tests\nEducation\nBSc\nMSc\nPhD"
+        self.assertEqual(compact(text).count("- Wrote tests"), 2)
+
+    def test_truncate_keeps_head_and_tail(self):
+        lines = [f"Line {n} of the resume" for n in range(200)]
+        text = truncate("\n".join(lines), 200)
+        self.assertLessEqual(estimate_tokens(text), 200)
+        self.assertTrue(text.startswith("Line 0 "))
+        self.assertTrue(text.endswith("Line 199 of the resume"))
+        self.assertIn("lines omitted to fit", text)
+        self.assertEqual(truncate("Short text", 200), "Short text")
+
+    @override_settings(PROMPT_BUDGETS={'MODEL_INPUT_TOKENS': {'small-model': 100}, 'DEFAULT_INPUT_TOKENS': 6000})
+    def test_budgets(self):
+        self.assertEqual(input_budget('small-model'), 100)
+        self.assertEqual(input_budget('groq/small-model'), 100)
+        self.assertEqual(input_budget('other-model'), 6000)
+
+        text = "\n".join(f"Built service number {n} in Python" for n in range(100))
+        with self.assertLogs('login_app.prompt_prep', 'WARNING'):
+            prepared = prepare_text(text, 'small-model', 'test', reserve_tokens=20)
+        self.assertTrue(prepared.truncated)
+        self.assertLessEqual(prepared.tokens_after, 80)
+        self.assertFalse(prepare_text(text, 'other-model', 'test').truncated)
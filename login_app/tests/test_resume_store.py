@@ -0,0 +1,70 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from login_app import resume_store
+from login_app.models import ResumeDocument
+
+from .test_headings import RESUME
+
+SECTIONS = [['Experience', 0, 20], ['Skills', 20, len(RESUME)]]
+
+
+class ResumeStoreTests(TestCase):
+    def setUp(self):
+        patch = mock.patch.object(resume_store, '_cache', None)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    async def save(self, content_hash='abc'):
+        return await resume_store.asave_document(content_hash, RESUME, ['Experience', 'Skills'], SECTIONS, "Context")
+
+    async def test_save_and_get(self):
+        saved = await self.save()
+        self.assertEqual(saved.sections, SECTIONS)
+        self.assertEqual([heading for heading, _ in saved.fingerprints][-2:], ['Experience', 'Skills'])
+        self.assertEqual(await resume_store.aget_document('abc'), saved)
+        self.assertIsNone(await resume_store.aget_document('missing'))
+        self.assertIsNone(await resume_store.aget_document(None))
+
+    async def test_reads_through_the_cache(self):
+        await self.save()
+        await ResumeDocument.objects.all().aupdate(context="Changed")
+        self.assertEqual((await resume_store.aget_document('abc')).context, "Context")
+        resume_store._cache.clear()
+        self.assertEqual((await resume_store.aget_document('abc')).context, "Changed")
+
+    async def test_touch(self):
+        self.assertIsNone(await resume_store.atouch_document('abc'))
+        await self.save()
+        last_week = timezone.now() - timedelta(days=7)
+        await ResumeDocument.objects.all().aupdate(last_used_at=last_week)
+        self.assertEqual((await resume_store.atouch_document('abc')).text, RESUME)
+        self.assertGreater((await ResumeDocument.objects.aget()).last_used_at, last_week)
+
+    def test_prune_command(self):
+        for content_hash in ('old', 'new'):
+            ResumeDocument.objects.create(content_hash=content_hash, text=RESUME, headings=[], sections=[], context="")
+        ResumeDocument.objects.filter(content_hash='old').update(last_used_at=timezone.now() - timedelta(days=31))
+        out = StringIO()
+        with self.assertLogs('login_app.resume_store', 'INFO'):
+            call_command('prune_resume_documents', stdout=out)
+        self.assertIn("Deleted 1 resume document(s).", out.getvalue())
+        self.assertEqual(list(ResumeDocument.objects.values_list('content_hash', flat=True)), ['new'])
+        self.assertEqual(resume_store.prune(max_age_days=0), 1)
+
+
+class ConcurrentUploadTests(TransactionTestCase):
+    # The unique constraint is hit outside a transaction, as in a request
+    async def test_saving_the_same_file_twice(self):
+        patch = mock.patch.object(resume_store, '_cache', None)
+        patch.start()
+        self.addCleanup(patch.stop)
+        for _ in range(2):
+            saved = await resume_store.asave_document('abc', RESUME, [], [], "")
+        self.assertEqual(saved.text, RESUME)
+        self.assertEqual(await ResumeDocument.objects.acount(), 1)
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from login_app.singleflight import Group
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_calls_share_one_result(self):
+        group = Group()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "answer"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(group.do('key', compute))) for _ in range(3)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        while group.stats()['shared'] < 2:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, ["answer"] * 3)
+        self.assertEqual(len(calls), 1)
+
+    def test_errors_reach_the_caller(self):
+        with self.assertRaises(ValueError):
+            Group().do('key', mock.Mock(side_effect=ValueError))
+
+    async def test_async_calls_share_one_result(self):
+        group = Group()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        self.assertEqual(await asyncio.gather(*[group.ado('key', compute) for _ in range(3)]), ["answer"] * 3)
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1,74 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from login_app.streaming import sse_event
+
+
+def parse_events(body):
+    """[(event, data), ...] from a text/event-stream body."""
+    events = []
+    for block in body.decode().strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+class SSEEventTests(SimpleTestCase):
+    def test_format(self):
+        self.assertEqual(sse_event('token', {'text': "a\nb"}), 'event: token\ndata: {"text": "a\\nb"}\n\n')
+        self.assertEqual(sse_event('done'), 'event: done\ndata: {}\n\n')
+
+
+@override_settings(CREW_JOBS={'IN_PROCESS_WORKERS': False})
+class ATSScannerStreamViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('jane')
+
+    async def post(self, **data):
+        await self.async_client.aforce_login(self.user)
+        data = {'resume_file': SimpleUploadedFile('resume.pdf', b"%PDF-1.4"), **data}
+        # No LLM brief for the pasted job description
+        with mock.patch('login_app.views.extract_text_from_pdf', return_value="Python developer"), \
+                mock.patch('login_app.job_profiles.generate_brief_in_background'):
+            response = await self.async_client.post(reverse('ats_scanner_stream'), data)
+        if not response.streaming:
+            return response, None
+        return response, parse_events(b"".join([chunk async for chunk in response.streaming_content]))
+
+    async def test_streams_the_evaluation(self):
+        async def evaluation(*args, **kwargs):
+            yield "Match: "
+            yield "80%"
+
+        with mock.patch('login_app.views.astream_ats_evaluation', evaluation):
+            response, events = await self.post(job_description="Python and Django developer", ats_match="1")
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(events, [
+            ('meta', {'title': "ATS Percentage Match"}),
+            ('token', {'text': "Match: "}),
+            ('token', {'text': "80%"}),
+            ('done', {}),
+        ])
+
+    async def test_reports_failures_as_an_error_event(self):
+        async def evaluation(*args, **kwargs):
+            yield "Partial"
+            raise RuntimeError("model unavailable")
+
+        with mock.patch('login_app.views.astream_ats_evaluation', evaluation):
+            response, events = await self.post(job_description="Python developer")
+        self.assertEqual(events[0], ('meta', {'title': "HR Manager's Evaluation"}))
+        self.assertEqual(events[-2:], [('error', {'message': "Error evaluating resume: model unavailable"}), ('done', {})])
+
+    async def test_rejects_incomplete_input(self):
+        response, events = await self.post()
+        self.assertEqual(response.status_code, 400)
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('ats_scanner_stream'))
+        self.assertEqual(response.status_code, 405)
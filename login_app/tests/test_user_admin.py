@@ -0,0 +1,86 @@
+import csv
+import io
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from login_app.user_admin import EXPORT_FIELDS, export_rows, get_page, search_users
+
+
+class UserPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f"user{n}", f"user{n}@example.com") for n in range(5)]
+
+    def ids(self, page):
+        return [user.id for user in page.users]
+
+    def test_walks_forwards_and_back(self):
+        ids = [user.id for user in self.users]
+        first = get_page(User.objects.all(), page_size=2)
+        self.assertEqual(self.ids(first), ids[:2])
+        self.assertIsNone(first.previous_before)
+        self.assertEqual(first.next_after, ids[1])
+
+        second = get_page(User.objects.all(), after=first.next_after, page_size=2)
+        self.assertEqual(self.ids(second), ids[2:4])
+        self.assertEqual(second.previous_before, ids[2])
+
+        last = get_page(User.objects.all(), after=second.next_after, page_size=2)
+        self.assertEqual(self.ids(last), ids[4:])
+        self.assertIsNone(last.next_after)
+
+        back = get_page(User.objects.all(), before=last.previous_before, page_size=2)
+        self.assertEqual(self.ids(back), ids[2:4])
+        self.assertEqual(back.previous_before, ids[2])
+        first_again = get_page(User.objects.all(), before=back.previous_before, page_size=2)
+        self.assertEqual(self.ids(first_again), ids[:2])
+        self.assertIsNone(first_again.previous_before)
+
+    def test_exact_last_page_and_empty_results(self):
+        page = get_page(User.objects.all(), after=self.users[0].id, page_size=4)
+        self.assertEqual(len(page.users), 4)
+        self.assertIsNone(page.next_after)
+        empty = get_page(User.objects.none(), page_size=2)
+        self.assertEqual(empty, ([], None, None))
+        self.assertEqual(get_page(User.objects.all(), before=self.users[0].id, page_size=2), ([], None, None))
+
+    def test_search_matches_prefixes_case_insensitively(self):
+        User.objects.create_user("Alice", "alice@corp.example")
+        self.assertEqual([user.username for user in search_users("ALI")], ["Alice"])
+        self.assertEqual([user.username for user in search_users("alice@")], ["Alice"])
+        self.assertEqual(search_users("").count(), 6)
+        self.assertFalse(search_users("lice").exists())
+
+
+@override_settings(USER_ADMIN={'EXPORT_CHUNK_SIZE': 2}, CREW_JOBS={'IN_PROCESS_WORKERS': False})
+class ExportUsersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com')
+        for n in range(4):
+            User.objects.create_user(f"user{n}", f"user{n}@example.com")
+
+    def test_export_rows(self):
+        rows = list(csv.reader(io.StringIO("".join(export_rows(User.objects.all())))))
+        self.assertEqual(rows[0], list(EXPORT_FIELDS))
+        self.assertEqual([row[1] for row in rows[1:]], ['admin', 'user0', 'user1', 'user2', 'user3'])
+
+    def test_view_streams_matching_users(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('export_users'), {'q': 'user1'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="users.csv"')
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual([row[1] for row in rows], ['username', 'user1'])
+
+    async def test_async_view_streams_matching_users(self):
+        await self.async_client.aforce_login(self.admin)
+        response = await self.async_client.get(reverse('export_users'), {'q': 'user'})
+        body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertEqual(len(body.splitlines()), 5)
+
+    def test_needs_admin(self):
+        self.client.force_login(User.objects.get(username='user0'))
+        self.assertEqual(self.client.get(reverse('export_users')).status_code, 302)
@@ -0,0 +1,70 @@
+# login_app/tokens.py
+
+# Cheap token estimates for prompts, counters of how many input tokens
+# trimming prompts saved, and of the tokens each crew pipeline used.
+# Estimates use the ~4 characters per token rule of thumb for English text,
+# which is close enough for budgeting and reporting without loading a tokenizer.
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Returns the approximate number of tokens text will use."""
+    if not text:
+        return 0
+    return max(1, round(len(text) / CHARS_PER_TOKEN))
+
+
+_lock = threading.Lock()
+_savings = {}
+
+
+def record_saving(endpoint: str, full_tokens: int, sent_tokens: int) -> int:
+    """
+    Records the input tokens one request sent, against what the untrimmed prompt would have used.
+
+    Args:
+        endpoint (str): Which feature sent the prompt, e.g. 'section_enhancer'.
+        full_tokens (int): Estimated tokens of the untrimmed prompt.
+        sent_tokens (int): Estimated tokens actually sent.
+
+    Returns:
+        int: The tokens saved by this request.
+    """
+    saved = max(full_tokens - sent_tokens, 0)
+    with _lock:
+        totals = _savings.setdefault(endpoint, {'requests': 0, 'full_tokens': 0, 'sent_tokens': 0, 'saved_tokens': 0})
+        totals['requests'] += 1
+        totals['full_tokens'] += full_tokens
+        totals['sent_tokens'] += sent_tokens
+        totals['saved_tokens'] += saved
+    logger.info("%s: sent ~%d input tokens, saved ~%d", endpoint, sent_tokens, saved)
+    return saved
+
+
+def stats():
+    with _lock:
+        return {endpoint: dict(totals) for endpoint, totals in _savings.items()}
+
+
+_usage = {}
+
+
+def record_usage(endpoint: str, prompt_tokens: int, completion_tokens: int):
+    """Adds one run's prompt and completion tokens to endpoint's totals (e.g. 'crew_fast')."""
+    with _lock:
+        totals = _usage.setdefault(endpoint, {'runs': 0, 'prompt_tokens': 0, 'completion_tokens': 0})
+        totals['runs'] += 1
+        totals['prompt_tokens'] += prompt_tokens
+        totals['completion_tokens'] += completion_tokens
+    logger.info("%s: used ~%d prompt and ~%d completion tokens", endpoint, prompt_tokens, completion_tokens)
+
+
+def usage_stats():
+    with _lock:
+        return {endpoint: dict(totals) for endpoint, totals in _usage.items()}
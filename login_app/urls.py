@@ -10,11 +10,26 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('admin-page/', views.admin_page_view, name='admin_page'),
     path('manage-users/', views.manage_users_view, name='manage_users'),
+    path('manage-users/export.csv', views.export_users_view, name='export_users'),
     path('add-user/', views.add_user_view, name='add_user'),
     path('edit-user/<int:user_id>/', views.edit_user_view, name='edit_user'),
     path('delete-user/<int:user_id>/', views.delete_user_view, name='delete_user'),
     path('resume-enhancer/', views.resume_enhancer_view, name='resume_enhancer'),
+    # Queued crew runs: result page, JSON status, progress stream and cancellation
+    path('resume-enhancer/jobs/<uuid:job_id>/', views.resume_enhancer_job_view, name='resume_enhancer_job'),
+    path('resume-enhancer/jobs/<uuid:job_id>/status/', views.resume_enhancer_job_status_view, name='resume_enhancer_job_status'),
+    path('resume-enhancer/jobs/<uuid:job_id>/events/', views.resume_enhancer_job_events_view, name='resume_enhancer_job_events'),
+    path('resume-enhancer/jobs/<uuid:job_id>/cancel/', views.resume_enhancer_job_cancel_view, name='resume_enhancer_job_cancel'),
     path('section/', views.section_enhancer_view, name='section'),
     # New URL for the ATS functionality
     path('ats-scanner/', views.ats_scanner_view, name='ats_scanner'),
+    # Bulk screening: many resumes against one job description, with CSV download
+    path('ats-scanner/bulk/', views.bulk_screening_view, name='bulk_screening'),
+    path('ats-scanner/bulk/<str:token>.csv', views.bulk_screening_download_view, name='bulk_screening_download'),
+    # Streaming (Server-Sent Events) versions of the AI views
+    path('section/stream/', views.section_enhancer_stream_view, name='section_stream'),
+    path('section/enhance-all/stream/', views.section_enhance_all_stream_view, name='section_enhance_all_stream'),
+    path('ats-scanner/stream/', views.ats_scanner_stream_view, name='ats_scanner_stream'),
+    # Prometheus metrics (admin only)
+    path('metrics', views.metrics_view, name='metrics'),
 ]
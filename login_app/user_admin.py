@@ -0,0 +1,128 @@
+# login_app/user_admin.py
+
+# Queries behind the admin user management page. The page used to render
+# every user at once; it now shows one page at a time with keyset (id) cursors,
+# which cost the same on page 1 and page 1000, loads only the columns the
+# table shows, and searches username/email by prefix on their lowercased
+# values, which migration 0004 indexes. The CSV export streams users straight
+# from a database cursor, so its memory use doesn't depend on how many there are.
+
+import csv
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+DEFAULTS = {
+    'PAGE_SIZE': 50,
+    'EXPORT_CHUNK_SIZE': 2000,  # rows fetched from the database cursor at a time
+}
+
+# Columns the user table shows (plus the id used as the cursor)
+LIST_FIELDS = ('id', 'username', 'email', 'last_login')
+
+EXPORT_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name',
+    'is_active', 'is_staff', 'is_superuser', 'date_joined', 'last_login',
+)
+
+
+def get_config():
+    """Returns the USER_ADMIN settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'USER_ADMIN', {})}
+
+
+# users: the page, in id order; next_after / previous_before: cursors for the
+# neighbouring pages, or None at either end.
+UserPage = namedtuple('UserPage', ['users', 'next_after', 'previous_before'])
+
+
+def _prefix_range(prefix):
+    # Everything starting with prefix sorts between prefix and prefix with its last character bumped.
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def search_users(query=""):
+    """
+    Returns users whose username or email starts with query (case-insensitive),
+    or all users for an empty query. The prefix is matched as a range on
+    LOWER(username) / LOWER(email) so the expression indexes can be used.
+    """
+    users = User.objects.all()
+    query = query.strip().lower()
+    if not query:
+        return users
+    low, high = _prefix_range(query)
+    return users.alias(username_lower=Lower('username'), email_lower=Lower('email')).filter(
+        Q(username_lower__gte=low, username_lower__lt=high) | Q(email_lower__gte=low, email_lower__lt=high)
+    )
+
+
+def get_page(users, after=None, before=None, page_size=None):
+    """
+    Returns one UserPage of users ordered by id.
+
+    Args:
+        users (QuerySet): Usually from search_users.
+        after (int): Show the users after this id (the next page).
+        before (int): Show the users before this id (the previous page).
+        page_size (int): Defaults to USER_ADMIN['PAGE_SIZE'].
+
+    Returns:
+        UserPage
+    """
+    page_size = page_size or get_config()['PAGE_SIZE']
+    users = users.only(*LIST_FIELDS)
+    if before is not None:
+        # Walk backwards from the cursor, then put the page back in id order.
+        rows = list(users.filter(id__lt=before).order_by('-id')[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        return UserPage(rows, rows[-1].id if rows else None, rows[0].id if rows and has_more else None)
+
+    if after is not None:
+        users = users.filter(id__gt=after)
+    rows = list(users.order_by('id')[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    return UserPage(
+        rows,
+        rows[-1].id if rows and has_more else None,
+        rows[0].id if rows and after is not None else None,
+    )
+
+
+class _Echo:
+    """A file-like object whose write() returns the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _export_queryset(users):
+    return users.order_by('id').only(*EXPORT_FIELDS)
+
+
+def export_rows(users):
+    """
+    Yields the users as CSV lines (header first), reading them from a
+    database cursor in EXPORT_CHUNK_SIZE batches.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for user in _export_queryset(users).iterator(chunk_size=get_config()['EXPORT_CHUNK_SIZE']):
+        yield writer.writerow([getattr(user, field) for field in EXPORT_FIELDS])
+
+
+async def aexport_rows(users):
+    """
+    Async version of export_rows(), for ASGI servers: they collect a
+    synchronous iterator in full before sending it.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    # Model instances rather than values_list(): its aiterator() runs the query before the first await.
+    async for user in _export_queryset(users).aiterator(chunk_size=get_config()['EXPORT_CHUNK_SIZE']):
+        yield writer.writerow([getattr(user, field) for field in EXPORT_FIELDS])
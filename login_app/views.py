@@ -1,28 +1,115 @@
 # login_app/views.py
 
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
-from django.urls import reverse_lazy
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import reverse
+from django.http import Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.conf import settings
 from django.utils.safestring import mark_safe
 from asgiref.sync import sync_to_async
 from myapp.urls import urlpatterns
 from myapp.views import index  # Importing index view from myapp
 
-import tempfile # Added import
-import os # Added import
+import asyncio
+import uuid
 
 # Import the crewAI functionality from our agents file
-from .agents import run_crew
+from .agents import CREW_MODES, CREW_STAGES
 
 # Import the new section functions directly from section.py
-from .section import get_headings_from_pdf, get_enhanced_section
+from .section import (
+    get_resume_sections, build_resume_context, prepare_section_request, enhance_section,
+    astream_enhanced_section, aenhance_sections,
+)
 
 # New import for the ATS functionality
-from .ats_service import extract_text_from_pdf, generate_ats_evaluation
+from .ats_service import extract_text_from_pdf, agenerate_ats_evaluation, astream_ats_evaluation, is_error_response
+
+# Shared PDF extraction (no tempfiles, cached by content hash)
+from .pdf_extract import content_hash, read_upload
+
+# Parsed resumes, shared by content hash; the session only keeps the hash
+from .resume_store import SESSION_KEY as RESUME_SESSION_KEY, aget_document, asave_document, atouch_document
+
+# Section fingerprints: what changed since the previous upload
+from .incremental import diff_sections
+
+# Bounded worker pool for blocking LLM calls made from async views
+from .llm_executor import run_llm
+
+# Background queue for the resume enhancement crew
+from .jobs import cancel_crew_job, submit_crew_job
+from .models import CrewJob, JobDescription
+
+# Saved job descriptions with precomputed keywords and a short requirements brief
+from .job_profiles import get_or_create_job_description, prompt_text
+
+# Idempotency keys: a repeated form submission gets the first one's result
+from .idempotency import aremember, get_key as get_idempotency_key, new_key as new_idempotency_key
+
+# Server-Sent Events helpers for the streaming endpoints
+from .streaming import sse_response
+
+# Input token accounting for trimmed prompts
+from .tokens import record_saving
+
+# Per-stage timings (Server-Timing header, /metrics); render is django's, timed as the 'template' stage
+from .instrumentation import render, render_metrics
+
+# Paginated user management: keyset pages, prefix search, streaming CSV export
+from .user_admin import aexport_rows, export_rows, get_page, search_users
+
+# Bulk ATS screening (many resumes, one job description)
+from .bulk_screening import BulkScreeningError, collect_uploaded_pdfs, get_config as get_bulk_config, screen_resumes, to_csv
+
+# How often the job events stream checks the database for progress (seconds)
+JOB_EVENTS_POLL_INTERVAL = 0.5
+
+# Helper to read the per-request cache bypass flag ("Regenerate" checkbox or ?refresh=1)
+def use_llm_cache(request):
+    return not (request.POST.get('refresh') or request.GET.get('refresh'))
+
+# Helper for the ATS "Add AI final thoughts" checkbox; the match score itself is computed locally
+def want_final_thoughts(request):
+    return 'final_thoughts' in request.POST
+
+# The resume last uploaded to the section enhancer (a ResumeData), or None
+async def session_resume(request):
+    return await aget_document(request.session.get(RESUME_SESSION_KEY))
+
+# Builds the prepared section requests (section slice + summary) for headings of a stored resume
+def section_requests_for(resume, headings):
+    section_requests = []
+    for heading in headings:
+        section_request = prepare_section_request(resume.text, heading, resume.sections, resume.context)
+        record_saving('section_enhancer', section_request.full_tokens, section_request.sent_tokens)
+        section_requests.append(section_request)
+    return section_requests
+
+# Saved job description profiles, reused across resumes
+async def saved_job_descriptions(request):
+    user = await request.auser()
+    return [jd async for jd in JobDescription.objects.filter(user=user).only('id', 'title')[:50]]
+
+# The JD picked from the saved list, or the pasted text saved as a new profile; None if neither was given
+async def job_description_from_post(request):
+    user = await request.auser()
+    job_description_id = request.POST.get('job_description_id', '')
+    if job_description_id.isdigit():
+        job_description = await JobDescription.objects.filter(pk=job_description_id, user=user).afirst()
+        if job_description is not None:
+            return job_description
+    text = request.POST.get('job_description', '').strip()
+    if not text:
+        return None
+    return await sync_to_async(get_or_create_job_description)(user, text)
 
 # Helper function to check if a user is a superuser (admin)
 def is_admin(user):
@@ -87,33 +174,101 @@ async def resume_enhancer_view(request):
     if await is_user_superuser(request.user):
         return redirect('admin_page')
 
-    context = {}
+    context = {
+        'job_descriptions': await saved_job_descriptions(request),
+        'crew_modes': CrewJob.MODE_CHOICES,
+        'idempotency_key': new_idempotency_key(),
+    }
     if request.method == 'POST':
         resume_text = request.POST.get('resume', '')
-        job_description_text = request.POST.get('job_description', '')
-        
-        context = {
-            'resume_text': resume_text,
-            'job_description_text': job_description_text
-        }
+        job_description = await job_description_from_post(request)
+        job_description_text = job_description.text if job_description else ''
+        # Thorough (full crew), balanced (parallel analysis) or quick (single pass)
+        mode = request.POST.get('mode', 'full')
+        if mode not in CREW_MODES:
+            mode = 'full'
+
+        # The crew runs in a background worker; this request only queues it.
+        # A double click or refresh finds the job the first submission queued.
+        job = await sync_to_async(submit_crew_job)(
+            request.user, resume_text, job_description_text, use_cache=use_llm_cache(request), job_description=job_description,
+            mode=mode, idempotency_key=get_idempotency_key(request),
+        )
+        if 'application/json' in request.headers.get('Accept', ''):
+            # The page stays open, so its form needs a new key for the next submission.
+            return JsonResponse({**crew_job_payload(job), 'next_idempotency_key': new_idempotency_key()}, status=202)
+        return redirect('resume_enhancer_job', job_id=job.id)
 
-        try:
-            final_result = await sync_to_async(run_crew, thread_sensitive=True)(resume_text, job_description_text)
-            formatted_result = final_result.replace('\n', '<br>')
-            context['result'] = mark_safe(formatted_result)
+    return render(request, 'resume_enhancer.html', context)
 
-        except Exception as e:
-            print(f"Error during agent execution: {e}")
-            context['error'] = "Sorry, we encountered an error while enhancing your resume. Please try again later."
-        
-        return render(request, 'resume_enhancer.html', context)
 
+def crew_job_error(job):
+    if job.status == CrewJob.STATUS_FAILED:
+        return "Sorry, we encountered an error while enhancing your resume. Please try again later."
+    if job.status == CrewJob.STATUS_CANCELLED:
+        return "This enhancement was cancelled."
+    return ''
+
+
+def crew_job_payload(job):
+    return {
+        'id': str(job.id),
+        'status': job.status,
+        'stage': job.stage,
+        'mode': job.mode,
+        'result': job.result if job.status == CrewJob.STATUS_SUCCEEDED else '',
+        # Latency and token use of the finished run
+        'seconds': job.seconds,
+        'prompt_tokens': job.prompt_tokens,
+        'completion_tokens': job.completion_tokens,
+        'error': crew_job_error(job),
+        'page_url': reverse('resume_enhancer_job', args=[job.id]),
+        'status_url': reverse('resume_enhancer_job_status', args=[job.id]),
+        'events_url': reverse('resume_enhancer_job_events', args=[job.id]),
+        'cancel_url': reverse('resume_enhancer_job_cancel', args=[job.id]),
+    }
+
+# Page for one queued crew run; shows progress until the result is ready
+@login_required(login_url='/')
+def resume_enhancer_job_view(request, job_id):
+    job = get_object_or_404(CrewJob, id=job_id, user=request.user)
+    context = {
+        'job': job,
+        'crew_modes': CrewJob.MODE_CHOICES,
+        'idempotency_key': new_idempotency_key(),
+        'job_payload': crew_job_payload(job),
+        'resume_text': job.resume_text,
+        'job_description_text': job.job_description_text,
+    }
+    if job.status == CrewJob.STATUS_SUCCEEDED:
+        context['result'] = mark_safe(job.result.replace('\n', '<br>'))
+    elif job.status in (CrewJob.STATUS_FAILED, CrewJob.STATUS_CANCELLED):
+        # run_job has logged the failure
+        context['error'] = crew_job_error(job)
     return render(request, 'resume_enhancer.html', context)
 
+# JSON status of a crew run, for polling
+@login_required(login_url='/')
+def resume_enhancer_job_status_view(request, job_id):
+    job = get_object_or_404(CrewJob, id=job_id, user=request.user)
+    return JsonResponse(crew_job_payload(job))
+
+# Stops a queued or running crew run; the worker drops its LLM calls within a couple of seconds
+@login_required(login_url='/')
+def resume_enhancer_job_cancel_view(request, job_id):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    job = get_object_or_404(CrewJob, id=job_id, user=request.user)
+    cancel_crew_job(job.id, request.user)
+    if 'application/json' in request.headers.get('Accept', ''):
+        job.refresh_from_db()
+        return JsonResponse(crew_job_payload(job))
+    return redirect('resume_enhancer_job', job_id=job.id)
+
 
 @login_required(login_url='/')
 async def section_enhancer_view(request):
-    context = {}
+    context = {'idempotency_key': new_idempotency_key()}
 
     if request.method == 'POST':
         # Handle PDF upload
@@ -123,33 +278,67 @@ async def section_enhancer_view(request):
                 messages.error(request, "Please upload a PDF file.")
                 return render(request, 'section.html', context)
 
-            # Save the uploaded file to a temporary location
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                for chunk in uploaded_file.chunks():
-                    tmp_file.write(chunk)
-                tmp_file_path = tmp_file.name
-
             try:
-                # Call the function from section.py
-                headings, doc_content = await sync_to_async(get_headings_from_pdf, thread_sensitive=True)(tmp_file_path)
-                request.session['full_resume_content'] = doc_content # Store in session
-                request.session['extracted_headings'] = headings
-                context['headings'] = headings
+                # Parsed straight from the uploaded bytes; the text is cached by content hash
+                pdf_data = await sync_to_async(read_upload, thread_sensitive=False)(uploaded_file)
+                resume_hash = content_hash(pdf_data)
+                previous = await session_resume(request)
+                # A file uploaded before (by anyone) is already parsed
+                resume = await atouch_document(resume_hash)
+                if resume is None:
+                    # Call the function from section.py
+                    # Headings come from the PDF layout; the LLM is only asked when that is inconclusive
+                    # (or not at all, when this is an edited version of the previous upload)
+                    result = await run_llm(
+                        'section_headings', get_resume_sections, pdf_data,
+                        previous_headings=previous.headings if previous else None,
+                    )
+                    # Short summary sent with each section instead of the whole resume
+                    resume = await asave_document(
+                        resume_hash, result.text, result.headings, result.sections,
+                        build_resume_context(result.text, result.sections),
+                    )
+                # Only the hash goes in the session; the text stays in the resume store
+                request.session[RESUME_SESSION_KEY] = resume.content_hash
+                context['headings'] = resume.headings
                 context['resume_uploaded'] = True # Flag to show headings section
+                # Which sections differ from the previous upload; only those need enhancing again
+                if previous is not None and previous.fingerprints and resume.fingerprints:
+                    context['section_diff'] = diff_sections(previous.fingerprints, resume.fingerprints)
             except Exception as e:
                 messages.error(request, f"Error processing PDF: {e}")
-            finally:
-                # Clean up the temporary file
-                if os.path.exists(tmp_file_path):
-                    os.unlink(tmp_file_path)
+
+        # Handle "Enhance all sections": every heading is enhanced concurrently
+        elif 'enhance_all' in request.POST:
+            resume = await session_resume(request)
+            if resume is None or not resume.text or not resume.headings:
+                messages.error(request, "Please upload a resume first.")
+                return render(request, 'section.html', context)
+
+            headings = resume.headings
+            context['headings'] = headings
+            context['resume_uploaded'] = True
+
+            async def enhance_all():
+                results = {}
+                async for heading, result, error in aenhance_sections(section_requests_for(resume, headings), use_cache=use_llm_cache(request)):
+                    results[heading] = {'heading': heading, 'text': result, 'error': error}
+                # Shown in resume order, not completion order
+                return [results[heading] for heading in headings if heading in results]
+
+            # A section that failed is enhanced again on a retry
+            context['enhanced_sections'] = await aremember(
+                request, f"section_all:{resume.content_hash}", enhance_all,
+                keep=lambda sections: not any(section['error'] for section in sections),
+            )
 
         # Handle section enhancement request (when a heading is clicked)
         elif 'selected_heading' in request.POST:
             selected_heading = request.POST.get('selected_heading')
-            full_resume_content = request.session.get('full_resume_content')
-            headings = request.session.get('extracted_headings')
+            resume = await session_resume(request)
+            headings = resume.headings if resume else None
 
-            if not full_resume_content or not selected_heading:
+            if resume is None or not resume.text or not selected_heading:
                 messages.error(request, "Please upload a resume and select a heading first.")
                 context['headings'] = headings # Keep headings visible if they were there
                 context['resume_uploaded'] = True # Keep this flag true
@@ -161,47 +350,62 @@ async def section_enhancer_view(request):
 
             try:
                 # Call the function from section.py
-                enhanced_result = await sync_to_async(get_enhanced_section, thread_sensitive=True)(full_resume_content, selected_heading)
+                # Only the selected section (plus a short summary) is sent to the model
+                section_request = prepare_section_request(resume.text, selected_heading, resume.sections, resume.context)
+                enhanced_result = await aremember(
+                    request, f"section:{resume.content_hash}:{selected_heading}",
+                    lambda: run_llm('section_enhancer', enhance_section, section_request, use_cache=use_llm_cache(request)),
+                )
                 context['enhanced_section_result'] = enhanced_result
+                context['tokens_saved'] = record_saving('section_enhancer', section_request.full_tokens, section_request.sent_tokens)
             except Exception as e:
                 messages.error(request, f"Error enhancing section: {e}")
 
-    # For initial GET request or after POST, retrieve existing session data if any
-    if 'extracted_headings' in request.session:
-        context['headings'] = request.session['extracted_headings']
-        context['resume_uploaded'] = True
-    if 'full_resume_content' in request.session and 'extracted_headings' in request.session:
-        context['resume_uploaded'] = True # Ensure this is true if any data is in session
+    # For initial GET request or after POST, show the resume referenced by the session, if any
+    if not context.get('headings'):
+        resume = await session_resume(request)
+        if resume is not None:
+            context['headings'] = resume.headings
+            context['resume_uploaded'] = True
 
 
     return render(request, 'section.html', context)
 
-# New view for the ATS Resume Scanner
+# New view for the ATS Resume Scanner - asynchronous, on the shared AsyncGroq client
 @login_required(login_url='/')
-def ats_scanner_view(request):
-    context = {}
+async def ats_scanner_view(request):
+    context = {'idempotency_key': new_idempotency_key()}
     if request.method == 'POST':
-        job_description = request.POST.get('job_description', '')
+        job_description = await job_description_from_post(request)
         
         # Check if a file was uploaded and get the 'file' from the request
         if 'resume_file' in request.FILES and job_description:
             uploaded_file = request.FILES['resume_file']
             try:
                 # Call the refactored logic from ats_service.py
-                resume_text = extract_text_from_pdf(uploaded_file)
+                resume_text = await sync_to_async(extract_text_from_pdf, thread_sensitive=False)(uploaded_file)
                 
                 # Determine which button was clicked
+                # The prompt carries the JD's short brief; the local score uses its precomputed keywords
+                # A repeated submission (same idempotency key and inputs) gets the first one's answer
+                submission = f"{job_description.pk}:{content_hash(resume_text.encode('utf-8'))}"
                 if 'hr_review' in request.POST:
-                    response = generate_ats_evaluation(resume_text, job_description, 'hr_review')
+                    response = await aremember(request, f"ats:hr_review:{submission}", lambda: agenerate_ats_evaluation(
+                        resume_text, prompt_text(job_description), 'hr_review', use_cache=use_llm_cache(request),
+                    ), keep=lambda response: not is_error_response(response))
                     context['response'] = mark_safe(response.replace('\n', '<br>'))
                     context['title'] = "HR Manager's Evaluation"
                 elif 'ats_match' in request.POST:
-                    response = generate_ats_evaluation(resume_text, job_description, 'ats_match')
+                    response = await aremember(request, f"ats:ats_match:{submission}", lambda: agenerate_ats_evaluation(
+                        resume_text, prompt_text(job_description), 'ats_match', use_cache=use_llm_cache(request),
+                        final_thoughts=want_final_thoughts(request), keywords=job_description.keywords,
+                    ), keep=lambda response: not is_error_response(response))
                     context['response'] = mark_safe(response.replace('\n', '<br>'))
                     context['title'] = "ATS Percentage Match"
 
                 # Keep the form values
-                context['job_description'] = job_description
+                context['job_description'] = request.POST.get('job_description', '')
+                context['selected_job_description'] = job_description.pk
             
             except FileNotFoundError:
                 messages.error(request, "Please upload a valid PDF resume.")
@@ -210,8 +414,205 @@ def ats_scanner_view(request):
         else:
             messages.error(request, "Please upload a resume and provide a job description.")
 
+    context['job_descriptions'] = await saved_job_descriptions(request)
     return render(request, 'ats_scanner.html', context)
 
+# Bulk ATS screening: rank many resumes against one job description
+@login_required(login_url='/')
+async def bulk_screening_view(request):
+    config = get_bulk_config()
+    context = {'top_n': config['TOP_N']}
+    if request.method == 'POST':
+        job_description = request.POST.get('job_description', '')
+        uploaded_files = request.FILES.getlist('resume_files')
+        context['job_description'] = job_description
+        try:
+            context['top_n'] = max(0, int(request.POST.get('top_n', config['TOP_N'])))
+        except ValueError:
+            pass
+
+        if not uploaded_files or not job_description:
+            messages.error(request, "Please upload resumes and provide a job description.")
+            return render(request, 'bulk_screening.html', context)
+
+        try:
+            items = await sync_to_async(collect_uploaded_pdfs, thread_sensitive=False)(uploaded_files)
+            if not items:
+                messages.error(request, "No PDF files were found in the upload.")
+                return render(request, 'bulk_screening.html', context)
+            result = await run_llm(
+                'bulk_screening', screen_resumes, items, job_description,
+                top_n=context['top_n'], use_cache=use_llm_cache(request),
+            )
+        except BulkScreeningError as e:
+            messages.error(request, str(e))
+            return render(request, 'bulk_screening.html', context)
+        except Exception as e:
+            messages.error(request, f"An error occurred: {e}")
+            return render(request, 'bulk_screening.html', context)
+
+        # Keep the CSV for a while so the table can be downloaded without screening again
+        download_token = uuid.uuid4().hex
+        user = await request.auser()
+        await cache.aset(f"bulk-screening:{user.pk}:{download_token}", to_csv(result), config['RESULT_TTL'])
+        context.update({
+            'candidates': result.candidates,
+            'timings': result.timings,
+            'resumes_per_second': result.resumes_per_second,
+            'download_token': download_token,
+        })
+
+    return render(request, 'bulk_screening.html', context)
+
+
+@login_required(login_url='/')
+def bulk_screening_download_view(request, token):
+    csv_text = cache.get(f"bulk-screening:{request.user.pk}:{token}")
+    if csv_text is None:
+        raise Http404("This screening result has expired. Please run the screening again.")
+    response = HttpResponse(csv_text, content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="ats-screening.csv"'
+    return response
+
+# --- Streaming (Server-Sent Events) endpoints ---
+# These mirror the views above but send output as the model produces it.
+
+async def resume_enhancer_job_events_view(request, job_id):
+    # Pushes a crew job's progress: the running stage, new output text and the final status
+    user = await request.auser()
+    if not user.is_authenticated or not await CrewJob.objects.filter(id=job_id, user=user).aexists():
+        return JsonResponse({'error': "Job not found."}, status=404)
+
+    async def events():
+        try:
+            async for event in job_events():
+                yield event
+        finally:
+            # Closed tab or lost connection: the job is cancelled unless a page
+            # follows it again within CREW_JOBS['ABANDON_AFTER'] (see jobs.py).
+            await CrewJob.objects.filter(
+                id=job_id, status__in=(CrewJob.STATUS_PENDING, CrewJob.STATUS_RUNNING),
+            ).aupdate(abandoned_at=timezone.now())
+
+    async def job_events():
+        sent, stage = 0, None
+        while True:
+            job = await CrewJob.objects.filter(id=job_id).only(
+                'status', 'stage', 'result', 'mode', 'started_at', 'finished_at', 'prompt_tokens', 'completion_tokens',
+                'abandoned_at',
+            ).aget()
+            if job.abandoned_at is not None:
+                # Followed again (e.g. the page was reloaded), or by another tab.
+                await CrewJob.objects.filter(id=job_id).aupdate(abandoned_at=None)
+            if job.stage and job.stage != stage:
+                stage = job.stage
+                for earlier in CREW_STAGES[:CREW_STAGES.index(stage)]:
+                    yield 'stage', {'stage': earlier, 'status': 'done'}
+                yield 'stage', {'stage': stage, 'status': 'running'}
+            if len(job.result) < sent:
+                # The job was retried and is producing its output again.
+                yield 'reset', {}
+                sent = 0
+            if len(job.result) > sent:
+                yield 'token', {'text': job.result[sent:]}
+                sent = len(job.result)
+            if job.is_finished:
+                payload = crew_job_payload(job)
+                if job.status == CrewJob.STATUS_SUCCEEDED:
+                    for name in CREW_STAGES:
+                        yield 'stage', {'stage': name, 'status': 'done'}
+                else:
+                    yield 'error', {'message': payload['error']}
+                yield 'done', {key: payload[key] for key in ('status', 'mode', 'seconds', 'prompt_tokens', 'completion_tokens')}
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+
+    return sse_response(events())
+
+
+@login_required(login_url='/')
+async def section_enhancer_stream_view(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    selected_heading = request.POST.get('selected_heading')
+    resume = await session_resume(request)
+    if resume is None or not resume.text or not selected_heading:
+        return JsonResponse({'error': "Please upload a resume and select a heading first."}, status=400)
+    use_cache = use_llm_cache(request)
+    section_request = prepare_section_request(resume.text, selected_heading, resume.sections, resume.context)
+    tokens_saved = record_saving('section_enhancer', section_request.full_tokens, section_request.sent_tokens)
+
+    async def events():
+        yield 'meta', {'heading': selected_heading, 'tokens_saved': tokens_saved}
+        try:
+            async for piece in astream_enhanced_section(section_request, use_cache=use_cache):
+                yield 'token', {'text': piece}
+        except Exception as e:
+            yield 'error', {'message': f"Error enhancing section: {e}"}
+        yield 'done', {}
+
+    return sse_response(events())
+
+
+@login_required(login_url='/')
+async def section_enhance_all_stream_view(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    resume = await session_resume(request)
+    if resume is None or not resume.text or not resume.headings:
+        return JsonResponse({'error': "Please upload a resume first."}, status=400)
+    headings = resume.headings
+    section_requests = section_requests_for(resume, headings)
+    use_cache = use_llm_cache(request)
+
+    async def events():
+        yield 'meta', {'headings': headings}
+        async for heading, result, error in aenhance_sections(section_requests, use_cache=use_cache):
+            if error is None:
+                yield 'section', {'heading': heading, 'text': result}
+            else:
+                yield 'section_error', {'heading': heading, 'message': f"Error enhancing section: {error}"}
+        yield 'done', {}
+
+    return sse_response(events())
+
+
+@login_required(login_url='/')
+async def ats_scanner_stream_view(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    job_description = await job_description_from_post(request)
+    if 'resume_file' not in request.FILES or not job_description:
+        return JsonResponse({'error': "Please upload a resume and provide a job description."}, status=400)
+    try:
+        resume_text = await sync_to_async(extract_text_from_pdf, thread_sensitive=False)(request.FILES['resume_file'])
+    except Exception:
+        return JsonResponse({'error': "Please upload a valid PDF resume."}, status=400)
+
+    if 'ats_match' in request.POST:
+        prompt_type, title = 'ats_match', "ATS Percentage Match"
+    else:
+        prompt_type, title = 'hr_review', "HR Manager's Evaluation"
+    use_cache = use_llm_cache(request)
+    final_thoughts = want_final_thoughts(request)
+
+    async def events():
+        yield 'meta', {'title': title}
+        try:
+            async for piece in astream_ats_evaluation(
+                resume_text, prompt_text(job_description), prompt_type, use_cache=use_cache,
+                final_thoughts=final_thoughts, keywords=job_description.keywords,
+            ):
+                yield 'token', {'text': piece}
+        except Exception as e:
+            yield 'error', {'message': f"Error evaluating resume: {e}"}
+        yield 'done', {}
+
+    return sse_response(events())
+
 @login_required(login_url='/')
 def welcome_view(request):
     if request.user.is_superuser:
@@ -225,14 +626,45 @@ def logout_view(request):
 
 # --- Admin Section ---
 
+# Prometheus metrics, for superusers or a scraper sending the METRICS['TOKEN'] bearer token
+def metrics_view(request):
+    token = getattr(settings, 'METRICS', {}).get('TOKEN')
+    authorized = request.user.is_superuser or (
+        token and request.headers.get('Authorization', '') == f"Bearer {token}"
+    )
+    if not authorized:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @user_passes_test(is_admin, login_url='/')
 def admin_page_view(request):
     return render(request, 'admin_page.html')
 
+# Reads an id cursor (?after= / ?before=) from the query string; None if absent or not a number
+def cursor_param(request, name):
+    value = request.GET.get(name, '')
+    return int(value) if value.isdigit() else None
+
 @user_passes_test(is_admin, login_url='/')
 def manage_users_view(request):
-    users = User.objects.all()
-    return render(request, 'manage_users.html', {'users': users})
+    query = request.GET.get('q', '').strip()
+    page = get_page(search_users(query), after=cursor_param(request, 'after'), before=cursor_param(request, 'before'))
+    return render(request, 'manage_users.html', {
+        'users': page.users,
+        'query': query,
+        'next_after': page.next_after,
+        'previous_before': page.previous_before,
+    })
+
+# Streams every user (matching ?q=, if given) as CSV without loading them all into memory
+@user_passes_test(is_admin, login_url='/')
+def export_users_view(request):
+    users = search_users(request.GET.get('q', ''))
+    # WSGI servers stream only synchronous iterators, ASGI servers only asynchronous ones.
+    rows = export_rows(users) if isinstance(request, WSGIRequest) else aexport_rows(users)
+    response = StreamingHttpResponse(rows, content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="users.csv"'
+    return response
 
 class CustomUserCreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
@@ -0,0 +1,48 @@
+// static/js/stream.js
+// Reads Server-Sent Events from fetch() responses and hands each event to a callback,
+// so AI results can be shown while the model is still writing them.
+
+async function readEventStream(response, onEvent) {
+    if (!response.ok || !response.body) {
+        let message = 'Request failed (' + response.status + ')';
+        try {
+            message = (await response.json()).error || message;
+        } catch (e) {}
+        throw new Error(message);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const raw = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let name = 'message';
+            let data = '';
+            raw.split('\n').forEach(line => {
+                if (line.startsWith('event:')) name = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            if (data) onEvent(name, JSON.parse(data));
+        }
+    }
+}
+
+// Posts a form to a streaming endpoint.
+async function streamForm(form, url, extraFields, onEvent) {
+    const body = new FormData(form);
+    Object.entries(extraFields || {}).forEach(([name, value]) => body.append(name, value));
+    await readEventStream(await fetch(url, { method: 'POST', body: body }), onEvent);
+}
+
+// Follows a streaming endpoint that needs no input, e.g. a background job's progress.
+async function streamEvents(url, onEvent) {
+    await readEventStream(await fetch(url), onEvent);
+}